@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Backend benchmark - Compares storage backends on a mixed read/write workload
+
+Populates each available backend (sqlite, lmdb, filesystem) with synthetic
+price histories through CacheManager, then runs a mix of get_cached_data and
+save_data calls and reports throughput and a full scan of the data type.
+
+Usage:
+    python benchmarks/backends.py [--symbols 200] [--bars 500] [--ops 5000] [--write-ratio 0.1]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tabulate import tabulate
+from core.cache_manager import CacheManager
+from core.backends import BACKENDS
+
+from concurrent_reads import make_price_history
+
+def backend_settings(name, tmp):
+    """Settings dictionary for one backend in a temporary directory."""
+    if name == 'sqlite':
+        return {'type': 'sqlite'}
+    return {'type': name, 'path': os.path.join(tmp, name)}
+
+def run_backend(name, args, histories):
+    """
+    Benchmark one backend
+
+    Returns:
+        list: [backend, load s, ops/s, scan s], or None if it is unavailable
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            cache = CacheManager(
+                "benchmark",
+                database_path=os.path.join(tmp, "bench.db"),
+                backend=backend_settings(name, tmp)
+            )
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+            return None
+
+        symbols = list(histories)
+        started = time.perf_counter()
+        with cache.batch():
+            cache.save_many(("price", symbol, bars) for symbol, bars in histories.items())
+        load = time.perf_counter() - started
+
+        rng = random.Random(1)
+        started = time.perf_counter()
+        for _ in range(args.ops):
+            symbol = rng.choice(symbols)
+            if rng.random() < args.write_ratio:
+                cache.save_data("price", symbol, histories[symbol][1:] + histories[symbol][:1])
+            else:
+                cache.get_cached_data("price", symbol)
+        mixed = args.ops / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        scanned = sum(1 for _ in cache.backend.scan("price"))
+        scan = time.perf_counter() - started
+        assert scanned == len(symbols)
+
+        cache.close()
+        return [name, f"{load:.2f}", f"{mixed:.0f}", f"{scan:.3f}"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage backend benchmark")
+    parser.add_argument("--symbols", type=int, default=200, help="Number of cached symbols")
+    parser.add_argument("--bars", type=int, default=500, help="Price bars per symbol")
+    parser.add_argument("--ops", type=int, default=5000, help="Operations in the mixed run")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="Share of writes in the mixed run")
+    args = parser.parse_args()
+
+    histories = {f"SYM{i}": make_price_history(args.bars) for i in range(args.symbols)}
+
+    rows = [row for row in (run_backend(name, args, histories) for name in BACKENDS) if row]
+    print(tabulate(rows, headers=["backend", "load s", "ops/s", "scan s"], tablefmt="pretty"))
+
+if __name__ == "__main__":
+    main()
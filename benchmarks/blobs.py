@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Blob store benchmark - Compares inline and external storage of large payloads
+
+Stores long synthetic price histories (several MB each when serialized)
+through CacheManager, once inline in cache_data and once in the blob store,
+then reports the load time, the database and blob store sizes, and the
+read throughput of get_cached_data with the memory tier bypassed. Half of
+the symbols share their payload with another symbol, so the blob store
+also shows the effect of deduplication.
+
+Usage:
+    python benchmarks/blobs.py [--symbols 20] [--bars 20000] [--reads 200] [--threshold 262144]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tabulate import tabulate
+from core.cache_manager import CacheManager
+
+from concurrent_reads import make_price_history
+
+def run_store(name, blobs, args, histories):
+    """
+    Benchmark one storage mode
+
+    Returns:
+        list: [mode, load s, database bytes, blob bytes, reads/s]
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, "bench.db")
+        cache = CacheManager(
+            "benchmark", database_path=database_path, blobs=blobs, memory_cache={'enabled': False}
+        )
+
+        # The 'outlook' data type has no series rows, so only payloads are stored
+        started = time.perf_counter()
+        with cache.batch():
+            cache.save_many(("outlook", symbol, bars) for symbol, bars in histories.items())
+        load = time.perf_counter() - started
+
+        # Everything in the directory besides the blob store is database files
+        # (including the WAL and any shards)
+        blob_bytes = cache.blobs.stats()[1] if cache.blobs is not None else 0
+        database_bytes = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for directory, _, files in os.walk(tmp) for name in files
+        ) - blob_bytes
+
+        symbols = list(histories)
+        rng = random.Random(1)
+        started = time.perf_counter()
+        for _ in range(args.reads):
+            cache.get_cached_data("outlook", rng.choice(symbols))
+        reads = args.reads / (time.perf_counter() - started)
+
+        cache.close()
+        return [name, f"{load:.2f}", f"{database_bytes:,}", f"{blob_bytes:,}", f"{reads:.1f}"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Blob store benchmark")
+    parser.add_argument("--symbols", type=int, default=20, help="Number of cached symbols")
+    parser.add_argument("--bars", type=int, default=20000, help="Price bars per symbol")
+    parser.add_argument("--reads", type=int, default=200, help="Number of reads")
+    parser.add_argument("--threshold", type=int, default=262144, help="Blob threshold in bytes")
+    args = parser.parse_args()
+
+    histories = {}
+    for i in range(args.symbols):
+        # Every other symbol repeats the previous one's payload
+        histories[f"SYM{i}"] = histories[f"SYM{i - 1}"] if i % 2 else make_price_history(args.bars)
+
+    rows = [
+        run_store("inline", {'enabled': False}, args, histories),
+        run_store("blob store", {'enabled': True, 'threshold': args.threshold}, args, histories)
+    ]
+    print(tabulate(rows, headers=["mode", "load s", "database bytes", "blob bytes", "reads/s"], tablefmt="pretty"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark - Measures cache read throughput as reader threads grow
+
+Populates a throwaway database with synthetic price histories, then runs
+get_cached_data from 1, 2, 4 and 8 threads while a writer keeps saving new
+versions in the background. The in-process memory tier is disabled, so
+every read goes through SQLite and the reader pool.
+
+Usage:
+    python benchmarks/concurrent_reads.py [--symbols 50] [--bars 2000] [--seconds 3]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache_manager import CacheManager
+
+def make_price_history(bars):
+    """Build a synthetic /historical-price-full payload."""
+    history = []
+    price = 100.0
+    for day in range(bars):
+        price *= 1 + random.uniform(-0.02, 0.02)
+        history.append({
+            'date': f"{2000 + day // 365}-{(day // 28) % 12 + 1:02d}-{day % 28 + 1:02d}",
+            'open': round(price, 2),
+            'high': round(price * 1.01, 2),
+            'low': round(price * 0.99, 2),
+            'close': round(price, 2),
+            'adjClose': round(price, 2),
+            'volume': random.randint(100000, 10000000)
+        })
+    return history
+
+def run_readers(cache, symbols, threads, seconds, with_writer):
+    """
+    Run reader threads for a fixed duration
+
+    Returns:
+        int: Total number of completed reads
+    """
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def reader(slot):
+        while not stop.is_set():
+            cache.get_cached_data("price", random.choice(symbols))
+            counts[slot] += 1
+
+    def writer():
+        payload = make_price_history(200)
+        while not stop.is_set():
+            cache.save_data("price", random.choice(symbols), payload)
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    if with_writer:
+        workers.append(threading.Thread(target=writer))
+
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    return sum(counts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent cache read benchmark")
+    parser.add_argument("--symbols", type=int, default=50, help="Number of cached symbols")
+    parser.add_argument("--bars", type=int, default=2000, help="Price bars per symbol")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each run")
+    parser.add_argument("--no-writer", action="store_true", help="Run without a concurrent writer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Measure the database readers, not dictionary lookups
+        cache = CacheManager(
+            "benchmark", database_path=os.path.join(tmp, "bench.db"), memory_cache={'enabled': False}
+        )
+        symbols = [f"SYM{i}" for i in range(args.symbols)]
+        for symbol in symbols:
+            cache.save_data("price", symbol, make_price_history(args.bars))
+
+        print(f"{'threads':>8} {'reads/s':>12} {'speedup':>8}")
+        baseline = None
+        for threads in (1, 2, 4, 8):
+            reads = run_readers(cache, symbols, threads, args.seconds, not args.no_writer)
+            rate = reads / args.seconds
+            baseline = baseline or rate
+            print(f"{threads:>8} {rate:>12.0f} {rate / baseline:>7.2f}x")
+
+        cache.close()
+
+if __name__ == "__main__":
+    main()
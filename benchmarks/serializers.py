@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Serializer benchmark - Compares encode/decode time and payload size
+
+Builds synthetic payloads shaped like each endpoint's API response and
+measures every installed serializer on them, before and after compression.
+
+Usage:
+    python benchmarks/serializers.py [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tabulate import tabulate
+from core.codecs import get_codec
+from core.serializers import available_serializers, get_serializer
+
+def dates(count):
+    """Generate descending ISO dates."""
+    return [f"{2024 - i // 365}-{12 - (i // 28) % 12:02d}-{28 - i % 28:02d}" for i in range(count)]
+
+def price_history(bars=5000):
+    """Shape of /v3/historical-price-full (the 'historical' list)."""
+    price = 100.0
+    history = []
+    for date in dates(bars):
+        price *= 1 + random.uniform(-0.02, 0.02)
+        history.append({
+            'date': date, 'open': round(price, 2), 'high': round(price * 1.01, 2),
+            'low': round(price * 0.99, 2), 'close': round(price, 2), 'adjClose': round(price, 2),
+            'volume': random.randint(10**5, 10**8), 'unadjustedVolume': random.randint(10**5, 10**8),
+            'change': round(random.uniform(-3, 3), 2), 'changePercent': round(random.uniform(-3, 3), 4),
+            'vwap': round(price, 4), 'label': 'January 02, 24', 'changeOverTime': round(random.random() / 100, 6)
+        })
+    return history
+
+def statements(periods=40, fields=35):
+    """Shape of income/balance/cash-flow statements, ratios and metrics."""
+    return [
+        dict(
+            {'date': date, 'symbol': 'AAPL', 'reportedCurrency': 'USD', 'period': 'FY',
+             'link': 'https://www.sec.gov/Archives/edgar/data/320193/000032019323000106.htm'},
+            **{f"field{i}": random.uniform(-1e10, 1e11) for i in range(fields)}
+        )
+        for date in dates(periods)
+    ]
+
+def profile():
+    """Shape of /v3/profile."""
+    return [{
+        'symbol': 'AAPL', 'price': 189.84, 'beta': 1.29, 'volAvg': 58405568, 'mktCap': 2952466178400,
+        'companyName': 'Apple Inc.', 'currency': 'USD', 'exchange': 'NASDAQ', 'industry': 'Consumer Electronics',
+        'sector': 'Technology', 'country': 'US', 'ceo': 'Mr. Timothy D. Cook', 'ipoDate': '1980-12-12',
+        'description': 'Apple Inc. designs, manufactures, and markets smartphones, personal computers. ' * 12,
+        'isEtf': False, 'isActivelyTrading': True
+    }]
+
+def news(articles=100):
+    """Shape of /v3/stock_news."""
+    return [{
+        'symbol': 'AAPL', 'publishedDate': f"{date} 12:00:00", 'title': 'Apple shares rise after earnings beat ' * 2,
+        'image': f"https://cdn.example.com/images/{i}.jpg", 'site': 'example.com',
+        'text': 'Apple reported quarterly results above analyst expectations. ' * 6,
+        'url': f"https://example.com/news/{i}"
+    } for i, date in enumerate(dates(articles))]
+
+def insider(trades=500):
+    """Shape of /v4/insider-trading."""
+    return [{
+        'symbol': 'AAPL', 'filingDate': f"{date} 18:30:00", 'transactionDate': date,
+        'reportingCik': '0001214128', 'transactionType': random.choice(['S-Sale', 'P-Purchase', 'M-Exempt']),
+        'securitiesOwned': random.randint(10**3, 10**7), 'companyCik': '0000320193',
+        'reportingName': 'Insider Name', 'typeOfOwner': 'officer: Senior Vice President',
+        'acquistionOrDisposition': random.choice(['A', 'D']), 'formType': '4',
+        'securitiesTransacted': random.randint(10, 10**5), 'price': round(random.uniform(100, 200), 2),
+        'securityName': 'Common Stock', 'link': 'https://www.sec.gov/Archives/edgar/data/320193/index.htm'
+    } for date in dates(trades)]
+
+def holders(count=1000):
+    """Shape of /v3/institutional-holder."""
+    return [{
+        'holder': f"Institution {i} Capital Management LLC", 'shares': random.randint(10**4, 10**9),
+        'dateReported': '2024-09-30', 'change': random.randint(-10**6, 10**6)
+    } for i in range(count)]
+
+def economic(points=1000):
+    """Shape of /v3/economic."""
+    return [{'date': date, 'value': random.uniform(0, 30000)} for date in dates(points)]
+
+SHAPES = {
+    'price': price_history,
+    'income': statements,
+    'profile': profile,
+    'news': news,
+    'insider': insider,
+    'holders': holders,
+    'economic': economic
+}
+
+def measure(serializer, payload, repeat):
+    """
+    Time encode and decode of one payload
+
+    Returns:
+        tuple: (encode ms, decode ms, encoded bytes)
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encoded = serializer.dumps(payload)
+    encode_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        serializer.loads(encoded)
+    decode_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    return encode_ms, decode_ms, encoded
+
+def main():
+    parser = argparse.ArgumentParser(description="Serializer benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    random.seed(0)
+    codec = get_codec('zlib')
+    rows = []
+    for shape, build in SHAPES.items():
+        payload = build()
+        for name in available_serializers():
+            encode_ms, decode_ms, encoded = measure(get_serializer(name), payload, args.repeat)
+            rows.append([
+                shape, name, f"{encode_ms:.3f}", f"{decode_ms:.3f}",
+                f"{len(encoded):,}", f"{len(codec.compress(encoded)):,}"
+            ])
+
+    headers = ["endpoint", "serializer", "encode ms", "decode ms", "bytes", "zlib bytes"]
+    print(tabulate(rows, headers=headers, tablefmt="pretty"))
+
+if __name__ == "__main__":
+    main()
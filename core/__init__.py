@@ -3,9 +3,11 @@ Core package - Contains core functionality for the Financial Data Cache system
 """
 
 from .cache_manager import CacheManager
+from .async_cache_manager import AsyncCacheManager
 from .database import Database
 
 __all__ = [
     'CacheManager',
+    'AsyncCacheManager',
     'Database'
 ]
@@ -0,0 +1,171 @@
+"""
+Archive - Cold storage for superseded cache versions
+
+Versions that are no longer the latest of their key are moved out of the
+hot cache database into a separate, append-only SQLite file. Each archived
+row is a full payload (never a delta) compressed with a strong codec, and
+keeps the id it had in cache_data, so version ids listed by CacheManager
+stay valid after archiving. The archive file is only opened when history
+is actually read or written.
+"""
+
+import os
+import sqlite3
+import threading
+
+# Compression levels used for archived payloads when none is configured
+ARCHIVE_LEVELS = {'zlib': 9, 'zstd': 19, 'lz4': 12}
+
+COLUMNS = "id, data_type, symbol, last_updated, last_verified, raw_data, codec, format, content_hash, archived"
+
+class VersionArchive:
+    def __init__(self, path, busy_timeout=30.0):
+        """
+        Args:
+            path (str): Path to the archive database file
+            busy_timeout (float, optional): Seconds to wait for a locked archive
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self, create=False):
+        """
+        Open the archive on first use
+
+        Args:
+            create (bool, optional): Create the file if it does not exist
+
+        Returns:
+            sqlite3.Connection: The connection, or None if there is no
+                archive yet and create is not set
+        """
+        if self._conn is not None:
+            return self._conn
+        if not create and not os.path.exists(self.path):
+            return None
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript('''
+        CREATE TABLE IF NOT EXISTS archived_versions (
+            id INTEGER PRIMARY KEY,
+            data_type TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            last_updated TEXT,
+            last_verified TEXT,
+            raw_data BLOB NOT NULL,
+            codec TEXT,
+            format TEXT,
+            content_hash TEXT,
+            archived TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_archived_versions_key
+        ON archived_versions (data_type, symbol, last_updated);
+
+        -- Archived history is append-only
+        CREATE TRIGGER IF NOT EXISTS archived_versions_no_update
+        BEFORE UPDATE ON archived_versions
+        BEGIN
+            SELECT RAISE(ABORT, 'archived versions are read-only');
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS archived_versions_no_delete
+        BEFORE DELETE ON archived_versions
+        BEGIN
+            SELECT RAISE(ABORT, 'archived versions are read-only');
+        END;
+        ''')
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def append(self, rows):
+        """
+        Store versions and commit them
+
+        Versions already in the archive are left unchanged, so a move that
+        was interrupted after this commit can simply be retried.
+
+        Args:
+            rows (list): (id, data_type, symbol, last_updated, last_verified,
+                raw_data, codec, format, content_hash, archived) tuples
+
+        Returns:
+            int: Number of versions added
+        """
+        with self._lock:
+            conn = self._connect(create=True)
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT OR IGNORE INTO archived_versions ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+            return conn.total_changes - before
+
+    def versions(self, data_type, symbol):
+        """
+        List the archived versions of a key, newest first
+
+        Returns:
+            list: (id, last_updated, last_verified, stored bytes) tuples
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return []
+            return conn.execute(
+                """
+                SELECT id, last_updated, last_verified, LENGTH(raw_data)
+                FROM archived_versions
+                WHERE data_type=? AND symbol=?
+                ORDER BY id DESC
+                """,
+                (data_type, symbol)
+            ).fetchall()
+
+    def get_version(self, version_id):
+        """
+        Get one archived version
+
+        Returns:
+            tuple: (id, data_type, symbol, last_updated, last_verified,
+                raw_data, codec, format, content_hash, archived), or None
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            return conn.execute(
+                f"SELECT {COLUMNS} FROM archived_versions WHERE id=?", (version_id,)
+            ).fetchone()
+
+    def stats(self):
+        """
+        Count the archived versions
+
+        Returns:
+            tuple: (versions, stored bytes, file size in bytes)
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return 0, 0, 0
+            versions, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(raw_data)), 0) FROM archived_versions"
+            ).fetchone()
+        return versions, stored, os.path.getsize(self.path)
+
+    def close(self):
+        """Close the archive connection if it was opened."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
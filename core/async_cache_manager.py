@@ -0,0 +1,246 @@
+"""
+Async Cache Manager - asyncio front end for the Financial Data Cache system
+
+Wraps CacheManager for use inside an event loop. Database work runs on one
+dedicated executor thread and API calls go through an httpx.AsyncClient
+limited by a semaphore, so many symbol lookups can run concurrently without
+a thread per request.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from core.cache_manager import CacheManager
+from core.transport import RETRY_STATUSES, backoff_delay, parse_retry_after
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+class AsyncCacheManager:
+    def __init__(self, api_key, database_path=None, max_concurrency=20, timeout=30.0):
+        """
+        Initialize the async cache manager
+
+        Args:
+            api_key (str): Financial Modeling Prep API key
+            database_path (str, optional): Path to the SQLite database
+            max_concurrency (int, optional): Maximum concurrent API requests
+            timeout (float, optional): API request timeout in seconds
+        """
+        if httpx is None:
+            raise ImportError("The httpx package is required for AsyncCacheManager")
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-db")
+        self.cache = self._executor.submit(CacheManager, api_key, database_path).result()
+        self.api_key = api_key
+        self.base_url = self.cache.base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self._semaphore = None
+        self._client = None
+        self._inflight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.close()
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking CacheManager call on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get_cached_data(self, data_type, symbol):
+        """Async version of CacheManager.get_cached_data."""
+        return await self._run(self.cache.get_cached_data, data_type, symbol)
+
+    async def save_data(self, data_type, symbol, data):
+        """Async version of CacheManager.save_data."""
+        await self._run(self.cache.save_data, data_type, symbol, data)
+
+    async def save_many(self, records):
+        """Async version of CacheManager.save_many."""
+        await self._run(self.cache.save_many, list(records))
+
+    async def track_api_request(self, endpoint):
+        """Async version of CacheManager.track_api_request."""
+        await self._run(self.cache.track_api_request, endpoint)
+
+    async def charge_retry(self, endpoint):
+        """Async version of CacheManager.charge_retry."""
+        await self.track_api_request(endpoint)
+        return not await self.check_api_limit_reached() and await self.acquire_api_budget()
+
+    async def get_daily_request_count(self):
+        """Async version of CacheManager.get_daily_request_count."""
+        return await self._run(self.cache.get_daily_request_count)
+
+    async def check_api_limit_reached(self):
+        """Async version of CacheManager.check_api_limit_reached."""
+        return await self._run(self.cache.check_api_limit_reached)
+
+    async def acquire_api_budget(self, n=1, timeout=None, reservation=None):
+        """
+        Async version of CacheManager.acquire_api_budget
+
+        Waits with asyncio.sleep, so the event loop and the database thread
+        stay free while the rate limiter refills.
+        """
+        if not self.cache.rate_limiter.is_active():
+            return True
+        if timeout is None:
+            timeout = self.cache.rate_limit_timeout
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            wait = await self._run(self.cache.rate_limiter.try_acquire, n, reservation)
+            if wait == 0:
+                return True
+            if wait > deadline - loop.time():
+                return False
+            await asyncio.sleep(wait)
+
+    async def get_cache_summary(self, data_type=None):
+        """Async version of CacheManager.get_cache_summary."""
+        return await self._run(self.cache.get_cache_summary, data_type)
+
+    async def get_or_fetch(self, data_type, symbol, fetch, force=False, params=None):
+        """
+        Async version of CacheManager.get_or_fetch
+
+        Concurrent calls for the same key make a single fetch: other tasks
+        await the first caller's result, and other processes wait for its
+        lease.
+
+        Args:
+            data_type (str): Type of data (e.g., 'esg', 'profile')
+            symbol (str): Stock symbol
+            fetch (callable): Coroutine function returning the payload, or None on failure
+            force (bool, optional): Fetch even if the cached data is fresh
+            params (dict, optional): Request parameters distinguishing fetches
+                of the same key
+
+        Returns:
+            The payload, or None if nothing is cached and the fetch failed
+        """
+        if not force and await self._run(self.cache.is_fresh, data_type, symbol):
+            return await self.get_cached_data(data_type, symbol)
+
+        key = self.cache.flight_key(data_type, symbol, params)
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data = await self._fetch_once(key, fetch)
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved when no other task is waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+        future.set_result(data)
+        return data
+
+    async def _fetch_once(self, key, fetch):
+        """Async version of CacheManager._fetch_once."""
+        cache = self.cache
+        data_type, symbol = key[:2]
+        before = await self._run(cache.head_stamp, data_type, symbol)
+
+        while True:
+            owner = await self._run(cache.leases.acquire, key, cache.fetch_lease_ttl)
+            if owner is not None:
+                break
+            deadline = asyncio.get_running_loop().time() + cache.fetch_lease_ttl
+            while await self._run(cache.leases.is_held, key):
+                if asyncio.get_running_loop().time() >= deadline:
+                    break
+                await asyncio.sleep(cache.leases.poll_interval)
+            if await self._run(cache.head_stamp, data_type, symbol) != before:
+                return await self.get_cached_data(data_type, symbol)
+
+        try:
+            if await self._run(cache.head_stamp, data_type, symbol) != before:
+                return await self.get_cached_data(data_type, symbol)
+
+            if await self.check_api_limit_reached() or not await self.acquire_api_budget():
+                return await self.get_cached_data(data_type, symbol)
+
+            data = await fetch()
+            if data:
+                await self.save_data(data_type, symbol, data)
+                return data
+
+            return await self.get_cached_data(data_type, symbol)
+        finally:
+            await self._run(cache.leases.release, key, owner)
+
+    async def fetch_json(self, endpoint, path="", params=None):
+        """
+        Request an API endpoint and track the request
+
+        Connection errors, 429 and 5xx responses are retried with the same
+        backoff settings as the synchronous transport; each retry is charged
+        and waits for rate-limiter budget like the first attempt.
+
+        Args:
+            endpoint (str): API endpoint (e.g., '/v3/profile')
+            path (str, optional): Path suffix (e.g., '/AAPL')
+            params (dict, optional): Query parameters, without the API key
+
+        Returns:
+            The decoded JSON response, or None on a non-200 response
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        transport = self.cache.transport
+        query = dict(params or {}, apikey=self.api_key)
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self._client.get(f"{self.base_url}{endpoint}{path}", params=query)
+            except httpx.TransportError:
+                if attempt >= transport.max_retries or not await self.charge_retry(endpoint):
+                    raise
+                delay = backoff_delay(attempt, transport.backoff, transport.max_backoff)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= transport.max_retries:
+                    break
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = backoff_delay(attempt, transport.backoff, transport.max_backoff, retry_after)
+                if delay is None or not await self.charge_retry(endpoint):
+                    break
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if response.status_code != 200:
+            return None
+
+        await self.track_api_request(endpoint)
+        return response.json()
+
+    async def close(self):
+        """Close the HTTP client, then the cache on the database thread."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+        await self._run(self.cache.close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,57 @@
+"""
+Storage backends for cached payloads
+"""
+
+from .base import CacheBackend, StoredVersion
+from .sqlite import SQLiteBackend, ShardedSQLiteBackend, SHARD_SPAN
+from .lmdb import LMDBBackend
+from .filesystem import FilesystemBackend
+from core.database import ShardRouter
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'lmdb': LMDBBackend,
+    'filesystem': FilesystemBackend
+}
+
+def get_backend(settings, db):
+    """
+    Create the backend selected in the 'backend' config
+
+    Args:
+        settings (dict): {'type': 'sqlite' | 'lmdb' | 'filesystem', 'path': ...}
+            plus backend-specific options (e.g. 'map_size' for lmdb, or
+            'shard_by', 'shards' and 'path' to shard the sqlite backend)
+        db (Database): The cache database, used by the sqlite backend
+
+    Returns:
+        CacheBackend: The backend
+    """
+    name = settings.get('type', 'sqlite')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown cache backend '{name}'")
+
+    if name == 'sqlite':
+        if settings.get('shard_by'):
+            shards = settings.get('shards', 8)
+            # Shard ids are encoded below SHARD_SPAN in version ids
+            if shards >= SHARD_SPAN:
+                raise ValueError(f"At most {SHARD_SPAN - 1} shards are supported, got {shards}")
+            return ShardedSQLiteBackend(ShardRouter(
+                db, settings['shard_by'], shards, settings.get('path')
+            ))
+        return SQLiteBackend(db)
+    if name == 'lmdb':
+        return LMDBBackend(settings.get('path', 'cache_lmdb'), settings.get('map_size', 1 << 32))
+    return FilesystemBackend(settings.get('path', 'cache_files'))
+
+__all__ = [
+    'CacheBackend',
+    'StoredVersion',
+    'SQLiteBackend',
+    'ShardedSQLiteBackend',
+    'LMDBBackend',
+    'FilesystemBackend',
+    'BACKENDS',
+    'get_backend'
+]
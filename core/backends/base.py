@@ -0,0 +1,324 @@
+"""
+Cache Backend - Interface between CacheManager and payload storage
+
+CacheManager serializes, compresses and hashes payloads itself and hands
+the resulting bytes to a backend. Every backend implements the core
+methods of CacheBackend. Backends other than SQLite write through: their
+writes are durable when put() returns and are not rolled back by batch().
+Backends that keep more than the latest version of a key (supports_history)
+also implement the history methods used by version deltas, compaction and
+recompression.
+"""
+
+import json
+import struct
+
+class StoredVersion:
+    __slots__ = (
+        'version', 'data_type', 'symbol', 'last_updated', 'last_verified',
+        'raw_data', 'codec', 'format', 'content_hash', 'base_id', 'size'
+    )
+
+    def __init__(self, version, data_type, symbol, last_updated, last_verified=None,
+                 raw_data=None, codec=None, format=None, content_hash=None, base_id=None,
+                 size=None):
+        """
+        One stored version of a key
+
+        Args:
+            version (int): Identifier that changes whenever the key is rewritten
+            data_type (str): Type of data
+            symbol (str): Stock symbol
+            last_updated (str): Timestamp in TIMESTAMP_FORMAT
+            last_verified (str, optional): When the content was last confirmed unchanged
+            raw_data (bytes, optional): Stored payload, None for head() results
+            codec (str, optional): Codec tag
+            format (str, optional): Format tag
+            content_hash (str, optional): Hash of the serialized payload
+            base_id (int, optional): Newer version a delta applies to
+            size (int, optional): Stored bytes, set when raw_data is not loaded
+        """
+        self.version = version
+        self.data_type = data_type
+        self.symbol = symbol
+        self.last_updated = last_updated
+        self.last_verified = last_verified
+        self.raw_data = raw_data
+        self.codec = codec
+        self.format = format
+        self.content_hash = content_hash
+        self.base_id = base_id
+        self.size = size
+
+class CacheBackend:
+    """Methods every storage backend implements."""
+
+    name = None
+
+    # Whether older versions are kept (and the history methods implemented)
+    supports_history = False
+
+    # Whether payloads are spread over shard databases besides the cache database
+    sharded = False
+
+    def head(self, data_type, symbol, writer=False):
+        """
+        Get the metadata of the latest version of a key
+
+        Args:
+            data_type (str): Type of data
+            symbol (str): Stock symbol
+            writer (bool, optional): Read through the writer, so uncommitted
+                writes of the calling thread are visible
+
+        Returns:
+            StoredVersion: The version without raw_data, or None
+        """
+        raise NotImplementedError
+
+    def get_latest(self, data_type, symbol):
+        """
+        Get the latest version of a key
+
+        Returns:
+            StoredVersion: The version with raw_data, or None
+        """
+        raise NotImplementedError
+
+    def put(self, rows):
+        """
+        Store new versions
+
+        Args:
+            rows (list): (data_type, symbol, last_updated, raw_data, codec,
+                format, content_hash) tuples
+        """
+        raise NotImplementedError
+
+    def touch(self, rows):
+        """
+        Mark latest versions as confirmed unchanged
+
+        Args:
+            rows (list): (data_type, symbol, version, timestamp) tuples;
+                last_updated and last_verified are set to timestamp
+        """
+        raise NotImplementedError
+
+    def list_keys(self, data_type=None):
+        """
+        List the cached keys
+
+        Args:
+            data_type (str, optional): Only keys of this data type
+
+        Returns:
+            list: Sorted (data_type, symbol) tuples
+        """
+        raise NotImplementedError
+
+    def summary(self, data_type=None):
+        """
+        Summarize the cached keys
+
+        Args:
+            data_type (str, optional): Only keys of this data type
+
+        Returns:
+            list: (data_type, symbol, last_updated, versions, stored bytes) tuples
+        """
+        raise NotImplementedError
+
+    def delete(self, data_type, symbol):
+        """
+        Delete every version of a key
+
+        Returns:
+            int: Number of versions deleted
+        """
+        raise NotImplementedError
+
+    def scan(self, data_type, start=None, end=None):
+        """
+        Iterate over the latest versions of a data type in symbol order
+
+        Args:
+            data_type (str): Type of data
+            start (str, optional): First symbol, inclusive
+            end (str, optional): Last symbol, exclusive
+
+        Yields:
+            StoredVersion: Latest versions with raw_data
+        """
+        raise NotImplementedError
+
+    def get_latest_many(self, data_type, symbols=None):
+        """
+        Iterate over the latest versions of many keys of a data type
+
+        Backends override this to read many keys per round trip.
+
+        Args:
+            data_type (str): Type of data
+            symbols (iterable, optional): Symbols to read; every cached symbol
+                if omitted
+
+        Yields:
+            StoredVersion: Latest versions with raw_data, in symbol order when
+                symbols is omitted and otherwise in the order given; symbols
+                that are not cached are skipped
+        """
+        if symbols is None:
+            yield from self.scan(data_type)
+            return
+        for symbol in symbols:
+            version = self.get_latest(data_type, symbol)
+            if version is not None:
+                yield version
+
+    def data_version(self):
+        """
+        Get a value that changes whenever any process writes
+
+        Returns:
+            int: The value, or None if the backend cannot tell, in which case
+                memory-tier entries are revalidated on every read
+        """
+        return None
+
+    def databases(self, data_type=None):
+        """
+        List SQLite databases holding payloads besides the cache database
+
+        CacheManager commits, rolls back and vacuums these along with its
+        own database.
+
+        Args:
+            data_type (str, optional): Instead list every database that may
+                hold keys of this data type, opening them if needed
+
+        Returns:
+            list: Database instances
+        """
+        return []
+
+    def database_for(self, data_type, symbol, create=True):
+        """
+        Get the database that should also hold a key's typed series rows
+
+        Args:
+            data_type (str): Type of data
+            symbol (str): Stock symbol
+            create (bool, optional): Create the key's shard if it does not exist yet
+
+        Returns:
+            Database: A shard database, or None for the cache database (or,
+                when sharded, if the shard does not exist and create is unset)
+        """
+        return None
+
+    def close(self):
+        """Release the backend's resources."""
+
+    # History methods, implemented when supports_history is set
+
+    def versions(self, data_type, symbol):
+        """
+        List every stored version of a key, newest first
+
+        Returns:
+            list: StoredVersion instances without raw_data but with size
+        """
+        raise NotImplementedError
+
+    def get_version(self, version_id, writer=False):
+        """
+        Get one stored version by id
+
+        Returns:
+            StoredVersion: The version with raw_data, or None
+        """
+        raise NotImplementedError
+
+    def rewrite(self, rows):
+        """
+        Replace the stored bytes of versions
+
+        Args:
+            rows (list): (raw_data, codec, format, content_hash, base_id,
+                version) tuples; a None content_hash keeps the stored one
+        """
+        raise NotImplementedError
+
+    def delete_versions(self, version_ids):
+        """Delete versions by id."""
+        raise NotImplementedError
+
+    def dependents(self, version_ids):
+        """
+        Find surviving versions stored as deltas against the given ones
+
+        Returns:
+            list: StoredVersion instances without raw_data
+        """
+        raise NotImplementedError
+
+    def delta_run(self, data_type, symbol, version_id):
+        """
+        Count the delta versions between a version and the last full one before it
+
+        Returns:
+            int: Number of delta versions
+        """
+        raise NotImplementedError
+
+    def iter_versions(self, after_id, limit):
+        """
+        Page through every stored version in id order
+
+        Returns:
+            list: Up to limit StoredVersion instances with raw_data and id > after_id
+        """
+        raise NotImplementedError
+
+def pack_version(version):
+    """
+    Encode a StoredVersion as one byte string
+
+    Used by backends storing each key as a single value: a 4-byte header
+    length, a JSON header with the metadata, then the stored payload.
+    """
+    header = json.dumps({
+        'version': version.version,
+        'data_type': version.data_type,
+        'symbol': version.symbol,
+        'last_updated': version.last_updated,
+        'last_verified': version.last_verified,
+        'codec': version.codec,
+        'format': version.format,
+        'content_hash': version.content_hash
+    }).encode('utf-8')
+    raw_data = version.raw_data
+    if isinstance(raw_data, str):
+        raw_data = raw_data.encode('utf-8')
+    return struct.pack('>I', len(header)) + header + raw_data
+
+def unpack_version(value, with_payload=True):
+    """
+    Decode a byte string written by pack_version
+
+    Args:
+        value (bytes or memoryview): Packed version
+        with_payload (bool, optional): Also copy out the stored payload
+
+    Returns:
+        StoredVersion: The version, with raw_data only if with_payload is set
+    """
+    length = struct.unpack('>I', bytes(value[:4]))[0]
+    header = json.loads(bytes(value[4:4 + length]))
+    version = StoredVersion(**header)
+    if with_payload:
+        version.raw_data = bytes(value[4 + length:])
+    else:
+        version.size = len(value) - 4 - length
+    return version
@@ -0,0 +1,122 @@
+"""
+Filesystem Backend - One file per key in hashed shard directories
+
+Keeps only the latest version of each key, at
+<root>/<data_type>/<shard>/<symbol>.bin, where the shard is the first byte
+of a hash of the symbol. Files are replaced atomically, so readers in any
+process see either the old or the new version, never a partial write.
+"""
+
+import os
+import time
+import hashlib
+import tempfile
+from urllib.parse import quote, unquote
+from core.backends.base import CacheBackend, StoredVersion, pack_version, unpack_version
+
+SUFFIX = '.bin'
+
+class FilesystemBackend(CacheBackend):
+    name = 'filesystem'
+
+    def __init__(self, root):
+        """
+        Args:
+            root (str): Directory holding the shard directories
+        """
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+
+    def _path(self, data_type, symbol):
+        shard = hashlib.blake2b(symbol.encode('utf-8'), digest_size=1).hexdigest()
+        return os.path.join(self.root, quote(data_type, safe=''), shard, quote(symbol, safe='') + SUFFIX)
+
+    def _read(self, path, with_payload=True):
+        try:
+            with open(path, 'rb') as f:
+                return unpack_version(f.read(), with_payload)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path, version):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pack_version(version))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def head(self, data_type, symbol, writer=False):
+        return self._read(self._path(data_type, symbol), with_payload=False)
+
+    def get_latest(self, data_type, symbol):
+        return self._read(self._path(data_type, symbol))
+
+    def put(self, rows):
+        for data_type, symbol, last_updated, raw_data, codec, format, content_hash in rows:
+            self._write(self._path(data_type, symbol), StoredVersion(
+                time.time_ns(), data_type, symbol, last_updated, last_updated,
+                raw_data, codec, format, content_hash
+            ))
+
+    def touch(self, rows):
+        for data_type, symbol, version, timestamp in rows:
+            path = self._path(data_type, symbol)
+            stored = self._read(path)
+            if stored is None or stored.version != version:
+                continue
+            stored.last_updated = stored.last_verified = timestamp
+            self._write(path, stored)
+
+    def _symbols(self, data_type):
+        """Sorted symbols stored for a data type."""
+        directory = os.path.join(self.root, quote(data_type, safe=''))
+        if not os.path.isdir(directory):
+            return []
+
+        symbols = []
+        for shard in os.scandir(directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(SUFFIX):
+                    symbols.append(unquote(entry.name[:-len(SUFFIX)]))
+        return sorted(symbols)
+
+    def _data_types(self):
+        return sorted(
+            unquote(entry.name) for entry in os.scandir(self.root) if entry.is_dir()
+        )
+
+    def list_keys(self, data_type=None):
+        data_types = [data_type] if data_type is not None else self._data_types()
+        return [(dt, symbol) for dt in data_types for symbol in self._symbols(dt)]
+
+    def summary(self, data_type=None):
+        rows = []
+        for dt, symbol in self.list_keys(data_type):
+            version = self.head(dt, symbol)
+            if version is not None:
+                rows.append((dt, symbol, version.last_updated, 1, version.size))
+        return rows
+
+    def delete(self, data_type, symbol):
+        try:
+            os.unlink(self._path(data_type, symbol))
+        except FileNotFoundError:
+            return 0
+        return 1
+
+    def scan(self, data_type, start=None, end=None):
+        for symbol in self._symbols(data_type):
+            if start is not None and symbol < start:
+                continue
+            if end is not None and symbol >= end:
+                break
+            version = self.get_latest(data_type, symbol)
+            if version is not None:
+                yield version
@@ -0,0 +1,135 @@
+"""
+LMDB Backend - Latest payloads in a memory-mapped B+tree
+
+Keeps only the latest version of each key, under '<data_type>\\0<symbol>',
+so keys of one data type are adjacent and scan() is a cursor walk. Reads
+never block writers, and the environment can be shared by several
+processes. Requires the lmdb package.
+"""
+
+import os
+from core.backends.base import CacheBackend, StoredVersion, pack_version, unpack_version
+
+try:
+    import lmdb
+except ImportError:
+    lmdb = None
+
+# Key of the version counter; data types never start with this byte
+COUNTER_KEY = b'\x01version'
+
+class LMDBBackend(CacheBackend):
+    name = 'lmdb'
+
+    def __init__(self, path, map_size=1 << 32):
+        """
+        Args:
+            path (str): Directory of the LMDB environment
+            map_size (int, optional): Maximum size of the environment in bytes
+        """
+        if lmdb is None:
+            raise ImportError("The lmdb package is required for the lmdb backend")
+
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.env = lmdb.open(path, map_size=map_size, subdir=True, max_readers=256)
+
+    @staticmethod
+    def _key(data_type, symbol):
+        return f"{data_type}\x00{symbol}".encode('utf-8')
+
+    @staticmethod
+    def _split(key):
+        data_type, _, symbol = bytes(key).decode('utf-8').partition('\x00')
+        return data_type, symbol
+
+    def head(self, data_type, symbol, writer=False):
+        with self.env.begin(buffers=True) as txn:
+            value = txn.get(self._key(data_type, symbol))
+            return unpack_version(value, with_payload=False) if value is not None else None
+
+    def get_latest(self, data_type, symbol):
+        with self.env.begin(buffers=True) as txn:
+            value = txn.get(self._key(data_type, symbol))
+            return unpack_version(value) if value is not None else None
+
+    def put(self, rows):
+        with self.env.begin(write=True) as txn:
+            counter = int(txn.get(COUNTER_KEY) or b'0')
+            for data_type, symbol, last_updated, raw_data, codec, format, content_hash in rows:
+                counter += 1
+                txn.put(self._key(data_type, symbol), pack_version(StoredVersion(
+                    counter, data_type, symbol, last_updated, last_updated,
+                    raw_data, codec, format, content_hash
+                )))
+            txn.put(COUNTER_KEY, str(counter).encode('ascii'))
+
+    def touch(self, rows):
+        with self.env.begin(write=True) as txn:
+            for data_type, symbol, version, timestamp in rows:
+                key = self._key(data_type, symbol)
+                value = txn.get(key)
+                if value is None:
+                    continue
+                stored = unpack_version(value)
+                if stored.version != version:
+                    continue
+                stored.last_updated = stored.last_verified = timestamp
+                txn.put(key, pack_version(stored))
+
+    def _iter(self, txn, data_type=None, start=None, end=None):
+        """Yield (key, value) pairs in key order, optionally limited to a data type."""
+        cursor = txn.cursor()
+        prefix = f"{data_type}\x00".encode('utf-8') if data_type is not None else b''
+        seek = prefix + (start or '').encode('utf-8')
+        if not cursor.set_range(seek):
+            return
+
+        for key, value in cursor:
+            key = bytes(key)
+            if key == COUNTER_KEY:
+                continue
+            if not key.startswith(prefix):
+                break
+            if end is not None and self._split(key)[1] >= end:
+                break
+            yield key, value
+
+    def list_keys(self, data_type=None):
+        with self.env.begin(buffers=True) as txn:
+            return [self._split(key) for key, _ in self._iter(txn, data_type)]
+
+    def summary(self, data_type=None):
+        with self.env.begin(buffers=True) as txn:
+            return [
+                (version.data_type, version.symbol, version.last_updated, 1, version.size)
+                for version in (
+                    unpack_version(value, with_payload=False)
+                    for _, value in self._iter(txn, data_type)
+                )
+            ]
+
+    def delete(self, data_type, symbol):
+        with self.env.begin(write=True) as txn:
+            return 1 if txn.delete(self._key(data_type, symbol)) else 0
+
+    def scan(self, data_type, start=None, end=None):
+        with self.env.begin(buffers=True) as txn:
+            versions = [unpack_version(value) for _, value in self._iter(txn, data_type, start, end)]
+        yield from versions
+
+    def get_latest_many(self, data_type, symbols=None):
+        if symbols is None:
+            yield from self.scan(data_type)
+            return
+
+        with self.env.begin(buffers=True) as txn:
+            values = [txn.get(self._key(data_type, symbol)) for symbol in symbols]
+            versions = [unpack_version(value) for value in values if value is not None]
+        yield from versions
+
+    def data_version(self):
+        return self.env.info()['last_txnid']
+
+    def close(self):
+        self.env.close()
@@ -0,0 +1,411 @@
+"""
+SQLite Backend - Payload storage in the cache_data table
+
+Keeps every version of a key, with cache_latest pointing at the newest one,
+and supports the history methods used by version deltas and compaction.
+
+Writes run on the calling thread's connection of the cache Database, so
+they share the transaction CacheManager commits (including batch()).
+ShardedSQLiteBackend spreads the same layout over the shard files of a
+ShardRouter.
+"""
+
+import heapq
+from core.backends.base import CacheBackend, StoredVersion
+from core.blobs import stored_size_sql
+
+KEY_COLUMNS = "c.id, c.data_type, c.symbol, c.last_updated, c.last_verified"
+HEAD_COLUMNS = KEY_COLUMNS + f", NULL, c.codec, c.format, c.content_hash, c.base_id, {stored_size_sql('c')}"
+FULL_COLUMNS = KEY_COLUMNS + ", c.raw_data, c.codec, c.format, c.content_hash, c.base_id"
+
+# Symbols per IN (...) list, well below SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+def _version(row):
+    return StoredVersion(*row) if row else None
+
+class SQLiteBackend(CacheBackend):
+    name = 'sqlite'
+    supports_history = True
+
+    def __init__(self, db):
+        """
+        Args:
+            db (Database): Database holding the cache tables
+        """
+        self.db = db
+
+    def head(self, data_type, symbol, writer=False):
+        query = f"""
+        SELECT {HEAD_COLUMNS} FROM cache_latest l
+        JOIN cache_data c ON c.id = l.cache_id
+        WHERE l.data_type=? AND l.symbol=?
+        """
+        if writer:
+            return _version(self.db.execute(query, (data_type, symbol)).fetchone())
+        with self.db.reader() as conn:
+            return _version(conn.execute(query, (data_type, symbol)).fetchone())
+
+    def get_latest(self, data_type, symbol):
+        with self.db.reader() as conn:
+            return _version(conn.execute(
+                f"""
+                SELECT {FULL_COLUMNS} FROM cache_latest l
+                JOIN cache_data c ON c.id = l.cache_id
+                WHERE l.data_type=? AND l.symbol=?
+                """,
+                (data_type, symbol)
+            ).fetchone())
+
+    def put(self, rows):
+        self.db.cursor.executemany(
+            """
+            INSERT INTO cache_data
+                (data_type, symbol, last_updated, raw_data, codec, format, content_hash, last_verified)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [row + (row[2],) for row in rows]
+        )
+
+    def touch(self, rows):
+        self.db.cursor.executemany(
+            "UPDATE cache_data SET last_updated=?, last_verified=? WHERE id=?",
+            [(timestamp, timestamp, version) for _, _, version, timestamp in rows]
+        )
+
+    def list_keys(self, data_type=None):
+        query = "SELECT data_type, symbol FROM cache_latest"
+        params = ()
+        if data_type is not None:
+            query += " WHERE data_type=?"
+            params = (data_type,)
+
+        with self.db.reader() as conn:
+            return sorted(conn.execute(query, params).fetchall())
+
+    def summary(self, data_type=None):
+        # cache_stats is kept current by triggers on cache_data
+        query = "SELECT data_type, symbol, last_updated, versions, payload_bytes FROM cache_stats"
+        params = ()
+        if data_type is not None:
+            query += " WHERE data_type=?"
+            params = (data_type,)
+        query += " ORDER BY data_type, symbol"
+
+        with self.db.reader() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def delete(self, data_type, symbol):
+        cursor = self.db.execute(
+            "DELETE FROM cache_data WHERE data_type=? AND symbol=?",
+            (data_type, symbol)
+        )
+        return cursor.rowcount
+
+    def scan(self, data_type, start=None, end=None):
+        query = f"""
+        SELECT {FULL_COLUMNS} FROM cache_latest l
+        JOIN cache_data c ON c.id = l.cache_id
+        WHERE l.data_type=?
+        """
+        params = [data_type]
+        if start is not None:
+            query += " AND l.symbol >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND l.symbol < ?"
+            params.append(end)
+        query += " ORDER BY l.symbol"
+
+        with self.db.reader() as conn:
+            rows = conn.execute(query, params).fetchall()
+        for row in rows:
+            yield _version(row)
+
+    def get_latest_many(self, data_type, symbols=None):
+        if symbols is None:
+            yield from self.scan(data_type)
+            return
+
+        symbols = list(symbols)
+        for start in range(0, len(symbols), CHUNK_SIZE):
+            chunk = symbols[start:start + CHUNK_SIZE]
+            with self.db.reader() as conn:
+                rows = conn.execute(
+                    f"""
+                    SELECT {FULL_COLUMNS} FROM cache_latest l
+                    JOIN cache_data c ON c.id = l.cache_id
+                    WHERE l.data_type=? AND l.symbol IN ({",".join("?" * len(chunk))})
+                    """,
+                    [data_type] + chunk
+                ).fetchall()
+            found = {row[2]: row for row in rows}
+            for symbol in chunk:
+                if symbol in found:
+                    yield _version(found[symbol])
+
+    def data_version(self):
+        return self.db.data_version()
+
+    def versions(self, data_type, symbol):
+        with self.db.reader() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {HEAD_COLUMNS} FROM cache_data c
+                WHERE c.data_type=? AND c.symbol=?
+                ORDER BY c.last_updated DESC, c.id DESC
+                """,
+                (data_type, symbol)
+            ).fetchall()
+        return [_version(row) for row in rows]
+
+    def get_version(self, version_id, writer=False):
+        query = f"SELECT {FULL_COLUMNS} FROM cache_data c WHERE c.id=?"
+        if writer:
+            return _version(self.db.execute(query, (version_id,)).fetchone())
+        with self.db.reader() as conn:
+            return _version(conn.execute(query, (version_id,)).fetchone())
+
+    def rewrite(self, rows):
+        self.db.cursor.executemany(
+            """
+            UPDATE cache_data SET raw_data=?, codec=?, format=?,
+                content_hash=COALESCE(?, content_hash), base_id=?
+            WHERE id=?
+            """,
+            rows
+        )
+
+    def delete_versions(self, version_ids):
+        placeholders = ",".join("?" * len(version_ids))
+        self.db.execute(
+            f"DELETE FROM cache_data WHERE id IN ({placeholders})",
+            tuple(version_ids)
+        )
+
+    def dependents(self, version_ids):
+        placeholders = ",".join("?" * len(version_ids))
+        rows = self.db.execute(
+            f"""
+            SELECT {HEAD_COLUMNS} FROM cache_data c
+            WHERE c.base_id IN ({placeholders}) AND c.id NOT IN ({placeholders})
+            """,
+            tuple(version_ids) * 2
+        ).fetchall()
+        return [_version(row) for row in rows]
+
+    def delta_run(self, data_type, symbol, version_id):
+        return self.db.execute(
+            """
+            SELECT COUNT(*) FROM cache_data
+            WHERE data_type=? AND symbol=? AND id < ? AND id > COALESCE((
+                SELECT MAX(id) FROM cache_data
+                WHERE data_type=? AND symbol=? AND id < ? AND base_id IS NULL
+            ), 0)
+            """,
+            (data_type, symbol, version_id, data_type, symbol, version_id)
+        ).fetchone()[0]
+
+    def iter_versions(self, after_id, limit):
+        with self.db.reader() as conn:
+            rows = conn.execute(
+                f"SELECT {FULL_COLUMNS} FROM cache_data c WHERE c.id > ? ORDER BY c.id LIMIT ?",
+                (after_id, limit)
+            ).fetchall()
+        return [_version(row) for row in rows]
+
+# Global version ids are local cache_data ids times SHARD_SPAN plus the shard id
+SHARD_SPAN = 1024
+
+class ShardedSQLiteBackend(CacheBackend):
+    name = 'sqlite'
+    supports_history = True
+    sharded = True
+
+    def __init__(self, router):
+        """
+        SQLite storage split across the shard files of a ShardRouter
+
+        Each shard is handled by a SQLiteBackend. Version ids are made
+        unique across shards by encoding the shard id in their low bits.
+        Every shard commits separately, so a batch spanning several shards
+        is not atomic across them.
+
+        Args:
+            router (ShardRouter): Routes keys to shard databases
+        """
+        self.router = router
+        self._backends = {}
+
+    def _backend(self, shard_id):
+        backend = self._backends.get(shard_id)
+        if backend is None:
+            backend = self._backends.setdefault(shard_id, SQLiteBackend(self.router.shard(shard_id)))
+        return backend
+
+    def _route(self, data_type, symbol, create=False):
+        route = self.router.route(data_type, symbol, create)
+        if route is None:
+            return None
+        if route[0] >= SHARD_SPAN:
+            raise ValueError(f"Shard id {route[0]} does not fit in version ids (at most {SHARD_SPAN - 1})")
+        return route[0]
+
+    @staticmethod
+    def _split_id(version_id):
+        return version_id % SHARD_SPAN, version_id // SHARD_SPAN
+
+    @staticmethod
+    def _global(stored, shard_id):
+        if stored is not None:
+            stored.version = stored.version * SHARD_SPAN + shard_id
+            if stored.base_id is not None:
+                stored.base_id = stored.base_id * SHARD_SPAN + shard_id
+        return stored
+
+    def _local(self, version_id):
+        """Split a global version id into (shard backend, local id, shard id)."""
+        shard_id, local_id = self._split_id(version_id)
+        return self._backend(shard_id), local_id, shard_id
+
+    def _by_shard(self, version_ids):
+        groups = {}
+        for version_id in version_ids:
+            shard_id, local_id = self._split_id(version_id)
+            groups.setdefault(shard_id, []).append(local_id)
+        return groups
+
+    def _shards(self, data_type=None):
+        return [(shard_id, self._backend(shard_id)) for shard_id, _ in self.router.shards(data_type)]
+
+    def head(self, data_type, symbol, writer=False):
+        shard_id = self._route(data_type, symbol)
+        if shard_id is None:
+            return None
+        return self._global(self._backend(shard_id).head(data_type, symbol, writer), shard_id)
+
+    def get_latest(self, data_type, symbol):
+        shard_id = self._route(data_type, symbol)
+        if shard_id is None:
+            return None
+        return self._global(self._backend(shard_id).get_latest(data_type, symbol), shard_id)
+
+    def put(self, rows):
+        groups = {}
+        for row in rows:
+            groups.setdefault(self._route(row[0], row[1], create=True), []).append(row)
+        # Lock shards in id order so concurrent multi-shard puts do not deadlock
+        for shard_id, shard_rows in sorted(groups.items()):
+            self._backend(shard_id).put(shard_rows)
+
+    def touch(self, rows):
+        groups = {}
+        for data_type, symbol, version, timestamp in rows:
+            shard_id, local_id = self._split_id(version)
+            groups.setdefault(shard_id, []).append((data_type, symbol, local_id, timestamp))
+        for shard_id, shard_rows in groups.items():
+            self._backend(shard_id).touch(shard_rows)
+
+    def list_keys(self, data_type=None):
+        return sorted(
+            key for _, backend in self._shards(data_type) for key in backend.list_keys(data_type)
+        )
+
+    def summary(self, data_type=None):
+        return sorted(
+            row for _, backend in self._shards(data_type) for row in backend.summary(data_type)
+        )
+
+    def delete(self, data_type, symbol):
+        shard_id = self._route(data_type, symbol)
+        return self._backend(shard_id).delete(data_type, symbol) if shard_id is not None else 0
+
+    def scan(self, data_type, start=None, end=None):
+        scans = [
+            (self._global(stored, shard_id) for stored in backend.scan(data_type, start, end))
+            for shard_id, backend in self._shards(data_type)
+        ]
+        yield from heapq.merge(*scans, key=lambda stored: stored.symbol)
+
+    def get_latest_many(self, data_type, symbols=None):
+        if symbols is None:
+            yield from self.scan(data_type)
+            return
+
+        symbols = list(symbols)
+        for start in range(0, len(symbols), CHUNK_SIZE):
+            chunk = symbols[start:start + CHUNK_SIZE]
+            groups = {}
+            for symbol in chunk:
+                shard_id = self._route(data_type, symbol)
+                if shard_id is not None:
+                    groups.setdefault(shard_id, []).append(symbol)
+
+            found = {}
+            for shard_id, shard_symbols in groups.items():
+                for stored in self._backend(shard_id).get_latest_many(data_type, shard_symbols):
+                    found[stored.symbol] = self._global(stored, shard_id)
+            for symbol in chunk:
+                if symbol in found:
+                    yield found[symbol]
+
+    def data_version(self):
+        return self.router.data_version()
+
+    def databases(self, data_type=None):
+        if data_type is not None:
+            return [database for _, database in self.router.shards(data_type)]
+        return self.router.opened()
+
+    def database_for(self, data_type, symbol, create=True):
+        route = self.router.route(data_type, symbol, create)
+        return route[1] if route else None
+
+    def close(self):
+        self.router.close()
+        self._backends = {}
+
+    def versions(self, data_type, symbol):
+        shard_id = self._route(data_type, symbol)
+        if shard_id is None:
+            return []
+        return [self._global(stored, shard_id) for stored in self._backend(shard_id).versions(data_type, symbol)]
+
+    def get_version(self, version_id, writer=False):
+        backend, local_id, shard_id = self._local(version_id)
+        return self._global(backend.get_version(local_id, writer), shard_id)
+
+    def rewrite(self, rows):
+        groups = {}
+        for raw_data, codec, format, content_hash, base_id, version in rows:
+            shard_id, local_id = self._split_id(version)
+            local_base = self._split_id(base_id)[1] if base_id is not None else None
+            groups.setdefault(shard_id, []).append((raw_data, codec, format, content_hash, local_base, local_id))
+        for shard_id, shard_rows in groups.items():
+            self._backend(shard_id).rewrite(shard_rows)
+
+    def delete_versions(self, version_ids):
+        for shard_id, local_ids in self._by_shard(version_ids).items():
+            self._backend(shard_id).delete_versions(local_ids)
+
+    def dependents(self, version_ids):
+        return [
+            self._global(stored, shard_id)
+            for shard_id, local_ids in self._by_shard(version_ids).items()
+            for stored in self._backend(shard_id).dependents(local_ids)
+        ]
+
+    def delta_run(self, data_type, symbol, version_id):
+        backend, local_id, _ = self._local(version_id)
+        return backend.delta_run(data_type, symbol, local_id)
+
+    def iter_versions(self, after_id, limit):
+        versions = []
+        for shard_id, backend in self._shards():
+            # Smallest local id whose global id is above after_id
+            after_local = (after_id - shard_id) // SHARD_SPAN
+            versions.extend(
+                self._global(stored, shard_id) for stored in backend.iter_versions(after_local, limit)
+            )
+        versions.sort(key=lambda stored: stored.version)
+        return versions[:limit]
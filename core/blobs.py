@@ -0,0 +1,172 @@
+"""
+Blobs - Content-addressed storage for large payloads
+
+Compressed payloads above a size threshold are written to files named
+after the hash of their bytes, at <root>/<2 hex>/<2 hex>/<digest>, instead
+of into cache_data. The row keeps a reference '<digest>:<size>' and its
+codec tag gets the 'ext:' prefix (e.g. 'ext:zstd'). Identical payloads
+share one file, whichever keys and versions refer to it. Files are written
+atomically and read through a memory map, so the bytes go straight from
+the page cache to the decompressor.
+"""
+
+import os
+import mmap
+import time
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+# Prefix of the codec tag of rows whose payload is in the blob store
+EXTERNAL_PREFIX = 'ext:'
+
+# Hex characters of a blob digest
+DIGEST_LENGTH = 40
+
+def stored_size_sql(row):
+    """
+    SQL expression for the payload bytes of a cache_data row
+
+    Args:
+        row (str): Row alias ('c', 'NEW', 'OLD', ...), or '' for bare columns
+
+    Returns:
+        str: LENGTH(raw_data), or the blob size for external rows
+    """
+    prefix = f"{row}." if row else ""
+    return (
+        f"CASE WHEN {prefix}codec LIKE '{EXTERNAL_PREFIX}%' "
+        f"THEN CAST(SUBSTR({prefix}raw_data, {DIGEST_LENGTH + 2}) AS INTEGER) "
+        f"ELSE LENGTH({prefix}raw_data) END"
+    )
+
+def is_external(codec):
+    """Whether a codec tag marks a row stored in the blob store."""
+    return codec is not None and codec.startswith(EXTERNAL_PREFIX)
+
+def inner_codec(codec):
+    """Codec tag of the compressed bytes, without the 'ext:' prefix."""
+    return codec[len(EXTERNAL_PREFIX):] if is_external(codec) else codec
+
+def parse_reference(reference):
+    """
+    Split a blob reference
+
+    Returns:
+        tuple: (digest, size in bytes)
+    """
+    if isinstance(reference, (bytes, bytearray, memoryview)):
+        reference = bytes(reference).decode('ascii')
+    digest, _, size = reference.partition(':')
+    return digest, int(size)
+
+class BlobStore:
+    def __init__(self, root):
+        """
+        Args:
+            root (str): Directory of the blob files, created on first write
+        """
+        self.root = root
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def put(self, data):
+        """
+        Store compressed bytes
+
+        A blob that already exists is not written again; its modification
+        time is refreshed so collect() does not remove it before the row
+        referring to it is committed.
+
+        Args:
+            data (bytes): Compressed payload
+
+        Returns:
+            str: Reference '<digest>:<size>' to store in cache_data
+        """
+        digest = hashlib.blake2b(data, digest_size=DIGEST_LENGTH // 2).hexdigest()
+        path = self._path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        return f"{digest}:{len(data)}"
+
+    @contextmanager
+    def view(self, reference):
+        """
+        Memory-map a blob for reading
+
+        Args:
+            reference (str or bytes): Reference returned by put()
+
+        Yields:
+            mmap.mmap: Read-only map of the blob, valid inside the block
+        """
+        digest, _ = parse_reference(reference)
+        with open(self._path(digest), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                yield view
+
+    def size(self, reference):
+        """Stored bytes of a blob, read from its reference."""
+        return parse_reference(reference)[1]
+
+    def collect(self, referenced, grace=3600):
+        """
+        Delete blobs no row refers to
+
+        Args:
+            referenced (set): Digests still referenced
+            grace (float, optional): Seconds a blob is kept after its last
+                write, so blobs of uncommitted rows survive
+
+        Returns:
+            tuple: (blobs removed, bytes freed)
+        """
+        removed = freed = 0
+        if not os.path.isdir(self.root):
+            return removed, freed
+
+        cutoff = time.time() - grace
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                if name in referenced:
+                    continue
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime >= cutoff:
+                        continue
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+                freed += stat.st_size
+        return removed, freed
+
+    def stats(self):
+        """
+        Count the stored blobs
+
+        Returns:
+            tuple: (blobs, bytes)
+        """
+        count = total = 0
+        if os.path.isdir(self.root):
+            for directory, _, files in os.walk(self.root):
+                for name in files:
+                    if not name.endswith('.tmp'):
+                        count += 1
+                        total += os.path.getsize(os.path.join(directory, name))
+        return count, total
@@ -2,24 +2,190 @@
 Cache Manager - Core functionality for the Financial Data Cache system
 """
 
+import os
+import json
+import time
+import hashlib
+import atexit
+import threading
 import pandas as pd
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime, timedelta
+from core.codecs import get_codec, ZstdCodec, train_zstd_dictionary, zstandard
+from core.archive import VersionArchive, ARCHIVE_LEVELS
+from core.blobs import BlobStore, EXTERNAL_PREFIX, DIGEST_LENGTH, is_external, inner_codec, parse_reference
+from core.serializers import get_serializer, reader_for_format, JsonSerializer
+from core.series import SERIES, to_date_int, from_date_int
+from core.fields import FIELDS
+from core.deltas import make_delta, apply_delta
 from core.database import Database
+from core.backends import get_backend
+from core.memory_cache import MemoryCache
+from core.quota import QuotaLedger
+from core.rate_limiter import RateLimiter
+from core.single_flight import FetchLeases
+from core.transport import Transport
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class RetentionPolicy:
+    def __init__(self, keep_last=None, max_age_days=None, keep_monthly=False):
+        """
+        Retention rules for the stored versions of one data type
+
+        A version survives compaction if any rule keeps it. The latest version
+        of a key is always kept.
+
+        Args:
+            keep_last (int, optional): Keep the newest N versions
+            max_age_days (int, optional): Keep versions newer than this many days
+            keep_monthly (bool, optional): Keep the newest version of every month
+        """
+        self.keep_last = keep_last
+        self.max_age_days = max_age_days
+        self.keep_monthly = keep_monthly
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build a policy from a config dictionary."""
+        return cls(
+            keep_last=settings.get('keep_last'),
+            max_age_days=settings.get('max_age_days'),
+            keep_monthly=settings.get('keep_monthly', False)
+        )
+
+    def is_active(self):
+        """Whether the policy can expire anything at all."""
+        return self.keep_last is not None or self.max_age_days is not None or bool(self.keep_monthly)
+
+    def expired(self, versions, now=None):
+        """
+        Select the versions that no rule keeps
+
+        Args:
+            versions (list): (id, last_updated) tuples, newest first
+            now (datetime, optional): Reference time for max_age_days
+
+        Returns:
+            list: Ids of the expired versions
+        """
+        if not self.is_active():
+            return []
+
+        now = now or datetime.now()
+        cutoff = None
+        if self.max_age_days is not None:
+            cutoff = (now - timedelta(days=self.max_age_days)).strftime(TIMESTAMP_FORMAT)
+
+        expired = []
+        months_seen = set()
+        for position, (version_id, last_updated) in enumerate(versions):
+            month = (last_updated or "")[:7]
+            newest_of_month = month not in months_seen
+            months_seen.add(month)
+
+            if position == 0:
+                continue
+            if self.keep_last is not None and position < self.keep_last:
+                continue
+            if cutoff is not None and last_updated and last_updated >= cutoff:
+                continue
+            if self.keep_monthly and newest_of_month:
+                continue
+            expired.append(version_id)
+
+        return expired
+
+class FreshnessPolicy:
+    def __init__(self, days=None, hours=None, trading_days=None):
+        """
+        How long cached data of one data type stays fresh
+
+        Args:
+            days (float, optional): Fresh for this many calendar days
+            hours (float, optional): Fresh for this many hours (added to days)
+            trading_days (int, optional): Fresh until this many weekdays have
+                started since the last update (exchange holidays are not
+                taken into account)
+        """
+        self.days = days
+        self.hours = hours
+        self.trading_days = trading_days
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build a policy from a config dictionary."""
+        return cls(
+            days=settings.get('days'),
+            hours=settings.get('hours'),
+            trading_days=settings.get('trading_days')
+        )
+
+    def is_fresh(self, last_updated, now=None):
+        """
+        Check whether data updated at last_updated is still fresh
+
+        Args:
+            last_updated (str): Timestamp in TIMESTAMP_FORMAT
+            now (datetime, optional): Reference time
+
+        Returns:
+            bool: True if the cached data can be served without a refresh
+        """
+        now = now or datetime.now()
+        updated = datetime.strptime(last_updated, TIMESTAMP_FORMAT)
+
+        if self.trading_days is not None:
+            day = updated.date() + timedelta(days=1)
+            started = 0
+            while day <= now.date() and started < self.trading_days:
+                if day.weekday() < 5:
+                    started += 1
+                day += timedelta(days=1)
+            return started < self.trading_days
+
+        max_age = timedelta(days=self.days or 0, hours=self.hours or 0)
+        return now - updated < max_age
+
+# Used for data types without an entry in the 'freshness' config
+DEFAULT_FRESHNESS = FreshnessPolicy(days=1)
 
 class CacheManager:
-    def __init__(self, api_key, database_path=None):
+    def __init__(self, api_key, database_path=None, backend=None, blobs=None, memory_cache=None):
         """
         Initialize the cache manager
         
         Args:
             api_key (str): Financial Modeling Prep API key
             database_path (str, optional): Path to the SQLite database
+            backend (dict, optional): Payload storage settings, overriding
+                the 'backend' config (e.g. {'type': 'lmdb', 'path': 'cache_lmdb'})
+            blobs (dict, optional): Blob store settings, overriding the
+                'blobs' config (e.g. {'enabled': True, 'threshold': 262144})
+            memory_cache (dict, optional): In-process tier settings, overriding
+                the 'memory_cache' config (e.g. {'enabled': False})
         """
         from utils.config import get_config
         
         config = get_config()
         self.api_key = api_key
         self.base_url = "https://financialmodelingprep.com/api"
+
+        # Pooled HTTP session shared by every endpoint
+        http = config.get('http', {})
+        self.transport = Transport(
+            self.base_url,
+            api_key,
+            pool_size=http.get('pool_size', 10),
+            connect_timeout=http.get('connect_timeout', 5.0),
+            read_timeout=http.get('read_timeout', 30.0),
+            max_retries=http.get('max_retries', 3),
+            backoff=http.get('backoff', 0.5),
+            max_backoff=http.get('max_backoff', 30.0),
+            on_retry=self.charge_retry
+        )
         
         # Use provided database path or get from config
         if database_path:
@@ -28,8 +194,172 @@ class CacheManager:
             self.database_path = config.get('database_path', 'financial_data.db')
         
         # Initialize database
-        self.db = Database(self.database_path)
+        self.db = Database(
+            self.database_path,
+            mmap_size=config.get('sqlite_mmap_size', 268435456),
+            cache_size=config.get('sqlite_cache_size', -65536),
+            reader_pool_size=config.get('reader_pool_size', 4)
+        )
+
+        # Storage of the payloads themselves; the database above always holds
+        # the bookkeeping tables (quota, series, statistics)
+        self.backend = get_backend(backend or config.get('backend', {}), self.db)
+
+        # Compression of stored payloads
+        compression = config.get('compression', {})
+        self.codec = get_codec(compression.get('codec', 'zlib'), compression.get('level'))
+        self.use_dictionaries = bool(compression.get('dictionaries')) and zstandard is not None
+        self._codecs = {self.codec.tag: self.codec}
+        self._dictionary_codecs = {}
+
+        # Compressed payloads of at least blob_threshold bytes are stored once
+        # per content in the blob store, outside the SQLite files; lmdb and
+        # filesystem backends keep every payload outside SQLite already
+        blobs = blobs or config.get('blobs', {})
+        self.blobs = None
+        self.blob_threshold = None
+        if self.backend.name == 'sqlite' and (blobs.get('path') or not self.db.in_memory):
+            self.blobs = BlobStore(
+                blobs.get('path') or os.path.splitext(self.database_path)[0] + '_blobs'
+            )
+            if blobs.get('enabled'):
+                self.blob_threshold = blobs.get('threshold', 262144)
+
+        # Wire format of stored payloads, tagged per row
+        self.serializer = get_serializer(config.get('serializer', 'auto'))
+        self._fallback_serializer = JsonSerializer()
+        self._readers = {}
+
+        # Older versions stored as deltas against the next newer version, with
+        # a full snapshot kept every snapshot_every versions
+        deltas = config.get('version_deltas', {})
+        self.use_deltas = deltas.get('enabled', False) and self.backend.supports_history
+        self.snapshot_every = max(1, deltas.get('snapshot_every', 10))
+        self.delta_max_ratio = deltas.get('max_ratio', 0.5)
+
+        # Optional in-process tier holding decoded payloads
+        memory = memory_cache or config.get('memory_cache', {})
+        self.memory = None
+        if memory.get('enabled'):
+            self.memory = MemoryCache(
+                memory.get('max_bytes', 67108864),
+                policy=memory.get('policy', 'tinylfu')
+            )
+            self._data_version = self.backend.data_version()
+
+        # API request counts, buffered in memory and persisted in batches
+        self.quota = QuotaLedger(
+            self.db,
+            flush_every=config.get('quota_flush_every', 10),
+            flush_interval=config.get('quota_flush_interval', 1.0)
+        )
+        atexit.register(self.flush_quota)
+
+        # Refresh statistics and read counts, buffered like the quota so reads
+        # never write. They are flushed with each commit, except with a
+        # sharded backend: there a background thread flushes them, so writes
+        # to shards never take the main database's write lock
+        self._counter_lock = threading.Lock()
+        self._refresh_counts = {}
+        self._hits = {}
+        self._counter_wakeup = threading.Event()
+        self._counter_stop = threading.Event()
+        self._counter_thread = None
+        if self.backend.sharded:
+            self.start_counter_flush(self.quota.flush_interval)
+
+        # Request budgets shared by every process using the same state file;
+        # it is not the cache database, whose write lock a batch() may hold
+        limits = config.get('rate_limits', {})
+        self.daily_limit = limits.get('per_day', 250)
+        self.rate_limit_timeout = config.get('rate_limit_timeout', 30)
+        self.rate_limiter = RateLimiter(
+            config.get('rate_limit_path') or self._state_path('.ratelimit'),
+            per_second=limits.get('per_second'),
+            per_minute=limits.get('per_minute'),
+            per_day=self.daily_limit,
+            reserve_floor=limits.get('reserve_floor', 0)
+        )
+
+        # Concurrent fetches of one key share a single API call: threads wait
+        # on the first caller's future, other processes on its lease
+        self.fetch_lease_ttl = config.get('fetch_lease_ttl', 30)
+        self.leases = FetchLeases(self._state_path('.leases'))
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+        # Threads decoding payloads in get_latest_many(); decompression runs
+        # without the GIL, so more threads than cores would not help
+        self.bulk_read_workers = max(1, config.get('bulk_read_workers') or min(4, os.cpu_count() or 1))
+
+        # Writes inside batch() share one commit, optionally flushed every
+        # group_commit_interval seconds
+        self.group_commit_interval = config.get('group_commit_interval', 0)
+        self._batches = threading.local()
+
+        # Per-data_type freshness rules applied by get_or_fetch()
+        self.freshness = {
+            data_type: FreshnessPolicy.from_config(settings)
+            for data_type, settings in config.get('freshness', {}).items()
+        }
+
+        # Per-data_type retention rules applied by compact()
+        self.retention = {
+            data_type: RetentionPolicy.from_config(settings)
+            for data_type, settings in config.get('retention', {}).items()
+        }
+
+        # Optional cold archive receiving superseded versions, so the cache
+        # database only holds recent history
+        archive = config.get('archive', {})
+        self.archive = None
+        if archive.get('enabled') and self.backend.supports_history and not self.db.in_memory:
+            self.archive = VersionArchive(
+                archive.get('path') or os.path.splitext(self.database_path)[0] + '_archive.db'
+            )
+        self.archive_after_days = archive.get('after_days', 90)
+        archive_codec = get_codec(archive.get('codec', 'zstd'))
+        level = archive.get('level')
+        self.archive_codec = get_codec(
+            archive_codec.name, level if level is not None else ARCHIVE_LEVELS[archive_codec.name]
+        )
+
+        self._compaction_stop = threading.Event()
+        self._compaction_thread = None
+        compaction_interval = config.get('compaction_interval', 3600)
+        if (compaction_interval and self.backend.supports_history
+                and (self.archive is not None or self.blob_threshold is not None
+                     or any(p.is_active() for p in self.retention.values()))):
+            self.start_compaction(compaction_interval)
+
+        # Size budget enforced by evicting whole keys, lowest
+        # GreedyDual-Size-Frequency priority first
+        eviction = config.get('eviction', {})
+        self.max_cache_bytes = eviction.get('max_cache_bytes')
+        self.eviction_low_water = eviction.get('low_water', 0.9)
+        self.eviction_batch_size = eviction.get('batch_size', 100)
+        self.refetch_costs = eviction.get('refetch_costs', {})
+        self.watchlist = set(eviction.get('watchlist', []))
+        self._cache_bytes = None
+        self._eviction_wakeup = threading.Event()
+        self._eviction_stop = threading.Event()
+        self._eviction_thread = None
+        if self.max_cache_bytes:
+            self.start_eviction(eviction.get('interval', 300))
     
+    def _state_path(self, suffix):
+        """
+        Path of a state file kept next to the cache database
+
+        Cross-process state is written on its own connections while the
+        calling thread may hold the cache database's write lock inside
+        batch(), so it lives in a separate file. An in-memory cache keeps
+        the state private to this process.
+        """
+        if self.db.in_memory:
+            return self.database_path
+        return self.database_path + suffix
+
     def track_api_request(self, endpoint):
         """
         Track an API request to monitor daily usage
@@ -37,56 +367,164 @@ class CacheManager:
         Args:
             endpoint (str): API endpoint being accessed
         """
-        today = datetime.now().strftime("%Y-%m-%d")
-        self.db.execute(
-            "SELECT count FROM api_requests WHERE endpoint=? AND date=?", 
-            (endpoint, today)
-        )
-        result = self.db.fetchone()
-        
-        if result:
-            count = result[0] + 1
-            self.db.execute(
-                "UPDATE api_requests SET count=? WHERE endpoint=? AND date=?", 
-                (count, endpoint, today)
-            )
-        else:
-            self.db.execute(
-                "INSERT INTO api_requests (endpoint, date, count) VALUES (?, ?, ?)", 
-                (endpoint, today, 1)
-            )
-        
-        self.db.commit()
+        self.quota.record(endpoint)
+        if self.quota.due():
+            if self.backend.sharded:
+                self._counter_wakeup.set()
+            else:
+                self._commit()
+
+    def charge_retry(self, endpoint):
+        """
+        Account for a failed API attempt before it is retried
+
+        The failed attempt counts towards the daily usage, and the retry
+        needs rate-limiter budget of its own, like any other request.
+
+        Args:
+            endpoint (str): API endpoint being retried
+
+        Returns:
+            bool: True if the retry may be sent
+        """
+        self.track_api_request(endpoint)
+        return not self.check_api_limit_reached() and self.acquire_api_budget()
+
+    def flush_quota(self):
+        """Persist buffered API request counts and cache statistics immediately."""
+        if self._flush_counters():
+            self.db.commit()
     
     def get_daily_request_count(self):
         """Get the count of API requests made today."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        self.db.execute(
-            "SELECT SUM(count) FROM api_requests WHERE date=?", 
-            (today,)
-        )
-        result = self.db.fetchone()
-        
-        return result[0] if result and result[0] else 0
+        return self.quota.total()
     
     def check_api_limit_reached(self):
         """Check if the daily API limit has been reached."""
+        if not self.daily_limit:
+            return False
         daily_count = self.get_daily_request_count()
-        return daily_count >= 250
+        return daily_count >= self.daily_limit
+
+    def acquire_api_budget(self, n=1, timeout=None, reservation=None):
+        """
+        Wait for the rate limiter to allow n API requests
+
+        Args:
+            n (int, optional): Number of requests about to be made
+            timeout (float, optional): Seconds to wait, rate_limit_timeout if omitted
+            reservation (str, optional): Draw the day budget from this reservation
+
+        Returns:
+            bool: True if the requests may be made
+        """
+        if timeout is None:
+            timeout = self.rate_limit_timeout
+        return self.rate_limiter.acquire(n, timeout=timeout, reservation=reservation)
     
-    def get_cache_summary(self):
-        """Get a summary of all cached data."""
-        query = """
-        SELECT 
-            data_type, 
-            symbol, 
-            MAX(last_updated) as last_updated,
-            COUNT(*) as data_points
-        FROM cache_data
-        GROUP BY data_type, symbol
+    def get_cache_summary(self, data_type=None):
         """
-        
-        return pd.read_sql_query(query, self.db.conn)
+        Get a summary of all cached data
+
+        Args:
+            data_type (str, optional): Only summarize this data type (the
+                data_type column is then left out)
+
+        Read from the cache_stats table maintained on write, never from the
+        payloads themselves.
+
+        Returns:
+            pandas.DataFrame: data_type, symbol, last_updated, data_points
+                (the number of stored versions), stored_bytes and hits (reads
+                served) per key
+        """
+        columns = ['data_type', 'symbol', 'last_updated', 'data_points', 'stored_bytes']
+        summary = pd.DataFrame(self.backend.summary(data_type), columns=columns)
+
+        query = "SELECT data_type, symbol, hits FROM cache_hits"
+        params = ()
+        if data_type is not None:
+            query += " WHERE data_type=?"
+            params = (data_type,)
+        with self.db.reader() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        # Reads not flushed yet are added to the stored counts
+        hits = {(row[0], row[1]): row[2] for row in rows}
+        with self._counter_lock:
+            for key, count in self._hits.items():
+                hits[key] = hits.get(key, 0) + count
+        hits = pd.DataFrame(
+            [key + (count,) for key, count in hits.items()],
+            columns=['data_type', 'symbol', 'hits']
+        )
+        summary = summary.merge(hits, on=['data_type', 'symbol'], how='left')
+        summary['hits'] = summary['hits'].fillna(0).astype(int)
+
+        if data_type is not None:
+            summary = summary.drop(columns='data_type')
+        return summary
+
+    def storage_stats(self):
+        """
+        Get the stored size of every data type and of every table
+
+        Returns:
+            tuple: (DataFrame of data_type, keys, versions and stored_bytes,
+                DataFrame of database, table and bytes from SQLite's dbstat)
+        """
+        summary = self.get_cache_summary()
+        by_type = summary.groupby('data_type', as_index=False).agg(
+            keys=('symbol', 'count'),
+            versions=('data_points', 'sum'),
+            stored_bytes=('stored_bytes', 'sum')
+        ).sort_values('stored_bytes', ascending=False)
+
+        tables = [
+            (os.path.basename(database.database_path), name, size)
+            for database in self._databases()
+            for name, size in database.table_sizes()
+        ]
+        return by_type, pd.DataFrame(tables, columns=['database', 'table', 'bytes'])
+
+    def list_symbols(self, data_type):
+        """
+        List the symbols cached for a data type
+
+        Returns:
+            list: Sorted symbols
+        """
+        return [symbol for _, symbol in self.backend.list_keys(data_type)]
+
+    def delete_data(self, data_type, symbol):
+        """
+        Delete every cached version of a key
+
+        Returns:
+            int: Number of versions deleted
+        """
+        deleted = self.backend.delete(data_type, symbol)
+        index_db = self._index_db(data_type, symbol, create=False)
+        if data_type in SERIES and index_db is not None:
+            index_db.execute(
+                f"""
+                DELETE FROM {SERIES[data_type].table}
+                WHERE symbol_id = (SELECT id FROM series_symbols WHERE symbol=?)
+                """,
+                (symbol,)
+            )
+        if data_type in FIELDS and index_db is not None:
+            index_db.execute(
+                f"DELETE FROM {FIELDS[data_type].table} WHERE symbol=?", (symbol,)
+            )
+        with self._counter_lock:
+            self._hits.pop((data_type, symbol), None)
+        self.db.execute("DELETE FROM cache_hits WHERE data_type=? AND symbol=?", (data_type, symbol))
+        self._commit()
+
+        if self.memory is not None:
+            self.memory.invalidate((data_type, symbol))
+        return deleted
     
     def get_cached_data(self, data_type, symbol):
         """
@@ -97,33 +535,1530 @@ class CacheManager:
             symbol (str): Stock symbol
             
         Returns:
-            dict: Cached data or None if not found
+            dict: Cached data or None if not found. Payloads served from the
+                memory tier are shared between callers and must not be modified.
         """
-        self.db.execute(
-            "SELECT raw_data FROM cache_data WHERE data_type=? AND symbol=? ORDER BY last_updated DESC LIMIT 1", 
-            (data_type, symbol)
+        key = (data_type, symbol)
+        generation = None
+        if self.memory is not None:
+            generation = self._memory_generation()
+            entry = self.memory.get(key)
+            if entry is not None:
+                if entry.generation == generation or self._revalidate(key, entry, generation):
+                    self._record_hit(key)
+                    return entry.value
+                self.memory.record_miss(key)
+
+        stored = self.backend.get_latest(data_type, symbol)
+        if stored is None or not stored.raw_data:
+            return None
+
+        serialized = self._decompress(stored.raw_data, stored.codec)
+        data = self._deserialize(serialized, stored.format)
+        if self.memory is not None:
+            self.memory.put(key, data, len(serialized), stored.version, generation)
+        self._record_hit(key)
+        return data
+
+    def _record_hit(self, key):
+        """Count a read served for a key; flushed to cache_hits with the next commit."""
+        with self._counter_lock:
+            self._hits[key] = self._hits.get(key, 0) + 1
+
+    def get_latest_many(self, data_type, symbols=None, workers=None, chunk_size=256):
+        """
+        Stream the latest cached payloads of many symbols
+
+        Stored versions are read in bulk (one query per few hundred symbols
+        with SQLite) and decoded chunk by chunk, in parallel on a thread pool
+        when workers > 1. Decompression releases the GIL, so large exports
+        scale with the number of workers. The memory tier is bypassed.
+
+        Args:
+            data_type (str): Type of data
+            symbols (iterable, optional): Symbols to read; every cached
+                symbol if omitted
+            workers (int, optional): Decoding threads, by default the
+                bulk_read_workers config (1 decodes inline)
+            chunk_size (int, optional): Payloads decoded per chunk
+
+        Yields:
+            tuple: (symbol, payload) in symbol order when symbols is omitted,
+                otherwise in the order given; symbols that are not cached
+                are skipped
+        """
+        workers = self.bulk_read_workers if workers is None else workers
+        stored_versions = (
+            stored for stored in self.backend.get_latest_many(data_type, symbols)
+            if stored.raw_data
         )
-        result = self.db.fetchone()
-        
-        if result and result[0]:
-            import json
-            return json.loads(result[0])
-        return None
+
+        def decode(stored):
+            return self._decode(stored.raw_data, stored.codec, stored.format)
+
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while True:
+                chunk = list(islice(stored_versions, chunk_size))
+                if not chunk:
+                    return
+                payloads = executor.map(decode, chunk) if executor else map(decode, chunk)
+                for stored, data in zip(chunk, payloads):
+                    self._record_hit((data_type, stored.symbol))
+                    yield stored.symbol, data
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_last_updated(self, data_type, symbol):
+        """
+        Get when the latest cached version of a key was stored
+
+        Returns:
+            str: Timestamp in TIMESTAMP_FORMAT, or None if nothing is cached
+        """
+        head = self.backend.head(data_type, symbol)
+        return head.last_updated if head else None
+
+    def is_fresh(self, data_type, symbol):
+        """Check whether the cached data of a key is within its freshness policy."""
+        last_updated = self.get_last_updated(data_type, symbol)
+        if last_updated is None:
+            return False
+        return self.freshness.get(data_type, DEFAULT_FRESHNESS).is_fresh(last_updated)
+
+    def get_or_fetch(self, data_type, symbol, fetch, force=False, params=None):
+        """
+        Return fresh cached data, fetching from the API when it is stale
+
+        Stale or missing data is fetched with fetch() unless the daily API
+        limit has been reached or the rate limiter does not allow a request
+        within rate_limit_timeout seconds. If the fetch fails, any cached
+        (stale) data is returned instead.
+
+        Concurrent calls for the same key make a single fetch: other threads
+        wait for the first caller's result, and other processes wait for its
+        lease and then read what it stored.
+
+        Args:
+            data_type (str): Type of data (e.g., 'esg', 'profile')
+            symbol (str): Stock symbol
+            fetch (callable): Returns the payload from the API, or None on failure
+            force (bool, optional): Fetch even if the cached data is fresh
+            params (dict, optional): Request parameters distinguishing fetches
+                of the same key
+
+        Returns:
+            The payload, or None if nothing is cached and the fetch failed
+        """
+        if not force and self.is_fresh(data_type, symbol):
+            return self.get_cached_data(data_type, symbol)
+
+        key = self.flight_key(data_type, symbol, params)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            data = self._fetch_once(key, fetch)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+        future.set_result(data)
+        return data
+
+    @staticmethod
+    def flight_key(data_type, symbol, params=None):
+        """Key identifying one fetch for single-flight purposes."""
+        return (data_type, symbol, json.dumps(params, sort_keys=True) if params else "")
+
+    def _fetch_once(self, key, fetch):
+        """
+        Fetch and store a key under its cross-process lease
+
+        If another process holds the lease, wait for it; once it is released,
+        serve what that process stored, or take over if it stored nothing.
+        A refresh with an unchanged payload keeps the version and only
+        bumps last_updated and last_verified, so those are compared too.
+        """
+        data_type, symbol = key[:2]
+        before = self.head_stamp(data_type, symbol)
+
+        while True:
+            owner = self.leases.acquire(key, self.fetch_lease_ttl)
+            if owner is not None:
+                break
+            self.leases.wait(key, self.fetch_lease_ttl)
+            if self.head_stamp(data_type, symbol) != before:
+                return self.get_cached_data(data_type, symbol)
+
+        try:
+            # Another process may have stored the key just before we got the lease
+            if self.head_stamp(data_type, symbol) != before:
+                return self.get_cached_data(data_type, symbol)
+
+            if self.check_api_limit_reached() or not self.acquire_api_budget():
+                return self.get_cached_data(data_type, symbol)
+
+            data = fetch()
+            if data:
+                self.save_data(data_type, symbol, data)
+                return data
+
+            return self.get_cached_data(data_type, symbol)
+        finally:
+            self.leases.release(key, owner)
+
+    def head_stamp(self, data_type, symbol):
+        """
+        Identify the latest stored state of a key
+
+        Returns:
+            tuple: (version, last_updated, last_verified), or None if nothing
+                is cached; it changes whenever the key is saved, including
+                saves of an unchanged payload
+        """
+        head = self.backend.head(data_type, symbol)
+        return (head.version, head.last_updated, head.last_verified) if head else None
+
+    def get_latest_version(self, data_type, symbol):
+        """
+        Get the version identifier of the latest version of a key
+
+        Returns:
+            int: The identifier (the cache_data id with the sqlite backend),
+                or None if nothing is cached
+        """
+        head = self.backend.head(data_type, symbol)
+        return head.version if head else None
+
+    def _memory_generation(self):
+        """
+        Advance the memory tier's generation when the storage has changed
+
+        Any commit by another connection or process changes the backend's
+        data version (PRAGMA data_version with SQLite); entries from older
+        generations are then revalidated against the latest version before
+        they are served. Backends without a data version revalidate always.
+        """
+        version = self.backend.data_version()
+        if version is None or version != self._data_version:
+            self._data_version = version
+            return self.memory.advance_generation()
+        return self.memory.generation
+
+    def _revalidate(self, key, entry, generation):
+        """Check that a held payload is still the latest version of its key."""
+        if self.get_latest_version(*key) != entry.version:
+            return False
+        entry.generation = generation
+        return True
+
+    def memory_stats(self):
+        """
+        Get memory tier counters
+
+        Returns:
+            dict: hits, misses, evictions, rejections, entries and bytes,
+                or None when the memory tier is disabled
+        """
+        return self.memory.stats() if self.memory is not None else None
     
     def save_data(self, data_type, symbol, data):
         """
         Save data to the cache
+
+        If the payload is identical to the latest cached version, no new
+        version is stored; the latest one is marked as verified now instead.
         
         Args:
             data_type (str): Type of data (e.g., 'esg', 'profile')
             symbol (str): Stock symbol
             data (dict): Data to save
         """
-        import json
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        self.db.execute(
-            "INSERT INTO cache_data (data_type, symbol, last_updated, raw_data) VALUES (?, ?, ?, ?)",
-            (data_type, symbol, now, json.dumps(data))
+        self.save_many([(data_type, symbol, data)])
+
+    def save_many(self, records):
+        """
+        Save many payloads in one transaction
+
+        Payloads are encoded and hashed first. Payloads identical to the
+        latest version of their key only bump its last_updated and
+        last_verified; the rest are handed to the backend in one put().
+        Inside batch() the commit is deferred to the batch.
+
+        Args:
+            records (iterable): (data_type, symbol, data) tuples
+        """
+        now = datetime.now().strftime(TIMESTAMP_FORMAT)
+        records = list(records)
+        if not records:
+            return
+
+        rows = []
+        changed = []
+        unchanged = []
+        refreshes = {}
+        pending = {}
+        previous = {}
+        for data_type, symbol, data in records:
+            raw_data, codec, format, content_hash = self._encode(data_type, data)
+            stats = refreshes.setdefault(data_type, [0, 0])
+
+            # A key repeated within the call compares against its pending row
+            if (data_type, symbol) in pending:
+                stats[0] += 1
+                if pending[(data_type, symbol)] == content_hash:
+                    stats[1] += 1
+                    continue
+                latest = None
+            else:
+                latest = self.backend.head(data_type, symbol, writer=True)
+                # Only keys with an earlier version count as refreshes
+                if latest is not None:
+                    stats[0] += 1
+                    if latest.content_hash == content_hash:
+                        stats[1] += 1
+                        unchanged.append((data_type, symbol, latest.version, now))
+                        continue
+
+            if (data_type, symbol) in pending:
+                # Repeated keys keep full copies; only the stored latest is delta-encoded
+                previous[(data_type, symbol)] = None
+            elif latest is not None:
+                previous[(data_type, symbol)] = latest.version
+            pending[(data_type, symbol)] = content_hash
+            rows.append((data_type, symbol, now, raw_data, codec, format, content_hash))
+            changed.append((data_type, symbol, data))
+
+        if rows:
+            self.backend.put(rows)
+        if unchanged:
+            self.backend.touch(unchanged)
+        with self._counter_lock:
+            for data_type, (total, same) in refreshes.items():
+                if not total:
+                    continue
+                counts = self._refresh_counts.setdefault(data_type, [0, 0])
+                counts[0] += total
+                counts[1] += same
+            # Writes are uses for eviction purposes, but not reads
+            for key in pending:
+                self._hits.setdefault(key, 0)
+            for data_type, symbol, _, _ in unchanged:
+                self._hits.setdefault((data_type, symbol), 0)
+            if self._cache_bytes is not None:
+                self._cache_bytes += sum(self._stored_size(row[3], row[4]) for row in rows)
+        for data_type, symbol, data in changed:
+            if data_type in SERIES:
+                self._index_series(data_type, symbol, data)
+            if data_type in FIELDS:
+                self._index_fields(data_type, symbol, data)
+            if self.use_deltas and previous.get((data_type, symbol)):
+                self._delta_encode(previous[(data_type, symbol)], data)
+        self._commit()
+
+        if self.max_cache_bytes and (self._cache_bytes or 0) > self.max_cache_bytes:
+            self._eviction_wakeup.set()
+
+        # Unchanged keys keep their version, so their memory entries stay valid
+        if self.memory is not None:
+            for data_type, symbol, _ in changed:
+                self.memory.invalidate((data_type, symbol))
+
+    def _delta_encode(self, version_id, newer):
+        """
+        Replace a version that was just superseded with a delta
+
+        The version is kept whole if it completes a run of snapshot_every
+        versions, or if the delta would not be much smaller. Runs inside the
+        caller's transaction.
+
+        Args:
+            version_id (int): The previous latest version of a key
+            newer: Payload of the version that superseded it
+        """
+        stored = self.backend.get_version(version_id, writer=True)
+        if stored is None or stored.base_id is not None or stored.raw_data is None:
+            return
+
+        # Deltas since the last full version older than this one
+        run = self.backend.delta_run(stored.data_type, stored.symbol, version_id)
+        if run + 1 >= self.snapshot_every:
+            return
+
+        delta = make_delta(self._decode(stored.raw_data, stored.codec, stored.format), newer)
+        if delta is None:
+            return
+
+        delta_data, delta_codec, delta_format, _ = self._encode(stored.data_type, delta)
+        full_size = self._stored_size(stored.raw_data, stored.codec)
+        if self._stored_size(delta_data, delta_codec) > full_size * self.delta_max_ratio:
+            return
+
+        newer_id = self.backend.head(stored.data_type, stored.symbol, writer=True).version
+        self.backend.rewrite([(delta_data, delta_codec, delta_format, None, newer_id, version_id)])
+
+    def _rebuild(self, version_id, writer=False):
+        """
+        Decode any stored version, following its delta chain
+
+        Args:
+            version_id (int): cache_data id
+            writer (bool, optional): Read through the calling thread's
+                connection, inside its transaction
+
+        Returns:
+            The payload, or None if the version does not exist
+        """
+        chain = []
+        base_id = version_id
+        while base_id is not None:
+            stored = self.backend.get_version(base_id, writer=writer)
+            if stored is None:
+                return None
+            chain.append(stored)
+            base_id = stored.base_id
+
+        full = chain.pop()
+        data = self._decode(full.raw_data, full.codec, full.format)
+        while chain:
+            stored = chain.pop()
+            data = apply_delta(data, self._decode(stored.raw_data, stored.codec, stored.format))
+        return data
+
+    def get_version(self, version_id):
+        """
+        Get the payload of any stored version
+
+        Versions stored as deltas are rebuilt from the newer versions they
+        refer to, and archived versions are read from the archive. Backends
+        without history only hold the latest version.
+
+        Args:
+            version_id (int): Version identifier, as listed by list_versions()
+
+        Returns:
+            The payload, or None if the version does not exist
+        """
+        if self.backend.supports_history:
+            data = self._rebuild(version_id)
+            if data is None and self.archive is not None:
+                archived = self.archive.get_version(version_id)
+                if archived is not None:
+                    raw_data, codec, format = archived[5:8]
+                    data = self._decode(raw_data, codec, format)
+            return data
+
+        for data_type, symbol in self.backend.list_keys():
+            stored = self.backend.head(data_type, symbol)
+            if stored is not None and stored.version == version_id:
+                return self.get_cached_data(data_type, symbol)
+        return None
+
+    def list_versions(self, data_type, symbol):
+        """
+        List the stored versions of a key, newest first
+
+        Returns:
+            pandas.DataFrame: id, last_updated, last_verified, stored_bytes,
+                is_delta and archived for every version, including the ones
+                moved to the archive
+        """
+        if self.backend.supports_history:
+            versions = self.backend.versions(data_type, symbol)
+        else:
+            head = self.backend.head(data_type, symbol)
+            versions = [head] if head else []
+
+        rows = [
+            (v.version, v.last_updated, v.last_verified, v.size, v.base_id is not None, False)
+            for v in versions
+        ]
+        if self.archive is not None:
+            rows.extend(
+                (version_id, last_updated, last_verified, size, False, True)
+                for version_id, last_updated, last_verified, size in self.archive.versions(data_type, symbol)
+            )
+
+        return pd.DataFrame(
+            sorted(rows, key=lambda row: row[0], reverse=True),
+            columns=['id', 'last_updated', 'last_verified', 'stored_bytes', 'is_delta', 'archived']
         )
-        self.db.commit()
+
+    def refresh_stats(self):
+        """
+        Get how often refreshes returned data identical to the cached version
+
+        A refresh is a save of a key that already had a version; the first
+        save of a key is not counted.
+
+        Returns:
+            pandas.DataFrame: data_type, refreshes, unchanged and
+                unchanged_ratio, highest ratio first
+        """
+        query = """
+        SELECT
+            data_type,
+            refreshes,
+            unchanged,
+            ROUND(CAST(unchanged AS REAL) / refreshes, 3) AS unchanged_ratio
+        FROM refresh_stats
+        WHERE refreshes > 0
+        ORDER BY unchanged_ratio DESC, data_type
+        """
+
+        with self.db.reader() as conn:
+            return pd.read_sql_query(query, conn)
+
+    @contextmanager
+    def batch(self):
+        """
+        Group writes made by the calling thread into one transaction
+
+        save_data, save_many and track_api_request calls inside the block
+        share a single commit at the end of the outermost batch. With a
+        group_commit_interval set, the batch also commits whenever that many
+        seconds have passed since its last commit. An exception rolls back
+        everything not yet committed.
+        """
+        state = self._batch_state()
+        if state.depth == 0:
+            state.last_commit = time.monotonic()
+        state.depth += 1
+
+        try:
+            yield self
+        except BaseException:
+            state.depth -= 1
+            if state.depth == 0:
+                for database in self._databases():
+                    database.conn.rollback()
+            raise
+
+        state.depth -= 1
+        if state.depth == 0:
+            self._commit_now()
+
+    def _batch_state(self):
+        """Per-thread batch nesting depth and time of the last group commit."""
+        state = self._batches
+        if not hasattr(state, 'depth'):
+            state.depth = 0
+            state.last_commit = 0.0
+        return state
+
+    def _commit(self):
+        """Commit now, or leave it to the enclosing batch."""
+        state = self._batch_state()
+        if state.depth == 0:
+            self._commit_now()
+            return
+
+        if self.group_commit_interval and time.monotonic() - state.last_commit >= self.group_commit_interval:
+            self._commit_now()
+            state.last_commit = time.monotonic()
+
+    def _commit_now(self):
+        """
+        Commit the calling thread's writes to every database
+
+        Buffered counters are flushed into the same transaction, unless a
+        sharded backend leaves them to the counter flush thread.
+        """
+        if not self.backend.sharded:
+            self._flush_counters()
+        self._commit_all()
+
+    def _flush_counters(self):
+        """
+        Write buffered API request counts, refresh statistics and read
+        counts on this thread's connection
+
+        If a write fails, the counts are buffered again and the caller
+        rolls back.
+
+        Returns:
+            bool: True if anything was written
+        """
+        with self._counter_lock:
+            counts, self._refresh_counts = self._refresh_counts, {}
+            hits, self._hits = self._hits, {}
+        try:
+            self._write_counters(counts, hits)
+            written = self.quota.flush()
+        except BaseException:
+            with self._counter_lock:
+                for data_type, (total, same) in counts.items():
+                    buffered = self._refresh_counts.setdefault(data_type, [0, 0])
+                    buffered[0] += total
+                    buffered[1] += same
+                for key, count in hits.items():
+                    self._hits[key] = self._hits.get(key, 0) + count
+            raise
+        return bool(written or hits or counts)
+
+    def _write_counters(self, counts, hits):
+        """Write refresh statistics and read counts on this thread's connection."""
+        if hits:
+            # Every use also moves the key's eviction clock up to the current one
+            self.db.cursor.executemany(
+                """
+                INSERT INTO cache_hits (data_type, symbol, hits, clock)
+                VALUES (?, ?, ?, (SELECT clock FROM cache_clock))
+                ON CONFLICT (data_type, symbol) DO UPDATE SET
+                    hits = hits + excluded.hits,
+                    clock = excluded.clock
+                """,
+                [(data_type, symbol, count) for (data_type, symbol), count in hits.items()]
+            )
+        if counts:
+            self.db.cursor.executemany(
+                """
+                INSERT INTO refresh_stats (data_type, refreshes, unchanged) VALUES (?, ?, ?)
+                ON CONFLICT (data_type) DO UPDATE SET
+                    refreshes = refreshes + excluded.refreshes,
+                    unchanged = unchanged + excluded.unchanged
+                """,
+                [(data_type, total, same) for data_type, (total, same) in counts.items()]
+            )
+
+    def _databases(self):
+        """The cache database followed by any shard databases of the backend."""
+        return [self.db] + self.backend.databases()
+
+    def _commit_all(self):
+        """Commit the calling thread's writes to every database, shards first."""
+        for database in reversed(self._databases()):
+            database.commit()
+
+    def incremental_vacuum(self):
+        """
+        Return free pages of every database to the filesystem, one file at a time
+
+        Returns:
+            int: Number of pages released
+        """
+        return sum(database.incremental_vacuum() for database in self._databases())
+
+    def enable_incremental_vacuum(self):
+        """
+        Switch every database to auto_vacuum=INCREMENTAL, one file at a time
+
+        Returns:
+            bool: True if any database had to be rebuilt
+        """
+        rebuilt = [database.enable_incremental_vacuum() for database in self._databases()]
+        return any(rebuilt)
+
+    def _index_series(self, data_type, symbol, data):
+        """
+        Replace the typed series rows of a symbol with the rows of a payload
+
+        Runs inside the caller's transaction.
+        """
+        series = SERIES[data_type]
+        db = self._index_db(data_type, symbol)
+        db.execute("INSERT OR IGNORE INTO series_symbols (symbol) VALUES (?)", (symbol,))
+        symbol_id = db.execute(
+            "SELECT id FROM series_symbols WHERE symbol=?", (symbol,)
+        ).fetchone()[0]
+
+        db.execute(f"DELETE FROM {series.table} WHERE symbol_id=?", (symbol_id,))
+        if isinstance(data, list):
+            db.cursor.executemany(series.insert_sql(), series.rows(symbol_id, data))
+
+    def _index_fields(self, data_type, symbol, data):
+        """
+        Replace the hot-field row of a symbol with the fields of a payload
+
+        Runs inside the caller's transaction.
+        """
+        fields = FIELDS[data_type]
+        self._index_db(data_type, symbol).execute(fields.upsert_sql(), fields.row(symbol, data))
+
+    def index_fields(self, data_type):
+        """
+        Fill in hot-field rows for cached payloads that have none
+
+        Payloads cached before a data type had hot fields are only indexed
+        here; query() calls it when rows are missing.
+
+        Args:
+            data_type (str): A data type with hot fields
+
+        Returns:
+            int: Number of payloads indexed
+        """
+        table = FIELDS[data_type].table
+        indexed = set()
+        for database in self._field_databases(data_type):
+            with database.reader() as conn:
+                indexed.update(row[0] for row in conn.execute(f"SELECT symbol FROM {table}"))
+
+        missing = [symbol for symbol in self.list_symbols(data_type) if symbol not in indexed]
+        for symbol in missing:
+            data = self.get_cached_data(data_type, symbol)
+            if data is not None:
+                self._index_fields(data_type, symbol, data)
+        self._commit_all()
+        return len(missing)
+
+    def query(self, data_type, where=None, order_by=None, limit=None):
+        """
+        Select cached symbols by indexed fields, without decoding payloads
+
+        Only the hot fields listed in core.fields can be filtered on; they
+        hold the values of the newest record of each symbol's payload.
+
+        Example:
+            cache.query("ratios", where={'priceEarningsRatio': ('<', 15)},
+                        order_by='-returnOnEquity', limit=20)
+
+        Args:
+            data_type (str): A data type with hot fields (e.g. 'ratios', 'profile')
+            where (dict, optional): Field -> value for equality, or field ->
+                (operator, value) with =, !=, <, <=, >, >=, LIKE or IN
+            order_by (str, optional): Field to sort by, '-' prefixed for descending
+            limit (int, optional): Maximum number of symbols
+
+        Returns:
+            pandas.DataFrame: symbol plus every hot field of the data type
+        """
+        if data_type not in FIELDS:
+            raise ValueError(f"'{data_type}' has no indexed fields")
+
+        table = FIELDS[data_type].table
+        sql, params, fields = FIELDS[data_type].select_sql(where, order_by, limit)
+        databases = self._field_databases(data_type)
+        indexed = 0
+        for database in databases:
+            with database.reader() as conn:
+                indexed += conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if indexed < len(self.backend.list_keys(data_type)):
+            self.index_fields(data_type)
+
+        frames = []
+        for database in databases:
+            with database.reader() as conn:
+                frames.append(pd.DataFrame(conn.execute(sql, params).fetchall(), columns=['symbol'] + fields))
+        result = pd.concat(frames, ignore_index=True)
+
+        # Shards are queried separately; sort and limit their union again
+        if len(frames) > 1:
+            if order_by:
+                result = result.sort_values(
+                    [order_by.lstrip('-'), 'symbol'],
+                    ascending=[not order_by.startswith('-'), True],
+                    na_position='last'
+                )
+            else:
+                result = result.sort_values('symbol')
+            if limit is not None:
+                result = result.head(limit)
+            result = result.reset_index(drop=True)
+        return result
+
+    def _field_databases(self, data_type):
+        """Databases that may hold hot-field rows of a data type."""
+        return self.backend.databases(data_type) or [self.db]
+
+    def _index_db(self, data_type, symbol, create=True):
+        """
+        The database holding the series and field rows of a key (its shard,
+        if sharded), or None if its shard does not exist and create is unset
+        """
+        if not self.backend.sharded:
+            return self.db
+        return self.backend.database_for(data_type, symbol, create)
+
+    def get_range(self, data_type, symbol, start=None, end=None, columns=None, descending=True):
+        """
+        Read a date range of a time-series data type
+
+        Only the typed rows inside the range are read; the cached JSON
+        payload is not decoded. Unknown columns, unparseable dates and a
+        start after the end raise ValueError instead of matching nothing.
+
+        Args:
+            data_type (str): A time-series data type (e.g., 'price', 'dividends')
+            symbol (str): Stock symbol (or indicator name for 'economic')
+            start (str or date, optional): First date, inclusive
+            end (str or date, optional): Last date, inclusive
+            columns (list, optional): API field names to return (e.g., ['close'])
+            descending (bool, optional): Newest first, like the API responses
+
+        Returns:
+            list: Records with 'date' plus the requested fields
+        """
+        if data_type not in SERIES:
+            raise ValueError(f"'{data_type}' is not a time-series data type")
+
+        sql, fields = SERIES[data_type].select_sql(columns, descending)
+        bounds = (
+            to_date_int(start) if start else 0,
+            to_date_int(end) if end else 99991231
+        )
+        if None in bounds:
+            raise ValueError(f"Invalid date '{start if bounds[0] is None else end}'")
+        if bounds[0] > bounds[1]:
+            raise ValueError(f"Range start {start} is after its end {end}")
+
+        symbol_id = self._series_symbol_id(data_type, symbol)
+        if symbol_id is None:
+            # Payloads cached before the typed tables existed are indexed on first use
+            data = self.get_cached_data(data_type, symbol)
+            if data is None:
+                return []
+            self._index_series(data_type, symbol, data)
+            self._commit_all()
+            symbol_id = self._series_symbol_id(data_type, symbol)
+
+        with self._index_db(data_type, symbol).reader() as conn:
+            records = conn.execute(sql, (symbol_id,) + bounds).fetchall()
+
+        return [
+            {'date': from_date_int(day), **dict(zip(fields, values))}
+            for day, *values in records
+        ]
+
+    def _series_symbol_id(self, data_type, symbol):
+        """Return the series id of a symbol, or None if it has no typed rows."""
+        table = SERIES[data_type].table
+        db = self._index_db(data_type, symbol, create=False)
+        if db is None:
+            return None
+        with db.reader() as conn:
+            row = conn.execute(
+                f"""
+                SELECT s.id FROM series_symbols s
+                WHERE s.symbol=? AND EXISTS (SELECT 1 FROM {table} t WHERE t.symbol_id = s.id)
+                """,
+                (symbol,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _encode(self, data_type, data):
+        """
+        Serialize and compress a payload for storage
+
+        Payloads compressing to blob_threshold bytes or more go to the blob
+        store, and the returned bytes are the reference to it.
+
+        Returns:
+            tuple: (compressed bytes, codec tag, format tag, content hash)
+        """
+        serialized, format = self._serialize(data)
+        codec = self._write_codec(data_type)
+        raw_data, tag = codec.compress(serialized), codec.tag
+        if self.blob_threshold is not None and len(raw_data) >= self.blob_threshold:
+            raw_data, tag = self.blobs.put(raw_data), EXTERNAL_PREFIX + tag
+        return raw_data, tag, format, self._content_hash(serialized, format)
+
+    @staticmethod
+    def _content_hash(serialized, format):
+        """Hash identifying a serialized payload together with its format."""
+        digest = hashlib.blake2b(serialized, digest_size=16)
+        digest.update(format.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _decode(self, raw_data, codec, format=None):
+        """
+        Decode a stored payload
+
+        Args:
+            raw_data (bytes or str): Stored payload
+            codec (str): Codec tag, None for legacy uncompressed TEXT rows
+            format (str, optional): Format tag, None for JSON
+
+        Returns:
+            The decoded payload
+        """
+        return self._deserialize(self._decompress(raw_data, codec), format)
+
+    def _decompress(self, raw_data, codec):
+        """Undo the compression of a stored payload, reading blobs through a memory map."""
+        if codec is None:
+            return raw_data
+        if is_external(codec):
+            with self.blobs.view(raw_data) as view:
+                return self._codec_for_tag(inner_codec(codec)).decompress(view)
+        return self._codec_for_tag(codec).decompress(raw_data)
+
+    @staticmethod
+    def _stored_size(raw_data, codec):
+        """Compressed bytes of a stored payload, wherever it is kept."""
+        if is_external(codec):
+            return parse_reference(raw_data)[1]
+        return len(raw_data)
+
+    def _serialize(self, data):
+        """
+        Serialize a payload with the configured serializer
+
+        Payloads the fast serializers reject (e.g. integers beyond 64 bits)
+        are written as standard JSON instead.
+
+        Returns:
+            tuple: (bytes, format tag)
+        """
+        try:
+            return self.serializer.dumps(data), self.serializer.format
+        except (TypeError, ValueError, OverflowError):
+            return self._fallback_serializer.dumps(data), self._fallback_serializer.format
+
+    def _deserialize(self, raw, format):
+        """Deserialize bytes tagged with a format."""
+        reader = self._readers.get(format)
+        if reader is None:
+            reader = self._readers[format] = reader_for_format(format)
+        return reader.loads(raw)
+
+    def _codec_for_tag(self, tag):
+        """Return the codec able to decode rows tagged with tag."""
+        codec = self._codecs.get(tag)
+        if codec is not None:
+            return codec
+
+        name, _, dict_id = tag.partition(':')
+        if dict_id:
+            with self.db.reader() as conn:
+                row = conn.execute(
+                    "SELECT dictionary FROM codec_dictionaries WHERE id=?",
+                    (int(dict_id),)
+                ).fetchone()
+            if row is None:
+                raise ValueError(f"Compression dictionary {dict_id} is missing")
+            codec = ZstdCodec(dictionary=row[0], dict_id=int(dict_id))
+        else:
+            codec = get_codec(name)
+            if codec.name != name:
+                raise ValueError(f"Codec '{name}' is not installed")
+
+        self._codecs[tag] = codec
+        return codec
+
+    def _write_codec(self, data_type):
+        """Return the codec used for new rows of a data type."""
+        if not self.use_dictionaries:
+            return self.codec
+
+        if data_type not in self._dictionary_codecs:
+            with self.db.reader() as conn:
+                row = conn.execute(
+                    "SELECT id FROM codec_dictionaries WHERE data_type=? ORDER BY id DESC LIMIT 1",
+                    (data_type,)
+                ).fetchone()
+            self._dictionary_codecs[data_type] = (
+                self._codec_for_tag(f"zstd:{row[0]}") if row else self.codec
+            )
+
+        return self._dictionary_codecs[data_type]
+
+    def train_dictionary(self, data_type, max_samples=500, size=112640):
+        """
+        Train a zstd dictionary from the latest payloads of a data type
+
+        New rows of the data type are compressed with the dictionary when
+        the 'dictionaries' compression option is enabled.
+
+        Args:
+            data_type (str): Type of data (e.g., 'esg', 'profile')
+            max_samples (int, optional): Maximum number of payloads to sample
+            size (int, optional): Maximum dictionary size in bytes
+
+        Returns:
+            int: Id of the stored dictionary
+        """
+        samples = [
+            self._serialize(self._decode(stored.raw_data, stored.codec, stored.format))[0]
+            for stored in islice(self.backend.scan(data_type), max_samples)
+        ]
+        dictionary = train_zstd_dictionary(samples, size)
+
+        self.db.execute(
+            "INSERT INTO codec_dictionaries (data_type, created, dictionary) VALUES (?, ?, ?)",
+            (data_type, datetime.now().strftime(TIMESTAMP_FORMAT), dictionary)
+        )
+        dict_id = self.db.cursor.lastrowid
+        self.db.commit()
+
+        self._dictionary_codecs.pop(data_type, None)
+        return dict_id
+
+    def recompress(self, batch_size=100):
+        """
+        Rewrite stored payloads with the configured codec and serializer
+
+        Legacy TEXT rows, rows written with another codec or format, and
+        rows on the wrong side of the blob threshold are rewritten in
+        batches, one transaction per batch.
+
+        Args:
+            batch_size (int, optional): Rows rewritten per transaction
+
+        Returns:
+            dict: Rows rewritten, bytes before and after, the average decode
+                time per row (ms) before and after, and released pages
+        """
+        stats = {
+            'rows': 0,
+            'bytes_before': 0,
+            'bytes_after': 0,
+            'decode_ms_before': 0.0,
+            'decode_ms_after': 0.0
+        }
+        decode_before = decode_after = 0.0
+
+        for stored_batch in self._stored_batches(batch_size):
+            updates = []
+            for stored in stored_batch:
+                target = self._write_codec(stored.data_type)
+                if stored.raw_data is None:
+                    continue
+                size = self._stored_size(stored.raw_data, stored.codec)
+                external = self.blob_threshold is not None and size >= self.blob_threshold
+                if (inner_codec(stored.codec) == target.tag and is_external(stored.codec) == external
+                        and (stored.format or 'json') == self.serializer.format):
+                    continue
+
+                started = time.perf_counter()
+                data = self._decode(stored.raw_data, stored.codec, stored.format)
+                decode_before += time.perf_counter() - started
+
+                new_data, new_codec, new_format, content_hash = self._encode(stored.data_type, data)
+
+                started = time.perf_counter()
+                self._decode(new_data, new_codec, new_format)
+                decode_after += time.perf_counter() - started
+
+                stats['rows'] += 1
+                stats['bytes_before'] += size
+                stats['bytes_after'] += self._stored_size(new_data, new_codec)
+                if self.backend.supports_history:
+                    # A delta row's hash stays that of the full payload it encodes
+                    if stored.base_id is not None:
+                        content_hash = None
+                    updates.append((new_data, new_codec, new_format, content_hash, stored.base_id, stored.version))
+                else:
+                    updates.append((
+                        stored.data_type, stored.symbol, stored.last_updated,
+                        new_data, new_codec, new_format, content_hash
+                    ))
+
+            if updates:
+                if self.backend.supports_history:
+                    self.backend.rewrite(updates)
+                else:
+                    self.backend.put(updates)
+                self._commit_all()
+
+        stats['released_pages'] = self.incremental_vacuum()
+        if stats['rows']:
+            stats['decode_ms_before'] = decode_before * 1000 / stats['rows']
+            stats['decode_ms_after'] = decode_after * 1000 / stats['rows']
+
+        return stats
+
+    def _stored_batches(self, batch_size):
+        """Yield every stored version with its payload, batch_size at a time."""
+        if self.backend.supports_history:
+            last_id = 0
+            while True:
+                stored_batch = self.backend.iter_versions(last_id, batch_size)
+                if not stored_batch:
+                    return
+                last_id = stored_batch[-1].version
+                yield stored_batch
+            return
+
+        data_types = sorted({data_type for data_type, _ in self.backend.list_keys()})
+        for data_type in data_types:
+            versions = self.backend.scan(data_type)
+            while True:
+                stored_batch = list(islice(versions, batch_size))
+                if not stored_batch:
+                    break
+                yield stored_batch
+
+    def compact(self, batch_size=200, data_types=None):
+        """
+        Delete versions expired by the retention policies
+
+        Versions are deleted in small batches, each in its own transaction,
+        and the freed pages are then returned with PRAGMA incremental_vacuum.
+        With the archive enabled, expired versions are moved there instead
+        of being dropped. Backends without history keep only the latest
+        version, so there is nothing to compact.
+
+        Args:
+            batch_size (int, optional): Versions deleted per transaction
+            data_types (list, optional): Limit compaction to these data types
+
+        Returns:
+            dict: Number of versions removed from the cache database, whether
+                they were archived, and released pages
+        """
+        now = datetime.now()
+        deleted = 0
+        archived = self.archive is not None
+        if not self.backend.supports_history:
+            return {'deleted_versions': 0, 'archived': False, 'released_pages': 0}
+
+        for data_type, policy in self.retention.items():
+            if data_types and data_type not in data_types:
+                continue
+            if not policy.is_active():
+                continue
+
+            pending = []
+            for symbol in self.list_symbols(data_type):
+                versions = [
+                    (stored.version, stored.last_updated)
+                    for stored in self.backend.versions(data_type, symbol)
+                ]
+                pending.extend(policy.expired(versions, now))
+                while len(pending) >= batch_size:
+                    deleted += self._retire_versions(pending[:batch_size])
+                    pending = pending[batch_size:]
+
+            if pending:
+                deleted += self._retire_versions(pending)
+
+        return {
+            'deleted_versions': deleted,
+            'archived': archived,
+            'released_pages': self.incremental_vacuum()
+        }
+
+    def archive_versions(self, older_than_days=None, batch_size=200, data_types=None):
+        """
+        Move superseded versions into the archive
+
+        Every version other than the latest of its key whose last_updated is
+        older than the threshold is stored whole in the archive and then
+        deleted from the cache database, batch_size versions at a time.
+
+        Args:
+            older_than_days (float, optional): Age threshold, the 'after_days'
+                archive setting if omitted
+            batch_size (int, optional): Versions moved per transaction
+            data_types (list, optional): Limit archiving to these data types
+
+        Returns:
+            dict: Number of archived versions and released pages
+        """
+        if self.archive is None:
+            return {'archived_versions': 0, 'released_pages': 0}
+
+        days = self.archive_after_days if older_than_days is None else older_than_days
+        cutoff = (datetime.now() - timedelta(days=days)).strftime(TIMESTAMP_FORMAT)
+
+        moved = 0
+        pending = []
+        for data_type, symbol in self.backend.list_keys():
+            if data_types and data_type not in data_types:
+                continue
+            superseded = self.backend.versions(data_type, symbol)[1:]
+            pending.extend(
+                stored.version for stored in superseded
+                if stored.last_updated and stored.last_updated < cutoff
+            )
+            while len(pending) >= batch_size:
+                moved += self._archive(pending[:batch_size])
+                pending = pending[batch_size:]
+
+        if pending:
+            moved += self._archive(pending)
+
+        return {
+            'archived_versions': moved,
+            'released_pages': self.incremental_vacuum()
+        }
+
+    def _retire_versions(self, version_ids):
+        """Archive versions if the archive is enabled, otherwise delete them."""
+        if self.archive is not None:
+            return self._archive(version_ids)
+        return self._delete_versions(version_ids)
+
+    def _archive(self, version_ids):
+        """
+        Move a batch of versions into the archive
+
+        The archive is committed before the versions are deleted from the
+        cache database, so a failure in between leaves a version in both
+        places rather than in neither.
+        """
+        rows = self._archive_rows(version_ids)
+        if not rows:
+            return 0
+        self.archive.append(rows)
+        return self._delete_versions([row[0] for row in rows])
+
+    def _archive_rows(self, version_ids):
+        """Build archive rows holding whole copies of stored versions."""
+        archived = datetime.now().strftime(TIMESTAMP_FORMAT)
+        rows = []
+        for version_id in version_ids:
+            stored = self.backend.get_version(version_id)
+            if stored is None:
+                continue
+            serialized, format = self._serialize(self._rebuild(version_id))
+            rows.append((
+                version_id, stored.data_type, stored.symbol, stored.last_updated,
+                stored.last_verified, self.archive_codec.compress(serialized),
+                self.archive_codec.tag, format, self._content_hash(serialized, format), archived
+            ))
+        return rows
+
+    def pin(self, symbol, data_type=None):
+        """
+        Protect a key from eviction
+
+        Args:
+            symbol (str): Stock symbol
+            data_type (str, optional): Only this data type; every data type
+                of the symbol if omitted
+        """
+        self.db.execute(
+            "INSERT OR IGNORE INTO cache_pins (data_type, symbol) VALUES (?, ?)",
+            (data_type or '*', symbol)
+        )
+        self._commit()
+
+    def unpin(self, symbol, data_type=None):
+        """Remove a pin set with pin(); symbols of the watchlist stay pinned."""
+        self.db.execute(
+            "DELETE FROM cache_pins WHERE data_type=? AND symbol=?", (data_type or '*', symbol)
+        )
+        self._commit()
+
+    def pinned(self):
+        """
+        List the pinned keys
+
+        Returns:
+            pandas.DataFrame: data_type ('*' for every data type) and symbol,
+                including the symbols of the configured watchlist
+        """
+        with self.db.reader() as conn:
+            pins = set(conn.execute("SELECT data_type, symbol FROM cache_pins").fetchall())
+        pins.update(('*', symbol) for symbol in self.watchlist)
+        return pd.DataFrame(sorted(pins), columns=['data_type', 'symbol'])
+
+    def eviction_priorities(self):
+        """
+        Rank the cached keys for eviction
+
+        The priority of a key is clock + frequency * cost / size
+        (GreedyDual-Size-Frequency): frequency is the number of reads plus
+        one, cost the API requests needed to fetch it again ('refetch_costs',
+        1 by default) and size its stored bytes over every version. clock is
+        the value of the global clock when the key was last read or written;
+        the global clock rises to the priority of each evicted key, so keys
+        that are not used age out.
+
+        Returns:
+            list: (priority, data_type, symbol, stored bytes) tuples of the
+                keys that are not pinned, lowest priority first
+        """
+        with self.db.reader() as conn:
+            clock = conn.execute("SELECT clock FROM cache_clock").fetchone()[0]
+            uses = {
+                (data_type, symbol): (hits, key_clock)
+                for data_type, symbol, hits, key_clock in conn.execute(
+                    "SELECT data_type, symbol, hits, clock FROM cache_hits"
+                )
+            }
+            pins = set(conn.execute("SELECT data_type, symbol FROM cache_pins").fetchall())
+
+        # Uses not flushed yet happened at the current clock
+        with self._counter_lock:
+            for key, count in self._hits.items():
+                uses[key] = (uses.get(key, (0, 0.0))[0] + count, clock)
+
+        candidates = []
+        for data_type, symbol, _, _, size in self.backend.summary():
+            if symbol in self.watchlist or ('*', symbol) in pins or (data_type, symbol) in pins:
+                continue
+            hits, key_clock = uses.get((data_type, symbol), (0, 0.0))
+            cost = self.refetch_costs.get(data_type, 1)
+            candidates.append((key_clock + (hits + 1) * cost / max(size or 0, 1), data_type, symbol, size or 0))
+        return sorted(candidates)
+
+    def evict(self, max_bytes=None, batch_size=None):
+        """
+        Evict keys until the cache fits its size budget
+
+        Nothing happens while the stored bytes are within max_bytes. They are
+        the payload bytes of every version (blobs at their size, once per
+        referencing version); typed series and field rows and SQLite's own
+        overhead are not counted. Past the budget,
+        whole keys (every version, plus their series and field rows) are
+        deleted lowest priority first, see eviction_priorities(), until the
+        cache is down to low_water times the budget. Each batch of keys is
+        deleted in one transaction. With the archive enabled, the versions of
+        evicted keys are archived first.
+
+        Args:
+            max_bytes (int, optional): Budget, max_cache_bytes if omitted
+            batch_size (int, optional): Keys evicted per transaction
+
+        Returns:
+            dict: Number of evicted keys, freed bytes and released pages
+        """
+        budget = self.max_cache_bytes if max_bytes is None else max_bytes
+        batch_size = batch_size or self.eviction_batch_size
+        result = {'evicted_keys': 0, 'freed_bytes': 0, 'released_pages': 0}
+        if not budget:
+            return result
+
+        with self._counter_lock:
+            # Bytes saved while this pass runs are added to its measurement
+            if self._cache_bytes is None:
+                self._cache_bytes = 0
+            before = self._cache_bytes
+
+        total = sum(row[4] or 0 for row in self.backend.summary())
+        if total <= budget:
+            self._set_cache_bytes(total, before)
+            return result
+
+        target = budget * self.eviction_low_water
+        candidates = iter(self.eviction_priorities())
+        while total > target:
+            chunk = []
+            for candidate in candidates:
+                chunk.append(candidate)
+                total -= candidate[3]
+                if len(chunk) >= batch_size or total <= target:
+                    break
+            if not chunk:
+                break
+
+            if self.archive is not None:
+                version_ids = [
+                    stored.version
+                    for _, data_type, symbol, _ in chunk
+                    for stored in self.backend.versions(data_type, symbol)
+                ]
+                self.archive.append(self._archive_rows(version_ids))
+
+            with self.batch():
+                for _, data_type, symbol, _ in chunk:
+                    self.delete_data(data_type, symbol)
+                self.db.execute("UPDATE cache_clock SET clock = MAX(clock, ?)", (chunk[-1][0],))
+
+            result['evicted_keys'] += len(chunk)
+            result['freed_bytes'] += sum(candidate[3] for candidate in chunk)
+
+        self._set_cache_bytes(total, before)
+        result['released_pages'] = self.incremental_vacuum()
+        return result
+
+    def _set_cache_bytes(self, total, before):
+        """
+        Replace the estimated cache size with a measured total
+
+        before is the estimate when the measurement started; whatever
+        save_many() added since is kept on top of the total.
+        """
+        with self._counter_lock:
+            self._cache_bytes = total + self._cache_bytes - before
+
+    def _delete_versions(self, version_ids):
+        """
+        Delete a batch of cache_data rows in one transaction
+
+        Surviving versions stored as deltas against a deleted version are
+        rebuilt and stored whole first.
+        """
+        for dependent in self.backend.dependents(version_ids):
+            data = self._rebuild(dependent.version, writer=True)
+            raw_data, codec, format, _ = self._encode(dependent.data_type, data)
+            self.backend.rewrite([(raw_data, codec, format, None, None, dependent.version)])
+
+        self.backend.delete_versions(version_ids)
+        self._commit_all()
+        return len(version_ids)
+
+    def collect_blobs(self, grace=3600):
+        """
+        Delete blobs that no cache_data row refers to any more
+
+        Blobs are shared between rows, so deleting or compacting versions
+        leaves unreferenced blobs behind. Blobs written less than grace
+        seconds ago are kept, as their rows may not be committed yet.
+
+        Args:
+            grace (float, optional): Minimum age in seconds of deleted blobs
+
+        Returns:
+            dict: Number of removed blobs and freed bytes
+        """
+        if self.blobs is None:
+            return {'removed_blobs': 0, 'freed_bytes': 0}
+
+        # Every database that may hold rows, including shards not opened yet
+        databases = [self.db]
+        for data_type in sorted({data_type for data_type, _ in self.backend.list_keys()}):
+            databases.extend(
+                database for database in self.backend.databases(data_type)
+                if all(database is not known for known in databases)
+            )
+
+        referenced = set()
+        for database in databases:
+            with database.reader() as conn:
+                referenced.update(
+                    row[0] for row in conn.execute(
+                        f"""
+                        SELECT DISTINCT SUBSTR(raw_data, 1, {DIGEST_LENGTH}) FROM cache_data
+                        WHERE codec LIKE '{EXTERNAL_PREFIX}%'
+                        """
+                    )
+                )
+
+        removed, freed = self.blobs.collect(referenced, grace)
+        return {'removed_blobs': removed, 'freed_bytes': freed}
+
+    def start_compaction(self, interval):
+        """
+        Run compact(), archive_versions() and collect_blobs() periodically
+        on a background thread
+
+        Args:
+            interval (float): Seconds between compaction passes
+        """
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+
+        def run():
+            while not self._compaction_stop.wait(interval):
+                try:
+                    self.compact()
+                    self.archive_versions()
+                    self.collect_blobs()
+                except Exception:
+                    # A locked or busy database is retried on the next pass
+                    pass
+
+        self._compaction_stop.clear()
+        self._compaction_thread = threading.Thread(
+            target=run, name="cache-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+
+    def start_eviction(self, interval):
+        """
+        Run evict() on a background thread
+
+        A pass runs every interval seconds, and as soon as writes push the
+        estimated cache size past max_cache_bytes.
+
+        Args:
+            interval (float): Seconds between eviction passes
+        """
+        if self._eviction_thread and self._eviction_thread.is_alive():
+            return
+
+        def run():
+            while not self._eviction_stop.is_set():
+                try:
+                    self.evict()
+                except Exception:
+                    # A locked or busy database is retried on the next pass
+                    pass
+                self._eviction_wakeup.wait(interval)
+                self._eviction_wakeup.clear()
+
+        self._eviction_stop.clear()
+        self._eviction_thread = threading.Thread(
+            target=run, name="cache-eviction", daemon=True
+        )
+        self._eviction_thread.start()
+
+    def start_counter_flush(self, interval):
+        """
+        Flush buffered counters on a background thread
+
+        A flush runs every interval seconds, and as soon as enough API
+        requests are pending. Used with a sharded backend, whose commits
+        leave the main database alone.
+
+        Args:
+            interval (float): Seconds between flushes
+        """
+        if self._counter_thread and self._counter_thread.is_alive():
+            return
+
+        def run():
+            while not self._counter_stop.is_set():
+                self._counter_wakeup.wait(interval)
+                self._counter_wakeup.clear()
+                try:
+                    self.flush_quota()
+                except Exception:
+                    # The counts stay buffered and are retried on the next pass
+                    self.db.conn.rollback()
+
+        self._counter_stop.clear()
+        self._counter_thread = threading.Thread(
+            target=run, name="cache-counters", daemon=True
+        )
+        self._counter_thread.start()
+
+    def stop_counter_flush(self):
+        """Stop the background counter flush thread."""
+        self._counter_stop.set()
+        self._counter_wakeup.set()
+        if self._counter_thread:
+            self._counter_thread.join()
+            self._counter_thread = None
+
+    def stop_eviction(self):
+        """Stop the background eviction thread."""
+        self._eviction_stop.set()
+        self._eviction_wakeup.set()
+        if self._eviction_thread:
+            self._eviction_thread.join()
+            self._eviction_thread = None
+
+    def stop_compaction(self):
+        """Stop the background compaction thread."""
+        self._compaction_stop.set()
+        if self._compaction_thread:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+    def close(self):
+        """
+        Persist buffered counters and release every resource
+
+        Buffered API request counts, refresh statistics and read counts are
+        written first, then background threads are stopped and every
+        connection is closed. The cache cannot be used afterwards.
+        """
+        self.stop_counter_flush()
+        self.flush_quota()
+        self.stop_compaction()
+        self.stop_eviction()
+        self.rate_limiter.close()
+        self.leases.close()
+        self.transport.close()
+        self.backend.close()
+        if self.archive is not None:
+            self.archive.close()
+        self.db.close()
+        atexit.unregister(self.flush_quota)
@@ -0,0 +1,157 @@
+"""
+Codecs - Compression of cached payloads
+
+Every compressed row in cache_data carries a codec tag naming the codec
+that produced it:
+
+    zlib            zlib stream (always available)
+    zstd            Zstandard frame (requires the zstandard package)
+    zstd:<dict_id>  Zstandard frame compressed with a trained dictionary
+    lz4             LZ4 frame (requires the lz4 package)
+
+Rows without a tag are legacy uncompressed TEXT.
+"""
+
+import zlib
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+DEFAULT_CODEC = 'zlib'
+
+class ZlibCodec:
+    name = 'zlib'
+    tag = 'zlib'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        """Compress bytes."""
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        """Decompress bytes produced by compress()."""
+        return zlib.decompress(data)
+
+class ZstdCodec:
+    name = 'zstd'
+
+    def __init__(self, level=3, dictionary=None, dict_id=None):
+        """
+        Args:
+            level (int, optional): Compression level
+            dictionary (bytes, optional): Trained dictionary contents
+            dict_id (int, optional): Id of the dictionary in codec_dictionaries
+        """
+        if zstandard is None:
+            raise ImportError("The zstandard package is required for the zstd codec")
+
+        self.level = level
+        self.dict_id = dict_id
+        self._dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+
+        # zstandard contexts must not be shared between threads
+        self._local = threading.local()
+
+    def _contexts(self):
+        """The calling thread's (compressor, decompressor) pair."""
+        contexts = getattr(self._local, 'contexts', None)
+        if contexts is None:
+            contexts = (
+                zstandard.ZstdCompressor(level=self.level, dict_data=self._dict_data),
+                zstandard.ZstdDecompressor(dict_data=self._dict_data)
+            )
+            self._local.contexts = contexts
+        return contexts
+
+    @property
+    def tag(self):
+        """Codec tag stored alongside compressed rows."""
+        return f"zstd:{self.dict_id}" if self.dict_id is not None else self.name
+
+    def compress(self, data):
+        """Compress bytes."""
+        return self._contexts()[0].compress(data)
+
+    def decompress(self, data):
+        """Decompress bytes produced by compress()."""
+        return self._contexts()[1].decompress(data)
+
+class Lz4Codec:
+    name = 'lz4'
+    tag = 'lz4'
+
+    def __init__(self, level=0):
+        if lz4_frame is None:
+            raise ImportError("The lz4 package is required for the lz4 codec")
+        self.level = level
+
+    def compress(self, data):
+        """Compress bytes."""
+        return lz4_frame.compress(data, compression_level=self.level)
+
+    def decompress(self, data):
+        """Decompress bytes produced by compress()."""
+        return lz4_frame.decompress(data)
+
+CODECS = {
+    'zlib': ZlibCodec,
+    'zstd': ZstdCodec,
+    'lz4': Lz4Codec
+}
+
+def available_codecs():
+    """
+    List the codecs usable in this environment
+
+    Returns:
+        list: Codec names
+    """
+    available = ['zlib']
+    if zstandard is not None:
+        available.append('zstd')
+    if lz4_frame is not None:
+        available.append('lz4')
+    return available
+
+def get_codec(name, level=None):
+    """
+    Create a codec by name, falling back to zlib when it is not installed
+
+    Args:
+        name (str): Codec name ('zlib', 'zstd' or 'lz4')
+        level (int, optional): Compression level, codec default if omitted
+
+    Returns:
+        object: Codec instance with compress() and decompress()
+    """
+    if name not in available_codecs():
+        name = DEFAULT_CODEC
+
+    codec_class = CODECS[name]
+    return codec_class() if level is None else codec_class(level=level)
+
+def train_zstd_dictionary(samples, size=112640):
+    """
+    Train a Zstandard dictionary from sample payloads
+
+    Args:
+        samples (list): Serialized payloads (bytes)
+        size (int, optional): Maximum dictionary size in bytes
+
+    Returns:
+        bytes: Dictionary contents
+    """
+    if zstandard is None:
+        raise ImportError("The zstandard package is required to train dictionaries")
+
+    return zstandard.train_dictionary(size, samples).as_bytes()
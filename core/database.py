@@ -2,26 +2,187 @@
 Database - Database connection and setup for Financial Data Cache
 """
 
-import sqlite3
 import os
+import queue
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+from urllib.request import pathname2url
+from core.fields import FIELDS
+from core.blobs import stored_size_sql, EXTERNAL_PREFIX
+
+# Schema version stored in PRAGMA user_version once all migrations have run
+SCHEMA_VERSION = 12
+
+# Shard layouts supported by ShardRouter
+SHARD_LAYOUTS = ('data_type', 'symbol')
 
 class Database:
-    def __init__(self, database_path):
+    def __init__(self, database_path, mmap_size=268435456, cache_size=-65536,
+                 reader_pool_size=4, busy_timeout=30.0):
         """
-        Initialize the database connection
-        
+        Initialize the database connection manager
+
+        Every thread gets its own read-write connection, and readers borrow
+        read-only connections from a small pool. The database runs in WAL
+        mode so readers never wait on a writer.
+
         Args:
             database_path (str): Path to the SQLite database file
+            mmap_size (int, optional): Bytes of the file to memory-map per connection
+            cache_size (int, optional): Page cache size per connection
+                (negative values are KiB, as in PRAGMA cache_size)
+            reader_pool_size (int, optional): Maximum number of read-only connections
+            busy_timeout (float, optional): Seconds to wait for a locked database
         """
         # Create directory if it doesn't exist
         db_dir = os.path.dirname(database_path)
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
-            
-        self.conn = sqlite3.connect(database_path)
-        self.cursor = self.conn.cursor()
+
+        self.database_path = database_path
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.reader_pool_size = max(1, reader_pool_size)
+        self.busy_timeout = busy_timeout
+
+        # An in-memory database only exists inside one connection, so it is
+        # shared by every thread instead of being opened per thread.
+        self.in_memory = database_path in ('', ':memory:')
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._shared = None
+        self._version_conn = None
+
+        if self.in_memory:
+            self._shared = self._connect(database_path)
+        else:
+            # auto_vacuum only takes effect before the first table is created
+            self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.conn.execute("PRAGMA journal_mode=WAL")
+
         self.setup_tables()
-    
+
+    def _connect(self, target, read_only=False):
+        """
+        Open and configure a new SQLite connection
+
+        Args:
+            target (str): Database path (or URI when read_only is set)
+            read_only (bool, optional): Open the connection with mode=ro
+
+        Returns:
+            sqlite3.Connection: The configured connection
+        """
+        conn = sqlite3.connect(
+            target,
+            timeout=self.busy_timeout,
+            uri=read_only,
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size={int(self.cache_size)}")
+
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    @property
+    def conn(self):
+        """The read-write connection owned by the calling thread."""
+        if self._shared is not None:
+            return self._shared
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect(self.database_path)
+            self._local.conn = conn
+        return conn
+
+    @property
+    def cursor(self):
+        """The cursor of the calling thread's read-write connection."""
+        conn = self.conn
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None or getattr(self._local, 'cursor_conn', None) is not conn:
+            cursor = conn.cursor()
+            self._local.cursor = cursor
+            self._local.cursor_conn = conn
+        return cursor
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrow a read-only connection from the reader pool
+
+        Yields:
+            sqlite3.Connection: A connection opened with mode=ro
+        """
+        if self._shared is not None:
+            yield self._shared
+            return
+
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def _acquire_reader(self):
+        """Take an idle reader, opening a new one while the pool has room."""
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._reader_count < self.reader_pool_size
+            if can_open:
+                self._reader_count += 1
+
+        if not can_open:
+            return self._readers.get()
+
+        uri = f"file:{pathname2url(os.path.abspath(self.database_path))}?mode=ro"
+        try:
+            return self._connect(uri, read_only=True)
+        except sqlite3.Error:
+            with self._lock:
+                self._reader_count -= 1
+            raise
+
+    def data_version(self):
+        """
+        Get PRAGMA data_version from a dedicated connection
+
+        The value changes whenever any other connection, in this process or
+        another one, commits a change to the database.
+
+        Returns:
+            int: The current data version
+        """
+        if self._shared is not None:
+            return self._shared.execute("PRAGMA data_version").fetchone()[0]
+
+        with self._lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(
+                    self.database_path,
+                    timeout=self.busy_timeout,
+                    check_same_thread=False
+                )
+                self._connections.append(self._version_conn)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
     def setup_tables(self):
         """Create required database tables if they don't exist."""
         # API request tracking table
@@ -33,7 +194,7 @@ class Database:
             count INTEGER
         )
         ''')
-        
+
         # Generic cache table for all data types
         self.execute('''
         CREATE TABLE IF NOT EXISTS cache_data (
@@ -46,25 +207,668 @@ class Database:
             UNIQUE(data_type, symbol, date)
         )
         ''')
-        
+
+        self.commit()
+        self.migrate()
+
+    def migrate(self):
+        """
+        Upgrade an existing database to SCHEMA_VERSION
+
+        Each step runs in its own IMMEDIATE transaction together with the
+        user_version bump, so concurrent processes never apply a step twice.
+        """
+        for version, step in self._migrations():
+            if self.execute("PRAGMA user_version").fetchone()[0] >= version:
+                continue
+
+            self.execute("BEGIN IMMEDIATE")
+            try:
+                if self.execute("PRAGMA user_version").fetchone()[0] < version:
+                    step()
+                    self.execute(f"PRAGMA user_version={version}")
+                self.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def _migrations(self):
+        """Return the ordered (version, step) pairs that build the schema."""
+        return [
+            (1, self._migrate_latest_pointer),
+            (2, self._migrate_codecs),
+            (3, self._migrate_formats),
+            (4, self._migrate_series_tables),
+            (5, self._migrate_quota_ledger),
+            (6, self._migrate_content_hashes),
+            (7, self._migrate_version_deltas),
+            (8, self._migrate_shard_registry),
+            (9, self._migrate_field_tables),
+            (10, self._migrate_cache_stats),
+            (11, self._migrate_eviction),
+            (12, self._migrate_blob_references),
+        ]
+
+    def _migrate_latest_pointer(self):
+        """Add the cache_latest pointer table and keep it current with triggers."""
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS cache_latest (
+            data_type TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            cache_id INTEGER NOT NULL,
+            PRIMARY KEY (data_type, symbol)
+        ) WITHOUT ROWID
+        ''')
+
+        self.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cache_data_key_updated
+        ON cache_data (data_type, symbol, last_updated DESC)
+        ''')
+
+        self.execute('''
+        INSERT OR REPLACE INTO cache_latest (data_type, symbol, cache_id)
+        SELECT data_type, symbol, id FROM (
+            SELECT data_type, symbol, id, ROW_NUMBER() OVER (
+                PARTITION BY data_type, symbol
+                ORDER BY last_updated DESC, id DESC
+            ) AS position
+            FROM cache_data
+        )
+        WHERE position = 1
+        ''')
+
+        # Every new version becomes the latest one for its key
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS cache_data_latest_insert
+        AFTER INSERT ON cache_data
+        BEGIN
+            INSERT INTO cache_latest (data_type, symbol, cache_id)
+            VALUES (NEW.data_type, NEW.symbol, NEW.id)
+            ON CONFLICT (data_type, symbol) DO UPDATE SET cache_id = excluded.cache_id;
+        END
+        ''')
+
+        # Deleting the latest version falls back to the newest remaining one
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS cache_data_latest_delete
+        AFTER DELETE ON cache_data
+        WHEN (
+            SELECT cache_id FROM cache_latest
+            WHERE data_type = OLD.data_type AND symbol = OLD.symbol
+        ) = OLD.id
+        BEGIN
+            DELETE FROM cache_latest
+            WHERE data_type = OLD.data_type AND symbol = OLD.symbol;
+            INSERT INTO cache_latest (data_type, symbol, cache_id)
+            SELECT data_type, symbol, id FROM cache_data
+            WHERE data_type = OLD.data_type AND symbol = OLD.symbol
+            ORDER BY last_updated DESC, id DESC
+            LIMIT 1;
+        END
+        ''')
+
+    def _migrate_codecs(self):
+        """Tag compressed payloads with their codec and store trained dictionaries."""
+        self.execute("ALTER TABLE cache_data ADD COLUMN codec TEXT")
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS codec_dictionaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data_type TEXT NOT NULL,
+            created TEXT NOT NULL,
+            dictionary BLOB NOT NULL
+        )
+        ''')
+
+    def _migrate_formats(self):
+        """Tag payloads with their serialization format."""
+        self.execute("ALTER TABLE cache_data ADD COLUMN format TEXT")
+
+    def _migrate_series_tables(self):
+        """Add typed tables for time-series data types (see core.series)."""
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS series_symbols (
+            id INTEGER PRIMARY KEY,
+            symbol TEXT NOT NULL UNIQUE
+        )
+        ''')
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS price_bars (
+            symbol_id INTEGER NOT NULL,
+            date INTEGER NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            adj_close REAL,
+            volume INTEGER,
+            PRIMARY KEY (symbol_id, date)
+        ) WITHOUT ROWID
+        ''')
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS marketcap_points (
+            symbol_id INTEGER NOT NULL,
+            date INTEGER NOT NULL,
+            market_cap REAL,
+            PRIMARY KEY (symbol_id, date)
+        ) WITHOUT ROWID
+        ''')
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS dividend_events (
+            symbol_id INTEGER NOT NULL,
+            date INTEGER NOT NULL,
+            dividend REAL,
+            adj_dividend REAL,
+            record_date TEXT,
+            payment_date TEXT,
+            declaration_date TEXT,
+            PRIMARY KEY (symbol_id, date)
+        ) WITHOUT ROWID
+        ''')
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS split_events (
+            symbol_id INTEGER NOT NULL,
+            date INTEGER NOT NULL,
+            numerator REAL,
+            denominator REAL,
+            PRIMARY KEY (symbol_id, date)
+        ) WITHOUT ROWID
+        ''')
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS economic_points (
+            symbol_id INTEGER NOT NULL,
+            date INTEGER NOT NULL,
+            value REAL,
+            PRIMARY KEY (symbol_id, date)
+        ) WITHOUT ROWID
+        ''')
+
+    def _migrate_quota_ledger(self):
+        """Make api_requests unique per (endpoint, date) and add daily totals."""
+        # Merge duplicate rows left by concurrent writers into the oldest one
+        self.execute('''
+        UPDATE api_requests SET count = (
+            SELECT SUM(a.count) FROM api_requests a
+            WHERE a.endpoint = api_requests.endpoint AND a.date = api_requests.date
+        )
+        WHERE id IN (SELECT MIN(id) FROM api_requests GROUP BY endpoint, date)
+        ''')
+        self.execute('''
+        DELETE FROM api_requests
+        WHERE id NOT IN (SELECT MIN(id) FROM api_requests GROUP BY endpoint, date)
+        ''')
+
+        self.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_api_requests_endpoint_date
+        ON api_requests (endpoint, date)
+        ''')
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS api_daily_totals (
+            date TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        self.execute('''
+        INSERT OR REPLACE INTO api_daily_totals (date, count)
+        SELECT date, SUM(count) FROM api_requests GROUP BY date
+        ''')
+
+    def _migrate_content_hashes(self):
+        """Hash stored payloads so unchanged refreshes can skip the write."""
+        self.execute("ALTER TABLE cache_data ADD COLUMN content_hash TEXT")
+        self.execute("ALTER TABLE cache_data ADD COLUMN last_verified TEXT")
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS refresh_stats (
+            data_type TEXT PRIMARY KEY,
+            refreshes INTEGER NOT NULL DEFAULT 0,
+            unchanged INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''')
+
+    def _migrate_version_deltas(self):
+        """Let older versions be stored as deltas against the next newer one."""
+        self.execute("ALTER TABLE cache_data ADD COLUMN base_id INTEGER")
+        self.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cache_data_base
+        ON cache_data (base_id) WHERE base_id IS NOT NULL
+        ''')
+
+    def _migrate_shard_registry(self):
+        """Record the shard files of a sharded cache (see ShardRouter)."""
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS cache_shards (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        ''')
+
+    def _migrate_field_tables(self):
+        """Add indexed hot-field tables (see core.fields)."""
+        for fields in FIELDS.values():
+            for statement in fields.create_sql():
+                self.execute(statement)
+
+    def _migrate_cache_stats(self):
+        """Keep per-key statistics in cache_stats with triggers, and add read counts."""
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            data_type TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            versions INTEGER NOT NULL DEFAULT 0,
+            last_updated TEXT,
+            payload_bytes INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (data_type, symbol)
+        ) WITHOUT ROWID
+        ''')
+
+        self.execute('''
+        INSERT OR REPLACE INTO cache_stats (data_type, symbol, versions, last_updated, payload_bytes)
+        SELECT data_type, symbol, COUNT(*), MAX(last_updated), COALESCE(SUM(LENGTH(raw_data)), 0)
+        FROM cache_data
+        GROUP BY data_type, symbol
+        ''')
+
+        self._create_stats_triggers()
+
+        # Unchanged refreshes bump last_updated of the latest version
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS cache_data_stats_touch
+        AFTER UPDATE OF last_updated ON cache_data
+        BEGIN
+            UPDATE cache_stats SET last_updated = MAX(COALESCE(last_updated, ''), NEW.last_updated)
+            WHERE data_type = NEW.data_type AND symbol = NEW.symbol;
+        END
+        ''')
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS cache_hits (
+            data_type TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (data_type, symbol)
+        ) WITHOUT ROWID
+        ''')
+
+    def _create_stats_triggers(self):
+        """Create the triggers keeping versions and payload bytes in cache_stats."""
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS cache_data_stats_insert
+        AFTER INSERT ON cache_data
+        BEGIN
+            INSERT INTO cache_stats (data_type, symbol, versions, last_updated, payload_bytes)
+            VALUES (NEW.data_type, NEW.symbol, 1, NEW.last_updated, COALESCE({stored_size_sql('NEW')}, 0))
+            ON CONFLICT (data_type, symbol) DO UPDATE SET
+                versions = versions + 1,
+                last_updated = MAX(COALESCE(last_updated, ''), excluded.last_updated),
+                payload_bytes = payload_bytes + excluded.payload_bytes;
+        END
+        ''')
+
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS cache_data_stats_delete
+        AFTER DELETE ON cache_data
+        BEGIN
+            UPDATE cache_stats SET
+                versions = versions - 1,
+                payload_bytes = payload_bytes - COALESCE({stored_size_sql('OLD')}, 0),
+                last_updated = (
+                    SELECT MAX(last_updated) FROM cache_data
+                    WHERE data_type = OLD.data_type AND symbol = OLD.symbol
+                )
+            WHERE data_type = OLD.data_type AND symbol = OLD.symbol;
+            DELETE FROM cache_stats
+            WHERE data_type = OLD.data_type AND symbol = OLD.symbol AND versions <= 0;
+        END
+        ''')
+
+        # Recompression and delta encoding rewrite payloads in place
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS cache_data_stats_rewrite
+        AFTER UPDATE OF raw_data, codec ON cache_data
+        BEGIN
+            UPDATE cache_stats SET payload_bytes = payload_bytes
+                - COALESCE({stored_size_sql('OLD')}, 0) + COALESCE({stored_size_sql('NEW')}, 0)
+            WHERE data_type = NEW.data_type AND symbol = NEW.symbol;
+        END
+        ''')
+
+    def _migrate_eviction(self):
+        """Add the eviction clock, per-key access clocks and pinned keys."""
+        # Value of the GreedyDual-Size-Frequency clock when the key was last used
+        self.execute("ALTER TABLE cache_hits ADD COLUMN clock REAL NOT NULL DEFAULT 0")
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS cache_clock (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            clock REAL NOT NULL
+        )
+        ''')
+        self.execute("INSERT OR IGNORE INTO cache_clock (id, clock) VALUES (1, 0)")
+
+        # data_type '*' pins a symbol in every data type
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS cache_pins (
+            data_type TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            PRIMARY KEY (data_type, symbol)
+        ) WITHOUT ROWID
+        ''')
+
+    def _migrate_blob_references(self):
+        """Count blob sizes of external rows in cache_stats and index their references."""
+        for trigger in ('cache_data_stats_insert', 'cache_data_stats_delete', 'cache_data_stats_rewrite'):
+            self.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        self._create_stats_triggers()
+
+        # Lets blob collection list references without reading inline payloads
+        self.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_cache_data_external
+        ON cache_data (raw_data) WHERE codec LIKE '{EXTERNAL_PREFIX}%'
+        ''')
+
+    def table_sizes(self):
+        """
+        Get the bytes used by every table and index, from the dbstat table
+
+        Returns:
+            list: (name, bytes) tuples, largest first; empty if SQLite was
+                built without dbstat
+        """
+        with self.reader() as conn:
+            try:
+                return conn.execute(
+                    "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC"
+                ).fetchall()
+            except sqlite3.OperationalError:
+                return []
+
+    def enable_incremental_vacuum(self):
+        """
+        Switch an existing database to auto_vacuum=INCREMENTAL
+
+        Databases created before incremental vacuum was enabled need a one-off
+        VACUUM to change mode, which rewrites the whole file.
+
+        Returns:
+            bool: True if the database had to be rebuilt
+        """
+        if self.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+
         self.commit()
-    
+        self.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.execute("VACUUM")
+        return True
+
+    def incremental_vacuum(self, pages_per_step=1024):
+        """
+        Return free pages to the filesystem a few at a time
+
+        Each step is a separate short transaction, so writers in other
+        connections only wait for one step at a time.
+
+        Args:
+            pages_per_step (int, optional): Pages released per transaction
+
+        Returns:
+            int: Number of pages released
+        """
+        if self.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return 0
+
+        released = 0
+        while True:
+            free_pages = self.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free_pages:
+                break
+
+            # executescript steps the pragma to completion; a plain execute
+            # only releases a single page
+            step = min(free_pages, pages_per_step)
+            self.conn.executescript(f"PRAGMA incremental_vacuum({step})")
+            remaining = self.execute("PRAGMA freelist_count").fetchone()[0]
+            if remaining >= free_pages:
+                break
+            released += free_pages - remaining
+
+        return released
+
     def execute(self, query, params=()):
         """Execute a SQL query with parameters."""
         return self.cursor.execute(query, params)
-    
+
     def fetchone(self):
         """Fetch one result from the last query."""
         return self.cursor.fetchone()
-    
+
     def fetchall(self):
         """Fetch all results from the last query."""
         return self.cursor.fetchall()
-    
+
     def commit(self):
         """Commit changes to the database."""
         self.conn.commit()
-    
+
+    def close(self):
+        """Close every connection opened by this database."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._reader_count = 0
+
+        for conn in connections:
+            conn.close()
+
+        self._local = threading.local()
+        self._readers = queue.LifoQueue()
+        self._version_conn = None
+
+class ShardRouter:
+    def __init__(self, db, shard_by, shard_count=8, directory=None):
+        """
+        Route cached payloads to one SQLite file per shard
+
+        Shards are either one file per data_type or shard_count files keyed
+        by a hash of the symbol. Every shard is a complete cache database,
+        so writers on different shards never wait on each other and VACUUM
+        or backups can run one file at a time. Shard files are registered in
+        the cache_shards table of the main database, whose ids number the
+        shards; the layout cannot change once shards exist.
+
+        Args:
+            db (Database): The main database (bookkeeping and shard registry)
+            shard_by (str): 'data_type' or 'symbol'
+            shard_count (int, optional): Number of shards with shard_by='symbol'
+            directory (str, optional): Directory of the shard files, by default
+                next to the main database
+        """
+        if shard_by not in SHARD_LAYOUTS:
+            raise ValueError(f"Unknown shard layout '{shard_by}'")
+        if db.in_memory:
+            raise ValueError("Sharding requires an on-disk database")
+
+        self.db = db
+        self.shard_by = shard_by
+        self.shard_count = max(1, shard_count)
+        self.directory = directory or os.path.splitext(db.database_path)[0] + '_shards'
+        os.makedirs(self.directory, exist_ok=True)
+
+        # _registry_lock serializes use of the registry connection, which may
+        # wait on the main database; _lock only guards the dictionaries, so
+        # commits never wait behind a registration
+        self._lock = threading.Lock()
+        self._registry_lock = threading.Lock()
+        self._ids = {}
+        self._shards = {}
+        self._registry = sqlite3.connect(
+            db.database_path,
+            timeout=db.busy_timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._load_registry()
+        self._check_layout()
+
+    def _load_registry(self):
+        """Refresh the shard name to id mapping from cache_shards."""
+        with self._registry_lock:
+            rows = self._registry.execute("SELECT id, name FROM cache_shards").fetchall()
+        with self._lock:
+            for shard_id, name in rows:
+                self._ids[name] = shard_id
+
+    def _check_layout(self):
+        """Refuse to open shards written with a different layout."""
+        expected = {self.shard_name(index) for index in range(self.shard_count)}
+        for name in self._ids:
+            is_symbol_shard = name.startswith('symbol-')
+            if (self.shard_by == 'symbol') != is_symbol_shard or (is_symbol_shard and name not in expected):
+                raise ValueError(
+                    f"Shard '{name}' does not match shard_by='{self.shard_by}'"
+                    f" with {self.shard_count} shards"
+                )
+
+    def shard_name(self, index):
+        """Name of the index-th symbol shard, which includes the shard count."""
+        return f"symbol-{index}-of-{self.shard_count}"
+
+    def name_for(self, data_type, symbol):
+        """
+        Get the name of the shard holding a key
+
+        Returns:
+            str: The data_type itself, or 'symbol-<n>-of-<count>' for symbol sharding
+        """
+        if self.shard_by == 'data_type':
+            return data_type
+        digest = hashlib.blake2b(symbol.encode('utf-8'), digest_size=8).digest()
+        return self.shard_name(int.from_bytes(digest, 'big') % self.shard_count)
+
+    def shard_id(self, name, create=True):
+        """
+        Get the registry id of a shard
+
+        Args:
+            name (str): Shard name
+            create (bool, optional): Register the shard if it is new
+
+        Returns:
+            int: The id, or None if the shard does not exist and create is unset
+        """
+        shard_id = self._ids.get(name)
+        if shard_id is not None:
+            return shard_id
+
+        # Another process may have registered it since the last refresh
+        self._load_registry()
+        if name in self._ids or not create:
+            return self._ids.get(name)
+
+        with self._registry_lock:
+            self._registry.execute("INSERT OR IGNORE INTO cache_shards (name) VALUES (?)", (name,))
+            shard_id = self._registry.execute(
+                "SELECT id FROM cache_shards WHERE name=?", (name,)
+            ).fetchone()[0]
+        with self._lock:
+            self._ids[name] = shard_id
+        return shard_id
+
+    def route(self, data_type, symbol, create=True):
+        """
+        Find the shard of a key
+
+        Args:
+            data_type (str): Type of data
+            symbol (str): Stock symbol
+            create (bool, optional): Create the shard if it does not exist yet
+
+        Returns:
+            tuple: (shard id, Database), or None if the shard does not exist
+                and create is unset
+        """
+        shard_id = self.shard_id(self.name_for(data_type, symbol), create)
+        if shard_id is None:
+            return None
+        return shard_id, self.shard(shard_id)
+
+    def shard(self, shard_id):
+        """
+        Get the database of a shard, opening it on first use
+
+        Returns:
+            Database: The shard database
+        """
+        database = self._shards.get(shard_id)
+        if database is not None:
+            return database
+
+        names = {value: key for key, value in self._ids.items()}
+        if shard_id not in names:
+            self._load_registry()
+            names = {value: key for key, value in self._ids.items()}
+
+        path = os.path.join(self.directory, f"{quote(names[shard_id], safe='')}.db")
+        database = Database(
+            path,
+            mmap_size=self.db.mmap_size,
+            cache_size=self.db.cache_size,
+            reader_pool_size=self.db.reader_pool_size,
+            busy_timeout=self.db.busy_timeout
+        )
+        with self._lock:
+            opened = self._shards.setdefault(shard_id, database)
+        if opened is not database:
+            database.close()
+        return opened
+
+    def shards(self, data_type=None):
+        """
+        List the shards that may hold keys of a data type
+
+        Args:
+            data_type (str, optional): Type of data; None for every shard
+
+        Returns:
+            list: (shard id, Database) tuples in id order
+        """
+        if data_type is not None and self.shard_by == 'data_type':
+            shard_id = self.shard_id(data_type, create=False)
+            return [(shard_id, self.shard(shard_id))] if shard_id is not None else []
+
+        self._load_registry()
+        return [(shard_id, self.shard(shard_id)) for shard_id in sorted(self._ids.values())]
+
+    def opened(self):
+        """The shard databases opened so far."""
+        with self._lock:
+            return list(self._shards.values())
+
+    def data_version(self):
+        """
+        Get a value that changes whenever any process writes to any shard
+
+        Sums PRAGMA data_version of the main database (which also sees new
+        shards being registered) and of every opened shard; each one only
+        grows, so the sum changes whenever any of them does.
+
+        Returns:
+            int: The combined data version
+        """
+        return self.db.data_version() + sum(
+            database.data_version() for database in self.opened()
+        )
+
     def close(self):
-        """Close the database connection."""
-        self.conn.close()
+        """Close every shard database and the registry connection."""
+        for database in self.opened():
+            database.close()
+        with self._lock:
+            self._shards = {}
+        with self._registry_lock:
+            self._registry.close()
@@ -0,0 +1,121 @@
+"""
+Deltas - Reverse deltas between consecutive versions of a payload
+
+Older versions of a key can be stored as a delta against the next newer
+version, so only the latest version needs a full copy. A delta describes
+how to get the older payload back from the newer one:
+
+    drop   keys present in the newer payload but not in the older one
+    put    entries that are new or different in the older payload
+    order  key order of the older payload, only when it cannot be derived
+
+Lists of records are keyed on the first of KEY_FIELDS that is present and
+unique in both versions; dictionaries are keyed on their top-level keys.
+Payloads without such a key are not delta-encoded.
+"""
+
+# Record fields tried, in order, as the key of list payloads
+KEY_FIELDS = ('date', 'id', 'url', 'link', 'acceptedDate', 'fillingDate', 'symbol')
+
+def _record_keys(records, field):
+    """Keys of a list of records, or None if field is not a unique key."""
+    keys = []
+    for record in records:
+        if not isinstance(record, dict):
+            return None
+        key = record.get(field)
+        if key is None or not isinstance(key, (str, int, float)):
+            return None
+        keys.append(key)
+    if len(set(keys)) != len(keys):
+        return None
+    return keys
+
+def _entries(payload, field):
+    """(keys, mapping) view of a payload, or None if it cannot be keyed."""
+    if isinstance(payload, dict):
+        return list(payload), payload
+    keys = _record_keys(payload, field)
+    if keys is None:
+        return None
+    return keys, dict(zip(keys, payload))
+
+def _default_order(new_keys, drop, put_keys):
+    """Key order assumed when a delta carries no explicit order."""
+    dropped = set(drop)
+    kept = [key for key in new_keys if key not in dropped]
+    seen = set(kept)
+    return kept + [key for key in put_keys if key not in seen]
+
+def make_delta(old, new):
+    """
+    Describe how to rebuild old from new
+
+    Args:
+        old: The older payload
+        new: The newer payload
+
+    Returns:
+        dict: The delta, or None if the payloads cannot be delta-encoded
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        field = None
+    elif isinstance(old, list) and isinstance(new, list) and old and new:
+        field = next(
+            (f for f in KEY_FIELDS
+             if _record_keys(old, f) is not None and _record_keys(new, f) is not None),
+            None
+        )
+        if field is None:
+            return None
+    else:
+        return None
+
+    old_keys, old_map = _entries(old, field)
+    new_keys, new_map = _entries(new, field)
+
+    drop = [key for key in new_keys if key not in old_map]
+    put = [
+        (key, old_map[key]) for key in old_keys
+        if key not in new_map or new_map[key] != old_map[key]
+    ]
+
+    delta = {'field': field, 'drop': drop}
+    if field is None:
+        delta['put'] = dict(put)
+    else:
+        delta['put'] = [record for _, record in put]
+
+    if _default_order(new_keys, drop, [key for key, _ in put]) != old_keys:
+        delta['order'] = old_keys
+    return delta
+
+def apply_delta(new, delta):
+    """
+    Rebuild the older payload from the newer one and a delta from make_delta
+
+    Args:
+        new: The newer payload (not modified)
+        delta (dict): The delta
+
+    Returns:
+        The older payload
+    """
+    field = delta['field']
+    if field is None:
+        new_keys, new_map = list(new), new
+        put = delta['put']
+    else:
+        new_keys = [record.get(field) for record in new]
+        new_map = dict(zip(new_keys, new))
+        put = {record.get(field): record for record in delta['put']}
+
+    entries = dict(new_map)
+    for key in delta['drop']:
+        entries.pop(key, None)
+    entries.update(put)
+
+    order = delta.get('order') or _default_order(new_keys, delta['drop'], list(put))
+    if field is None:
+        return {key: entries[key] for key in order}
+    return [entries[key] for key in order]
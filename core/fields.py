@@ -0,0 +1,200 @@
+"""
+Fields - Indexed columns extracted from cached payloads
+
+A few hot fields of some data types (P/E ratio, sector, market cap, ...)
+are copied from the latest record of each payload into a typed table with
+one row per symbol and an index per column, so screens such as "every
+cached symbol with priceEarningsRatio < 15" run as SQL without decoding
+any payload.
+"""
+
+# Comparison operators accepted by FieldTable.select_sql
+OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'LIKE', 'IN')
+
+class FieldTable:
+    def __init__(self, table, fields):
+        """
+        Args:
+            table (str): Name of the typed table
+            fields (dict): API field name (dotted for nested objects) ->
+                (column name, SQL type)
+        """
+        self.table = table
+        self.fields = fields
+
+    def create_sql(self):
+        """Statements creating the table and one index per column."""
+        columns = ", ".join(f"{column} {sql_type}" for column, sql_type in self.fields.values())
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            f"(symbol TEXT PRIMARY KEY, {columns}) WITHOUT ROWID"
+        ]
+        statements.extend(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{column} ON {self.table} ({column})"
+            for column, _ in self.fields.values()
+        )
+        return statements
+
+    def row(self, symbol, payload):
+        """
+        Extract the hot fields of a payload
+
+        List payloads use their newest record (by 'date' when present,
+        otherwise the first one).
+
+        Returns:
+            tuple: Values matching upsert_sql()
+        """
+        record = latest_record(payload)
+        values = []
+        for path, (_, sql_type) in self.fields.items():
+            value = lookup(record, path)
+            values.append(to_number(value) if sql_type == 'REAL' else to_text(value))
+        return (symbol,) + tuple(values)
+
+    def upsert_sql(self):
+        """Statement replacing the row of one symbol produced by row()."""
+        columns = ", ".join(column for column, _ in self.fields.values())
+        placeholders = ", ".join("?" * (len(self.fields) + 1))
+        return f"INSERT OR REPLACE INTO {self.table} (symbol, {columns}) VALUES ({placeholders})"
+
+    def select_sql(self, where=None, order_by=None, limit=None):
+        """
+        Statement selecting symbols by their hot fields
+
+        Args:
+            where (dict, optional): API field name -> value for equality, or
+                -> (operator, value) with an operator from OPERATORS; a None
+                value matches missing fields, and IN takes a list of values
+                or a single one
+            order_by (str, optional): API field name, prefixed with '-' for
+                descending order
+            limit (int, optional): Maximum number of rows
+
+        Returns:
+            tuple: (SQL, parameters, selected API field names)
+        """
+        fields = list(self.fields)
+        conditions = []
+        params = []
+        for field, condition in (where or {}).items():
+            column = self._column(field)
+            operator, value = condition if isinstance(condition, tuple) else ('=', condition)
+            operator = operator.upper()
+            if operator not in OPERATORS:
+                raise ValueError(f"Unsupported operator '{operator}'")
+
+            if value is None and operator in ('=', '!='):
+                conditions.append(f"{column} IS {'NOT ' if operator == '!=' else ''}NULL")
+            elif operator == 'IN':
+                # A single value (a string included) matches like a one-item list
+                values = [value] if isinstance(value, (str, bytes)) or not hasattr(value, '__iter__') else list(value)
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+
+        selected = ", ".join(["symbol"] + [column for column, _ in self.fields.values()])
+        sql = f"SELECT {selected} FROM {self.table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if order_by:
+            descending = order_by.startswith('-')
+            column = self._column(order_by.lstrip('-'))
+            # Rows missing the field sort last either way
+            sql += f" ORDER BY {column} IS NULL, {column} {'DESC' if descending else 'ASC'}, symbol"
+        else:
+            sql += " ORDER BY symbol"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return sql, params, fields
+
+    def _column(self, field):
+        if field not in self.fields:
+            raise ValueError(f"'{field}' is not an indexed field of {self.table}")
+        return self.fields[field][0]
+
+FIELDS = {
+    'ratios': FieldTable('ratio_fields', {
+        'date': ('date', 'TEXT'),
+        'priceEarningsRatio': ('price_earnings_ratio', 'REAL'),
+        'priceToBookRatio': ('price_to_book_ratio', 'REAL'),
+        'returnOnEquity': ('return_on_equity', 'REAL'),
+        'debtEquityRatio': ('debt_equity_ratio', 'REAL'),
+        'currentRatio': ('current_ratio', 'REAL'),
+        'dividendYield': ('dividend_yield', 'REAL')
+    }),
+    'metrics': FieldTable('metric_fields', {
+        'date': ('date', 'TEXT'),
+        'marketCap': ('market_cap', 'REAL'),
+        'peRatio': ('pe_ratio', 'REAL'),
+        'pbRatio': ('pb_ratio', 'REAL'),
+        'enterpriseValue': ('enterprise_value', 'REAL'),
+        'dividendYield': ('dividend_yield', 'REAL'),
+        'roe': ('roe', 'REAL')
+    }),
+    'profile': FieldTable('profile_fields', {
+        'sector': ('sector', 'TEXT'),
+        'industry': ('industry', 'TEXT'),
+        'country': ('country', 'TEXT'),
+        'exchangeShortName': ('exchange', 'TEXT'),
+        'mktCap': ('market_cap', 'REAL'),
+        'beta': ('beta', 'REAL'),
+        'price': ('price', 'REAL')
+    }),
+    'income': FieldTable('income_fields', {
+        'date': ('date', 'TEXT'),
+        'revenue': ('revenue', 'REAL'),
+        'netIncome': ('net_income', 'REAL'),
+        'eps': ('eps', 'REAL')
+    }),
+    'growth': FieldTable('growth_fields', {
+        'date': ('date', 'TEXT'),
+        'revenueGrowth': ('revenue_growth', 'REAL'),
+        'netIncomeGrowth': ('net_income_growth', 'REAL'),
+        'epsgrowth': ('eps_growth', 'REAL')
+    })
+}
+
+def latest_record(payload):
+    """
+    Get the record hot fields are read from
+
+    Returns:
+        dict: The newest record of a list payload, the payload itself if it
+            is a dict, or an empty dict
+    """
+    if isinstance(payload, dict):
+        return payload
+    records = [record for record in payload or [] if isinstance(record, dict)]
+    if not records:
+        return {}
+    if all('date' in record for record in records):
+        return max(records, key=lambda record: record.get('date') or '')
+    return records[0]
+
+def lookup(record, path):
+    """Follow a dotted path through nested dicts, returning None when it breaks."""
+    value = record
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def to_number(value):
+    """Convert a numeric field to float, or None if it is not a number."""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def to_text(value):
+    """Convert a text field to str, or None if it is missing or not a scalar."""
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    return str(value)
@@ -0,0 +1,262 @@
+"""
+Memory Cache - Size-bounded in-process tier in front of SQLite
+
+Holds decoded payloads so repeated lookups skip SQLite and deserialization.
+Two eviction policies are available:
+
+    lru      Plain least-recently-used eviction
+    tinylfu  W-TinyLFU: a small LRU admission window in front of a
+             segmented LRU main area, with a frequency sketch deciding
+             whether a newcomer may displace the main area's victim
+"""
+
+import threading
+from collections import OrderedDict
+
+class CacheEntry:
+    __slots__ = ('value', 'size', 'version', 'generation')
+
+    def __init__(self, value, size, version, generation):
+        self.value = value
+        self.size = size
+        self.version = version
+        self.generation = generation
+
+class FrequencySketch:
+    """Count-min sketch with 4-bit counters that halve periodically."""
+
+    SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+
+    def __init__(self, width):
+        self.width = 1 << max(10, (width - 1).bit_length())
+        self.mask = self.width - 1
+        self.rows = [bytearray(self.width) for _ in self.SEEDS]
+        self.additions = 0
+        self.sample_size = 10 * self.width
+
+    def _indexes(self, key):
+        h = hash(key) & 0xFFFFFFFFFFFF
+        return [((h * seed) >> 17) & self.mask for seed in self.SEEDS]
+
+    def increment(self, key):
+        """Record one access of key."""
+        for row, index in zip(self.rows, self._indexes(key)):
+            if row[index] < 15:
+                row[index] += 1
+
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._age()
+
+    def frequency(self, key):
+        """Estimated number of recent accesses of key."""
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def _age(self):
+        """Halve every counter so old popularity fades."""
+        for row in self.rows:
+            for index in range(self.width):
+                row[index] >>= 1
+        self.additions //= 2
+
+class MemoryCache:
+    def __init__(self, max_bytes, policy='tinylfu', expected_entry_size=16384):
+        """
+        Initialize the memory tier
+
+        Args:
+            max_bytes (int): Upper bound on the summed size of held payloads
+            policy (str, optional): 'tinylfu' or 'lru'
+            expected_entry_size (int, optional): Typical payload size, used to
+                size the frequency sketch
+        """
+        if policy not in ('tinylfu', 'lru'):
+            raise ValueError(f"Unknown memory cache policy '{policy}'")
+
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+        self._lock = threading.Lock()
+        self._window = OrderedDict()
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+        self._sizes = {'window': 0, 'probation': 0, 'protected': 0}
+
+        if policy == 'tinylfu':
+            self._window_max = max(1, max_bytes // 100)
+            self._main_max = max_bytes - self._window_max
+            self._protected_max = self._main_max * 4 // 5
+            self._sketch = FrequencySketch(max(1, max_bytes // expected_entry_size))
+        else:
+            self._window_max = max_bytes
+            self._main_max = 0
+            self._protected_max = 0
+            self._sketch = None
+
+    def _segments(self):
+        return (
+            ('window', self._window),
+            ('probation', self._probation),
+            ('protected', self._protected)
+        )
+
+    def _find(self, key):
+        for name, segment in self._segments():
+            if key in segment:
+                return name, segment
+        return None, None
+
+    def _pop(self, name, segment, key):
+        entry = segment.pop(key)
+        self._sizes[name] -= entry.size
+        return entry
+
+    def _push(self, name, segment, key, entry):
+        segment[key] = entry
+        self._sizes[name] += entry.size
+
+    def get(self, key):
+        """
+        Look up a payload
+
+        Returns:
+            CacheEntry: The entry, or None on a miss. The caller checks
+                entry.generation and revalidates stale entries.
+        """
+        with self._lock:
+            if self._sketch is not None:
+                self._sketch.increment(key)
+
+            name, segment = self._find(key)
+            if segment is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            if name == 'probation':
+                entry = self._pop(name, segment, key)
+                self._push('protected', self._protected, key, entry)
+                self._demote_protected()
+            else:
+                entry = segment[key]
+                segment.move_to_end(key)
+            return entry
+
+    def record_miss(self, key):
+        """Turn a hit that failed revalidation into a miss."""
+        with self._lock:
+            self.hits -= 1
+            self.misses += 1
+        self.invalidate(key)
+
+    def advance_generation(self):
+        """
+        Mark every held payload as needing revalidation
+
+        Returns:
+            int: The new generation
+        """
+        with self._lock:
+            self.generation += 1
+            return self.generation
+
+    def put(self, key, value, size, version, generation=None):
+        """
+        Store a decoded payload
+
+        Args:
+            key (tuple): (data_type, symbol)
+            value: Decoded payload, shared with callers (treat as read-only)
+            size (int): Size charged against max_bytes
+            version (int): cache_data id the payload was decoded from
+            generation (int, optional): Generation observed before the payload
+                was read, so a concurrent change forces revalidation
+        """
+        if generation is None:
+            generation = self.generation
+
+        with self._lock:
+            name, segment = self._find(key)
+            if segment is not None:
+                self._pop(name, segment, key)
+
+            if size > self.max_bytes:
+                self.rejections += 1
+                return
+
+            self._push('window', self._window, key, CacheEntry(value, size, version, generation))
+            while self._sizes['window'] > self._window_max and self._window:
+                candidate_key, candidate = self._window.popitem(last=False)
+                self._sizes['window'] -= candidate.size
+                if self._sketch is None:
+                    self.evictions += 1
+                else:
+                    self._admit(candidate_key, candidate)
+
+    def _admit(self, key, entry):
+        """Move a window candidate into the main area if it beats the victims."""
+        while self._sizes['probation'] + self._sizes['protected'] + entry.size > self._main_max:
+            if self._probation:
+                victim_name, victims = 'probation', self._probation
+            elif self._protected:
+                victim_name, victims = 'protected', self._protected
+            else:
+                break
+
+            victim_key = next(iter(victims))
+            if self._sketch.frequency(key) <= self._sketch.frequency(victim_key):
+                self.rejections += 1
+                return
+
+            self._pop(victim_name, victims, victim_key)
+            self.evictions += 1
+
+        if entry.size > self._main_max:
+            self.rejections += 1
+            return
+        self._push('probation', self._probation, key, entry)
+
+    def _demote_protected(self):
+        """Keep the protected segment within its share of the main area."""
+        while self._sizes['protected'] > self._protected_max and self._protected:
+            key, entry = self._protected.popitem(last=False)
+            self._sizes['protected'] -= entry.size
+            self._push('probation', self._probation, key, entry)
+
+    def invalidate(self, key):
+        """Drop a payload if it is held."""
+        with self._lock:
+            name, segment = self._find(key)
+            if segment is not None:
+                self._pop(name, segment, key)
+
+    def clear(self):
+        """Drop every payload."""
+        with self._lock:
+            for name, segment in self._segments():
+                segment.clear()
+                self._sizes[name] = 0
+
+    def stats(self):
+        """
+        Get usage counters
+
+        Returns:
+            dict: hits, misses, evictions, rejections, entries, bytes, max_bytes
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'rejections': self.rejections,
+                'entries': len(self._window) + len(self._probation) + len(self._protected),
+                'bytes': sum(self._sizes.values()),
+                'max_bytes': self.max_bytes
+            }
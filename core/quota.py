@@ -0,0 +1,128 @@
+"""
+Quota Ledger - Buffered API request counting
+
+Request counts are kept in memory and persisted in batches with a single
+UPSERT per (endpoint, date). The daily total is maintained incrementally
+in api_daily_totals, so checking the daily limit is one primary-key lookup.
+"""
+
+import time
+import threading
+from datetime import datetime
+
+class QuotaLedger:
+    def __init__(self, db, flush_every=10, flush_interval=1.0):
+        """
+        Initialize the ledger
+
+        Args:
+            db (Database): Database holding api_requests and api_daily_totals
+            flush_every (int, optional): Flush once this many requests are pending
+            flush_interval (float, optional): Flush when the oldest pending
+                request is this many seconds old
+        """
+        self.db = db
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_since = None
+
+    @staticmethod
+    def today():
+        """Today's date as stored in the ledger."""
+        return datetime.now().strftime("%Y-%m-%d")
+
+    def record(self, endpoint, count=1):
+        """
+        Count API requests without touching the database
+
+        Args:
+            endpoint (str): API endpoint being accessed
+            count (int, optional): Number of requests
+        """
+        key = (endpoint, self.today())
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + count
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+
+    def due(self):
+        """Whether enough requests are pending, or for long enough, to flush."""
+        with self._lock:
+            if not self._pending:
+                return False
+            if sum(self._pending.values()) >= self.flush_every:
+                return True
+            return time.monotonic() - self._pending_since >= self.flush_interval
+
+    def flush(self):
+        """
+        Write pending counts on the calling thread's connection
+
+        The caller commits, so the counts can share a transaction with
+        other writes. If a write fails, the counts are pending again and
+        the caller rolls back.
+
+        Returns:
+            int: Number of requests written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_since = None
+
+        if not pending:
+            return 0
+
+        totals = {}
+        for (_, date), count in pending.items():
+            totals[date] = totals.get(date, 0) + count
+
+        cursor = self.db.cursor
+        try:
+            cursor.executemany(
+                """
+                INSERT INTO api_requests (endpoint, date, count) VALUES (?, ?, ?)
+                ON CONFLICT (endpoint, date) DO UPDATE SET count = count + excluded.count
+                """,
+                [(endpoint, date, count) for (endpoint, date), count in pending.items()]
+            )
+            cursor.executemany(
+                """
+                INSERT INTO api_daily_totals (date, count) VALUES (?, ?)
+                ON CONFLICT (date) DO UPDATE SET count = count + excluded.count
+                """,
+                list(totals.items())
+            )
+        except BaseException:
+            with self._lock:
+                for key, count in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + count
+                if self._pending_since is None:
+                    self._pending_since = time.monotonic()
+            raise
+
+        return sum(pending.values())
+
+    def pending_total(self, date):
+        """Requests recorded for a date but not yet flushed."""
+        with self._lock:
+            return sum(count for (_, day), count in self._pending.items() if day == date)
+
+    def total(self, date=None):
+        """
+        Get the request count for a day across all processes
+
+        Args:
+            date (str, optional): 'YYYY-MM-DD', today if omitted
+
+        Returns:
+            int: Persisted count plus this process's unflushed requests
+        """
+        date = date or self.today()
+        with self.db.reader() as conn:
+            row = conn.execute(
+                "SELECT count FROM api_daily_totals WHERE date=?", (date,)
+            ).fetchone()
+        return (row[0] if row else 0) + self.pending_total(date)
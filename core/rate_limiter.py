@@ -0,0 +1,337 @@
+"""
+Rate Limiter - Token buckets shared by every process on the host
+
+Bucket state lives in SQLite and every change happens inside a
+BEGIN IMMEDIATE transaction, so concurrent processes using the same file
+draw from the same budget. Three buckets are supported:
+
+    second  Refills continuously, per_second tokens per second
+    minute  Refills continuously, per_minute tokens per minute
+    day     Refills to per_day tokens at local midnight
+
+Reservations lease part of today's budget to a named consumer (e.g. a batch
+job). Reserved tokens are taken out of the shared day bucket up front, and
+reserve_floor tokens are always left for everyone else.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+BUCKETS = {
+    'second': 1.0,
+    'minute': 60.0
+}
+
+class RateLimiter:
+    def __init__(self, database_path, per_second=None, per_minute=None, per_day=None,
+                 reserve_floor=0, busy_timeout=30.0):
+        """
+        Initialize the rate limiter
+
+        Args:
+            database_path (str): SQLite file holding the bucket state. An
+                in-memory path gives a limiter private to this process.
+            per_second (int, optional): Requests allowed per second
+            per_minute (int, optional): Requests allowed per minute
+            per_day (int, optional): Requests allowed per calendar day
+            reserve_floor (int, optional): Tokens of the day bucket that
+                reservations may not take
+            busy_timeout (float, optional): Seconds to wait for a locked database
+        """
+        self.database_path = database_path
+        self.capacity = {}
+        if per_second:
+            self.capacity['second'] = per_second
+        if per_minute:
+            self.capacity['minute'] = per_minute
+        self.per_day = per_day or None
+        self.reserve_floor = reserve_floor or 0
+
+        db_dir = os.path.dirname(database_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            database_path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        if database_path not in ('', ':memory:'):
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_buckets (
+            name TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL,
+            period TEXT
+        )
+        """)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_reservations (
+            name TEXT PRIMARY KEY,
+            period TEXT NOT NULL,
+            remaining INTEGER NOT NULL,
+            expires REAL NOT NULL
+        )
+        """)
+
+    def is_active(self):
+        """Whether any bucket is configured."""
+        return bool(self.capacity) or self.per_day is not None
+
+    def _transaction(self, work):
+        """Run work(conn, now) in a write transaction and return its result."""
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(conn, time.time())
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    @staticmethod
+    def _period(now):
+        return datetime.fromtimestamp(now).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _seconds_until_midnight(now):
+        current = datetime.fromtimestamp(now)
+        midnight = datetime.combine(current.date() + timedelta(days=1), datetime.min.time())
+        return (midnight - current).total_seconds()
+
+    def _rolling_tokens(self, conn, name, now):
+        """Current tokens of a continuously refilled bucket."""
+        capacity = self.capacity[name]
+        row = conn.execute(
+            "SELECT tokens, updated FROM rate_buckets WHERE name=?", (name,)
+        ).fetchone()
+        if row is None:
+            return float(capacity)
+
+        tokens, updated = row
+        refill = max(0.0, now - updated) * capacity / BUCKETS[name]
+        return min(float(capacity), tokens + refill)
+
+    def _day_tokens(self, conn, now):
+        """Current tokens of the day bucket, after returning expired reservations."""
+        period = self._period(now)
+        row = conn.execute(
+            "SELECT tokens, period FROM rate_buckets WHERE name='day'"
+        ).fetchone()
+        if row is None or row[1] != period:
+            tokens = float(self.per_day)
+            conn.execute("DELETE FROM rate_reservations WHERE period != ?", (period,))
+        else:
+            tokens = row[0]
+
+        expired = conn.execute(
+            "SELECT COALESCE(SUM(remaining), 0) FROM rate_reservations WHERE expires <= ?",
+            (now,)
+        ).fetchone()[0]
+        if expired:
+            conn.execute("DELETE FROM rate_reservations WHERE expires <= ?", (now,))
+            tokens += expired
+
+        return tokens
+
+    def _store(self, conn, name, tokens, now, period=None):
+        conn.execute(
+            """
+            INSERT INTO rate_buckets (name, tokens, updated, period) VALUES (?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                tokens = excluded.tokens, updated = excluded.updated, period = excluded.period
+            """,
+            (name, tokens, now, period)
+        )
+
+    def try_acquire(self, n=1, reservation=None):
+        """
+        Take n tokens from every bucket if they are all available
+
+        Args:
+            n (int, optional): Number of requests about to be made
+            reservation (str, optional): Draw the day budget from this
+                reservation instead of the shared day bucket
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the seconds to wait
+                before trying again (inf if the request can never succeed)
+        """
+        def work(conn, now):
+            waits = []
+            rolling = {}
+            for name, capacity in self.capacity.items():
+                if n > capacity:
+                    return float('inf')
+                tokens = self._rolling_tokens(conn, name, now)
+                rolling[name] = tokens
+                if tokens < n:
+                    waits.append((n - tokens) * BUCKETS[name] / capacity)
+
+            day_tokens = None
+            remaining = None
+            if reservation is not None:
+                row = conn.execute(
+                    "SELECT remaining FROM rate_reservations WHERE name=? AND period=? AND expires > ?",
+                    (reservation, self._period(now), now)
+                ).fetchone()
+                remaining = row[0] if row else 0
+                if remaining < n:
+                    return float('inf')
+            elif self.per_day is not None:
+                if n > self.per_day:
+                    return float('inf')
+                day_tokens = self._day_tokens(conn, now)
+                if day_tokens < n:
+                    waits.append(self._seconds_until_midnight(now))
+
+            if waits:
+                if day_tokens is not None:
+                    self._store(conn, 'day', day_tokens, now, self._period(now))
+                return max(waits)
+
+            for name, tokens in rolling.items():
+                self._store(conn, name, tokens - n, now)
+            if remaining is not None:
+                conn.execute(
+                    "UPDATE rate_reservations SET remaining = remaining - ? WHERE name=?",
+                    (n, reservation)
+                )
+            elif day_tokens is not None:
+                self._store(conn, 'day', day_tokens - n, now, self._period(now))
+            return 0.0
+
+        return self._transaction(work)
+
+    def acquire(self, n=1, timeout=None, reservation=None):
+        """
+        Block until n tokens are available in every bucket, then take them
+
+        Args:
+            n (int, optional): Number of requests about to be made
+            timeout (float, optional): Give up after this many seconds;
+                None waits as long as needed, 0 does not wait at all
+            reservation (str, optional): Draw the day budget from this reservation
+
+        Returns:
+            bool: True if the tokens were taken
+        """
+        if not self.is_active():
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(n, reservation)
+            if wait == 0:
+                return True
+            if wait == float('inf'):
+                return False
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left < wait:
+                    return False
+            time.sleep(wait)
+
+    def reserve(self, name, n, ttl=None):
+        """
+        Lease part of today's budget to a named consumer
+
+        Reserving under an existing name adds to that reservation. Unused
+        tokens return to the shared budget when the reservation expires or
+        is released.
+
+        Args:
+            name (str): Reservation name, passed later to acquire()
+            n (int): Number of requests to reserve
+            ttl (float, optional): Seconds until the reservation expires,
+                end of today if omitted
+
+        Returns:
+            bool: True if the tokens were reserved
+        """
+        if self.per_day is None:
+            return False
+
+        def work(conn, now):
+            tokens = self._day_tokens(conn, now)
+            period = self._period(now)
+            if tokens - n < self.reserve_floor:
+                self._store(conn, 'day', tokens, now, period)
+                return False
+
+            lifetime = self._seconds_until_midnight(now)
+            if ttl:
+                lifetime = min(ttl, lifetime)
+            expires = now + lifetime
+            self._store(conn, 'day', tokens - n, now, period)
+            conn.execute(
+                """
+                INSERT INTO rate_reservations (name, period, remaining, expires) VALUES (?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    remaining = remaining + excluded.remaining,
+                    expires = MAX(expires, excluded.expires)
+                """,
+                (name, period, n, expires)
+            )
+            return True
+
+        return self._transaction(work)
+
+    def release(self, name):
+        """
+        End a reservation and return its unused tokens to the shared budget
+
+        Returns:
+            int: Number of tokens returned
+        """
+        def work(conn, now):
+            tokens = self._day_tokens(conn, now)
+            row = conn.execute(
+                "SELECT remaining FROM rate_reservations WHERE name=? AND period=?",
+                (name, self._period(now))
+            ).fetchone()
+            conn.execute("DELETE FROM rate_reservations WHERE name=?", (name,))
+            returned = row[0] if row else 0
+            self._store(conn, 'day', tokens + returned, now, self._period(now))
+            return returned
+
+        if self.per_day is None:
+            return 0
+        return self._transaction(work)
+
+    def remaining(self):
+        """
+        Get the tokens currently available
+
+        Returns:
+            dict: Bucket name -> available tokens, plus 'reservations'
+                mapping reservation names to their remaining tokens
+        """
+        def work(conn, now):
+            available = {
+                name: int(self._rolling_tokens(conn, name, now))
+                for name in self.capacity
+            }
+            if self.per_day is not None:
+                tokens = self._day_tokens(conn, now)
+                self._store(conn, 'day', tokens, now, self._period(now))
+                available['day'] = int(tokens)
+            available['reservations'] = dict(conn.execute(
+                "SELECT name, remaining FROM rate_reservations"
+            ).fetchall())
+            return available
+
+        return self._transaction(work)
+
+    def close(self):
+        """Close the limiter's connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,135 @@
+"""
+Serializers - Encoding of payloads before compression
+
+Every row in cache_data carries a format tag naming its wire format:
+
+    json     JSON text written by the json module
+    orjson   JSON text written by orjson (read back with the json module
+             when orjson is not installed)
+    msgpack  MessagePack (requires the msgpack package)
+
+Rows without a tag are JSON written by the json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+class JsonSerializer:
+    name = 'json'
+    format = 'json'
+
+    def dumps(self, data):
+        """Serialize a payload to bytes."""
+        return json.dumps(data).encode('utf-8')
+
+    def loads(self, raw):
+        """Deserialize bytes (or legacy text) produced by dumps()."""
+        return json.loads(raw)
+
+class OrjsonSerializer:
+    name = 'orjson'
+    format = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The orjson package is required for the orjson serializer")
+
+    def dumps(self, data):
+        """
+        Serialize a payload to bytes
+
+        orjson writes NaN and Infinity as null, like most JSON encoders
+        outside the standard library.
+        """
+        return orjson.dumps(data)
+
+    def loads(self, raw):
+        """Deserialize bytes produced by dumps()."""
+        return orjson.loads(raw)
+
+class MsgpackSerializer:
+    name = 'msgpack'
+    format = 'msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("The msgpack package is required for the msgpack serializer")
+
+    def dumps(self, data):
+        """Serialize a payload to bytes."""
+        return msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, raw):
+        """Deserialize bytes produced by dumps()."""
+        return msgpack.unpackb(raw, raw=False)
+
+SERIALIZERS = {
+    'json': JsonSerializer,
+    'orjson': OrjsonSerializer,
+    'msgpack': MsgpackSerializer
+}
+
+def available_serializers():
+    """
+    List the serializers usable in this environment, fastest first
+
+    Returns:
+        list: Serializer names
+    """
+    available = []
+    if orjson is not None:
+        available.append('orjson')
+    if msgpack is not None:
+        available.append('msgpack')
+    available.append('json')
+    return available
+
+def get_serializer(name='auto'):
+    """
+    Create a serializer by name
+
+    Args:
+        name (str, optional): 'json', 'orjson', 'msgpack', or 'auto' for the
+            fastest installed one. Missing packages fall back to json.
+
+    Returns:
+        object: Serializer instance with dumps() and loads()
+    """
+    available = available_serializers()
+    if name == 'auto':
+        name = available[0]
+    elif name not in available:
+        name = 'json'
+
+    return SERIALIZERS[name]()
+
+def reader_for_format(format):
+    """
+    Return the fastest serializer able to read a format tag
+
+    Args:
+        format (str): Format tag, None for legacy JSON rows
+
+    Returns:
+        object: Serializer instance
+    """
+    if format in (None, 'json'):
+        # orjson reads integers beyond 64 bits as floats, so rows written by
+        # the json module are read back with it
+        return JsonSerializer()
+    if format == 'orjson':
+        return get_serializer('orjson')
+    if format == 'msgpack':
+        if msgpack is None:
+            raise ValueError("The msgpack package is required to read msgpack rows")
+        return MsgpackSerializer()
+    raise ValueError(f"Unknown payload format '{format}'")
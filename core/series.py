@@ -0,0 +1,138 @@
+"""
+Series - Typed tables for time-series data types
+
+Time-series payloads (price bars, market cap, dividends, splits and
+economic indicators) are also stored row by row in typed tables keyed on
+(symbol_id, date), so a date range can be read with an index range scan
+instead of decoding the whole JSON history.
+
+Dates are stored as YYYYMMDD integers.
+"""
+
+from datetime import date, datetime
+
+class SeriesTable:
+    def __init__(self, table, fields):
+        """
+        Args:
+            table (str): Name of the typed table
+            fields (dict): API field name -> column name, excluding 'date'
+        """
+        self.table = table
+        self.fields = fields
+
+    def rows(self, symbol_id, payload):
+        """
+        Convert a payload into table rows
+
+        Records without a valid date are skipped.
+
+        Returns:
+            list: Tuples matching insert_sql()
+        """
+        rows = []
+        for record in payload:
+            day = to_date_int(record.get('date'))
+            if day is None:
+                continue
+            rows.append((symbol_id, day) + tuple(record.get(field) for field in self.fields))
+        return rows
+
+    def insert_sql(self):
+        """Statement inserting one row produced by rows()."""
+        columns = ", ".join(self.fields.values())
+        placeholders = ", ".join("?" * (len(self.fields) + 2))
+        return f"INSERT OR REPLACE INTO {self.table} (symbol_id, date, {columns}) VALUES ({placeholders})"
+
+    def select_sql(self, columns=None, descending=True):
+        """
+        Statement reading a date range for one symbol
+
+        Args:
+            columns (list, optional): API field names to return, all if omitted
+            descending (bool, optional): Newest first, like the API responses
+
+        Returns:
+            tuple: (SQL, selected API field names)
+        """
+        fields = list(self.fields) if columns is None else [f for f in columns if f != 'date']
+        unknown = [f for f in fields if f not in self.fields]
+        if unknown:
+            raise ValueError(f"Unknown {self.table} columns: {', '.join(unknown)}")
+
+        selected = ", ".join(["date"] + [self.fields[f] for f in fields])
+        order = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT {selected} FROM {self.table} "
+            f"WHERE symbol_id=? AND date BETWEEN ? AND ? ORDER BY date {order}"
+        )
+        return sql, fields
+
+SERIES = {
+    'price': SeriesTable('price_bars', {
+        'open': 'open',
+        'high': 'high',
+        'low': 'low',
+        'close': 'close',
+        'adjClose': 'adj_close',
+        'volume': 'volume'
+    }),
+    'marketcap': SeriesTable('marketcap_points', {
+        'marketCap': 'market_cap'
+    }),
+    'dividends': SeriesTable('dividend_events', {
+        'dividend': 'dividend',
+        'adjDividend': 'adj_dividend',
+        'recordDate': 'record_date',
+        'paymentDate': 'payment_date',
+        'declarationDate': 'declaration_date'
+    }),
+    'splits': SeriesTable('split_events', {
+        'numerator': 'numerator',
+        'denominator': 'denominator'
+    }),
+    'economic': SeriesTable('economic_points', {
+        'value': 'value'
+    })
+}
+
+def to_date_int(value):
+    """
+    Convert a date to its YYYYMMDD integer form
+
+    Args:
+        value (str, date or None): 'YYYY-MM-DD' (time part ignored) or a date
+
+    Returns:
+        int: The date as YYYYMMDD, or None if it cannot be parsed
+    """
+    if isinstance(value, (date, datetime)):
+        return value.year * 10000 + value.month * 100 + value.day
+    if not value or len(value) < 10:
+        return None
+    try:
+        return int(value[0:4]) * 10000 + int(value[5:7]) * 100 + int(value[8:10])
+    except ValueError:
+        return None
+
+def from_date_int(value):
+    """Convert a YYYYMMDD integer back to 'YYYY-MM-DD'."""
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+def merge_records(cached, fresh):
+    """
+    Merge newer records into a cached series, deduplicated on date
+
+    Records in fresh replace cached records with the same date. Neither
+    input is modified, so cached may be a payload shared with the memory tier.
+
+    Args:
+        cached (list): Records already stored
+        fresh (list): Records just fetched
+
+    Returns:
+        list: New list of records, newest first
+    """
+    by_date = {record.get('date'): record for record in cached}
+    by_date.update((record.get('date'), record) for record in fresh)
+    return sorted(by_date.values(), key=lambda record: record.get('date') or '', reverse=True)
@@ -0,0 +1,117 @@
+"""
+Single Flight - Leases making one process fetch a key at a time
+
+A lease row per (data_type, symbol, params) marks a fetch in progress.
+Leases are written on their own autocommit connection to a file separate
+from the cache database, so other processes see them immediately and the
+fetching thread can take and release them while its batch() holds the
+cache database's write lock. They expire after a short TTL so a crashed
+process cannot block a key.
+"""
+
+import os
+import time
+import uuid
+import sqlite3
+import threading
+
+class FetchLeases:
+    def __init__(self, database_path, busy_timeout=30.0, poll_interval=0.05):
+        """
+        Initialize the lease table
+
+        Args:
+            database_path (str): SQLite file holding the leases, which must
+                not be the cache database. An in-memory path gives leases
+                private to this process.
+            busy_timeout (float, optional): Seconds to wait for a locked database
+            poll_interval (float, optional): Seconds between checks in wait()
+        """
+        self.database_path = database_path
+        self.poll_interval = poll_interval
+
+        db_dir = os.path.dirname(database_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            database_path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        if database_path not in ('', ':memory:'):
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS fetch_leases (
+            data_type TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            params TEXT NOT NULL,
+            owner TEXT NOT NULL,
+            expires REAL NOT NULL,
+            PRIMARY KEY (data_type, symbol, params)
+        ) WITHOUT ROWID
+        """)
+
+    def acquire(self, key, ttl):
+        """
+        Take the lease on a key unless another owner holds a live one
+
+        Args:
+            key (tuple): (data_type, symbol, params)
+            ttl (float): Seconds until the lease expires
+
+        Returns:
+            str: Owner token to pass to release(), or None if the key is held
+        """
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO fetch_leases (data_type, symbol, params, owner, expires)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (data_type, symbol, params) DO UPDATE SET
+                    owner = excluded.owner, expires = excluded.expires
+                WHERE fetch_leases.expires <= ?
+                """,
+                key + (owner, now + ttl, now)
+            )
+            return owner if cursor.rowcount == 1 else None
+
+    def release(self, key, owner):
+        """Give up a lease taken with acquire()."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM fetch_leases WHERE data_type=? AND symbol=? AND params=? AND owner=?",
+                key + (owner,)
+            )
+
+    def is_held(self, key):
+        """Whether a live lease exists on a key."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM fetch_leases WHERE data_type=? AND symbol=? AND params=? AND expires > ?",
+                key + (time.time(),)
+            ).fetchone()
+        return row is not None
+
+    def wait(self, key, timeout):
+        """
+        Wait until a key's lease is released or expires
+
+        Returns:
+            bool: True if the key is free, False if timeout passed first
+        """
+        deadline = time.monotonic() + timeout
+        while self.is_held(key):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def close(self):
+        """Close the lease connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,146 @@
+"""
+Transport - Shared HTTP session for Financial Modeling Prep requests
+
+All endpoint modules send their requests through one pooled
+requests.Session, so bulk runs reuse warm keep-alive connections. Requests
+have connect and read timeouts and are retried with exponential backoff
+and full jitter on connection errors, 429 and 5xx responses, honouring
+the Retry-After header when the API sends one; a Retry-After longer than
+max_backoff ends the retries instead. Every retry is a billable
+request, so an optional on_retry hook charges the failed attempt and
+gets rate-limiter budget for the next one before it is sent.
+"""
+
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header
+
+    Args:
+        value (str): Delay in seconds or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt, backoff, max_backoff, retry_after=None):
+    """
+    Seconds to wait before retry number attempt (starting at 0)
+
+    Retry-After wins when present; otherwise the delay is drawn uniformly
+    up to backoff * 2**attempt, capped at max_backoff.
+
+    Returns:
+        float: The delay, or None if Retry-After exceeds max_backoff: a
+            retry any sooner would be refused again, so none should be made
+    """
+    if retry_after is not None:
+        return retry_after if retry_after <= max_backoff else None
+    return random.uniform(0, min(max_backoff, backoff * (2 ** attempt)))
+
+class Transport:
+    def __init__(self, base_url, api_key, pool_size=10, connect_timeout=5.0, read_timeout=30.0,
+                 max_retries=3, backoff=0.5, max_backoff=30.0, on_retry=None):
+        """
+        Initialize the transport
+
+        Args:
+            base_url (str): API base URL
+            api_key (str): Financial Modeling Prep API key, sent as a query parameter
+            pool_size (int, optional): Keep-alive connections kept per host
+            connect_timeout (float, optional): Seconds to wait for a connection
+            read_timeout (float, optional): Seconds to wait for response data
+            max_retries (int, optional): Retries after the first attempt
+            backoff (float, optional): Base delay of the exponential backoff
+            max_backoff (float, optional): Upper bound on a single delay
+            on_retry (callable, optional): Called with the endpoint before each
+                retry; returning False gives up and keeps the last outcome
+        """
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.on_retry = on_retry
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    def get(self, endpoint, path="", params=None):
+        """
+        Request an API endpoint, retrying transient failures
+
+        Args:
+            endpoint (str): API endpoint (e.g., '/v3/profile')
+            path (str, optional): Path suffix (e.g., '/AAPL')
+            params (dict, optional): Query parameters, without the API key
+
+        Returns:
+            requests.Response: The final response. Connection errors and
+                timeouts are raised once the retries are used up or
+                on_retry refuses another attempt.
+        """
+        url = f"{self.base_url}{endpoint}{path}"
+        query = dict(params or {}, apikey=self.api_key)
+
+        attempt = 0
+        while True:
+            with self._lock:
+                self.requests += 1
+            try:
+                response = self.session.get(url, params=query, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries or not self._may_retry(endpoint):
+                    raise
+                delay = backoff_delay(attempt, self.backoff, self.max_backoff)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = backoff_delay(attempt, self.backoff, self.max_backoff, retry_after)
+                if delay is None or not self._may_retry(endpoint):
+                    return response
+                response.close()
+
+            with self._lock:
+                self.retries += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def _may_retry(self, endpoint):
+        """Whether on_retry allows another attempt."""
+        return self.on_retry is None or self.on_retry(endpoint)
+
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_analyst_estimates(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("estimates", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached estimates data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_analyst_estimates(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_analyst_estimates(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("estimates", symbol, lambda: fetch_analyst_estimates(cache, symbol))
     
+    if data:
+        display_analyst_estimates(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No estimates data available for {symbol}.")
+
+def fetch_analyst_estimates(cache, symbol):
+    """Fetch analyst estimates data from the API."""
     print(f"\nFetching analyst estimates data for {symbol} from API...")
     endpoint = "/v4/analyst-estimates"
-    url = f"{cache.base_url}{endpoint}?symbol={symbol}&apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, params={'symbol': symbol})
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No estimates data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("estimates", symbol, data)
-            display_analyst_estimates(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching estimates data: {str(e)}")
+    return None
 
 def display_analyst_estimates(data, symbol):
     """Display analyst estimates data in a readable format."""
@@ -111,14 +101,7 @@ def view_all_estimates(cache):
     clear_screen()
     print_header("All Cached Analyst Estimates Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'estimates'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("estimates")
     
     if df.empty:
         print("No estimates data cached yet.")
@@ -132,9 +115,7 @@ def export_analyst_estimates(cache):
     clear_screen()
     print_header("Export Analyst Estimates Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'estimates'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("estimates")
     
     if not symbols:
         print("No estimates data available to export.")
@@ -157,7 +138,6 @@ def export_analyst_estimates(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("estimates", symbol)
+    for symbol, cached_data in cache.get_latest_many("estimates", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_estimates", "Analyst Estimates data")
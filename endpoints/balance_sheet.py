@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_balance_sheet(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("balance", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached balance sheet data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_balance_sheet(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_balance_sheet(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("balance", symbol, lambda: fetch_balance_sheet(cache, symbol))
     
+    if data:
+        display_balance_sheet(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No balance sheet data available for {symbol}.")
+
+def fetch_balance_sheet(cache, symbol):
+    """Fetch balance sheet data from the API."""
     print(f"\nFetching balance sheet data for {symbol} from API...")
     endpoint = "/v3/balance-sheet-statement"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No balance sheet data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("balance", symbol, data)
-            display_balance_sheet(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching balance sheet data: {str(e)}")
+    return None
 
 def display_balance_sheet(data, symbol):
     """Display balance sheet data in a readable format."""
@@ -112,14 +102,7 @@ def view_all_balance_sheets(cache):
     clear_screen()
     print_header("All Cached Balance Sheet Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'balance'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("balance")
     
     if df.empty:
         print("No balance sheet data cached yet.")
@@ -133,9 +116,7 @@ def export_balance_sheet(cache):
     clear_screen()
     print_header("Export Balance Sheet Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'balance'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("balance")
     
     if not symbols:
         print("No balance sheet data available to export.")
@@ -158,7 +139,6 @@ def export_balance_sheet(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("balance", symbol)
+    for symbol, cached_data in cache.get_latest_many("balance", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_balance_sheet", "Balance Sheet data")
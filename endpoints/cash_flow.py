@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_cash_flow(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("cashflow", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached cash flow data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_cash_flow(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_cash_flow(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("cashflow", symbol, lambda: fetch_cash_flow(cache, symbol))
     
+    if data:
+        display_cash_flow(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No cash flow data available for {symbol}.")
+
+def fetch_cash_flow(cache, symbol):
+    """Fetch cash flow data from the API."""
     print(f"\nFetching cash flow data for {symbol} from API...")
     endpoint = "/v3/cash-flow-statement"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No cash flow data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("cashflow", symbol, data)
-            display_cash_flow(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching cash flow data: {str(e)}")
+    return None
 
 def display_cash_flow(data, symbol):
     """Display cash flow data in a readable format."""
@@ -112,14 +102,7 @@ def view_all_cash_flows(cache):
     clear_screen()
     print_header("All Cached Cash Flow Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'cashflow'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("cashflow")
     
     if df.empty:
         print("No cash flow data cached yet.")
@@ -133,9 +116,7 @@ def export_cash_flow(cache):
     clear_screen()
     print_header("Export Cash Flow Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'cashflow'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("cashflow")
     
     if not symbols:
         print("No cash flow data available to export.")
@@ -158,7 +139,6 @@ def export_cash_flow(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("cashflow", symbol)
+    for symbol, cached_data in cache.get_latest_many("cashflow", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_cash_flow", "Cash Flow data")
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_company_outlook(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("outlook", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached outlook data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_company_outlook(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_company_outlook(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("outlook", symbol, lambda: fetch_company_outlook(cache, symbol))
     
+    if data:
+        display_company_outlook(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No outlook data available for {symbol}.")
+
+def fetch_company_outlook(cache, symbol):
+    """Fetch company outlook data from the API."""
     print(f"\nFetching company outlook data for {symbol} from API...")
     endpoint = "/v4/company-outlook"
-    url = f"{cache.base_url}{endpoint}?symbol={symbol}&apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, params={'symbol': symbol})
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No outlook data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("outlook", symbol, data)
-            display_company_outlook(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching outlook data: {str(e)}")
+    return None
 
 def display_company_outlook(data, symbol):
     """Display company outlook data in a readable format."""
@@ -110,14 +100,7 @@ def view_all_outlooks(cache):
     clear_screen()
     print_header("All Cached Company Outlook Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'outlook'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("outlook")
     
     if df.empty:
         print("No outlook data cached yet.")
@@ -131,9 +114,7 @@ def export_company_outlook(cache):
     clear_screen()
     print_header("Export Company Outlook Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'outlook'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("outlook")
     
     if not symbols:
         print("No outlook data available to export.")
@@ -156,7 +137,6 @@ def export_company_outlook(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("outlook", symbol)
+    for symbol, cached_data in cache.get_latest_many("outlook", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_outlook", "Company Outlook data")
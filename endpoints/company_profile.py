@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_company_profile(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("profile", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached profile data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_company_profile(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_company_profile(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("profile", symbol, lambda: fetch_company_profile(cache, symbol))
     
+    if data:
+        display_company_profile(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No profile data available for {symbol}.")
+
+def fetch_company_profile(cache, symbol):
+    """Fetch company profile data from the API."""
     print(f"\nFetching company profile data for {symbol} from API...")
     endpoint = "/v3/profile"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No profile data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("profile", symbol, data)
-            display_company_profile(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching profile data: {str(e)}")
+    return None
 
 def display_company_profile(data, symbol):
     """Display company profile data in a readable format."""
@@ -108,14 +98,7 @@ def view_all_profiles(cache):
     clear_screen()
     print_header("All Cached Company Profiles")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'profile'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("profile")
     
     if df.empty:
         print("No profile data cached yet.")
@@ -129,9 +112,7 @@ def export_company_profile(cache):
     clear_screen()
     print_header("Export Company Profile Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'profile'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("profile")
     
     if not symbols:
         print("No profile data available to export.")
@@ -154,7 +135,6 @@ def export_company_profile(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("profile", symbol)
+    for symbol, cached_data in cache.get_latest_many("profile", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_profile", "Company Profile data")
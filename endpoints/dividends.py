@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_dividends(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("dividends", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached dividend data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_dividends(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_dividends(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("dividends", symbol, lambda: fetch_dividends(cache, symbol))
     
+    if data:
+        display_dividends(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No dividend data available for {symbol}.")
+
+def fetch_dividends(cache, symbol):
+    """Fetch dividend data from the API."""
     print(f"\nFetching dividend data for {symbol} from API...")
     endpoint = "/v3/historical-price-full/stock_dividend"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data or 'historical' not in data:
-                print(f"No dividend data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("dividends", symbol, data['historical'])
-            display_dividends(data['historical'], symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data['historical']
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching dividend data: {str(e)}")
+    return None
 
 def display_dividends(data, symbol):
     """Display dividend data in a readable format."""
@@ -112,14 +102,7 @@ def view_all_dividends(cache):
     clear_screen()
     print_header("All Cached Dividend Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'dividends'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("dividends")
     
     if df.empty:
         print("No dividend data cached yet.")
@@ -133,9 +116,7 @@ def export_dividends(cache):
     clear_screen()
     print_header("Export Dividend Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'dividends'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("dividends")
     
     if not symbols:
         print("No dividend data available to export.")
@@ -158,7 +139,6 @@ def export_dividends(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("dividends", symbol)
+    for symbol, cached_data in cache.get_latest_many("dividends", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_dividends", "Dividend data")
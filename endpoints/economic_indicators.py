@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -40,42 +39,33 @@ def get_economic_indicators(cache):
         print("No indicator entered.")
         return
     
-    cached_data = cache.get_cached_data("economic", indicator)
-    
-    if cached_data:
-        print(f"\nFound cached data for {indicator}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_economic_indicators(cached_data, indicator)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_economic_indicators(cached_data, indicator)
-        else:
-            print("No cached data available for this indicator.")
-        return
+    data = cache.get_or_fetch("economic", indicator, lambda: fetch_economic_indicators(cache, indicator))
     
+    if data:
+        display_economic_indicators(data, indicator)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this indicator.")
+    else:
+        print(f"No data available for {indicator}.")
+
+def fetch_economic_indicators(cache, indicator):
+    """Fetch economic indicators data from the API."""
     print(f"\nFetching economic indicator data for {indicator} from API...")
     endpoint = "/v3/economic"
-    url = f"{cache.base_url}{endpoint}?name={indicator}&apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, params={'name': indicator})
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No data available for {indicator}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("economic", indicator, data)
-            display_economic_indicators(data, indicator)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching economic indicator data: {str(e)}")
+    return None
 
 def display_economic_indicators(data, indicator):
     """Display economic indicators data in a readable format."""
@@ -111,14 +101,7 @@ def view_all_indicators(cache):
     clear_screen()
     print_header("All Cached Economic Indicators Data")
     
-    query = """
-    SELECT symbol as indicator, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'economic'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("economic")
     
     if df.empty:
         print("No economic indicator data cached yet.")
@@ -132,9 +115,7 @@ def export_economic_indicators(cache):
     clear_screen()
     print_header("Export Economic Indicators Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'economic'")
-    results = cache.db.fetchall()
-    indicators = [row[0] for row in results] if results else []
+    indicators = cache.list_symbols("economic")
     
     if not indicators:
         print("No indicator data available to export.")
@@ -157,7 +138,6 @@ def export_economic_indicators(cache):
         print("Invalid choice.")
         return
     
-    for indicator in indicators_to_export:
-        cached_data = cache.get_cached_data("economic", indicator)
+    for indicator, cached_data in cache.get_latest_many("economic", indicators_to_export):
         if cached_data:
             export_data(cached_data, f"{indicator}_economic", "Economic Indicator data")
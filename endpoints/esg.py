@@ -2,7 +2,6 @@
 ESG Endpoint - Handles ESG data retrieval and processing
 """
 
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -48,57 +47,33 @@ def get_esg_data(cache):
         print("No symbol entered.")
         return
     
-    # Check if we have cached data
-    cached_data = cache.get_cached_data("esg", symbol)
+    data = cache.get_or_fetch("esg", symbol, lambda: fetch_esg_data(cache, symbol))
     
-    if cached_data:
-        print(f"\nFound cached ESG data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        
-        if refresh != 'y':
-            display_esg_data(cached_data, symbol)
-            return
-    
-    # Check if we've reached API limit
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_esg_data(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
-    
-    # Make API request
+    if data:
+        display_esg_data(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No ESG data available for {symbol}.")
+
+def fetch_esg_data(cache, symbol):
+    """Fetch ESG data from the API."""
     print(f"\nFetching ESG data for {symbol} from API...")
-    
     endpoint = "/v4/esg-environmental-social-governance-data"
-    url = f"{cache.base_url}{endpoint}?symbol={symbol}&apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
-        
+        response = cache.transport.get(endpoint, params={'symbol': symbol})
         if response.status_code == 200:
             data = response.json()
-            
             if not data:
-                print(f"No ESG data available for {symbol}.")
-                return
-            
-            # Track the API request
+                return None
             cache.track_api_request(endpoint)
-            
-            # Save to cache
-            cache.save_data("esg", symbol, data)
-            
-            # Display the data
-            display_esg_data(data, symbol)
-            
-        else:
-            print(f"API request failed with status code {response.status_code}")
-            
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching ESG data: {str(e)}")
+    return None
 
 def display_esg_data(data, symbol):
     """Display ESG data in a readable format."""
@@ -148,17 +123,7 @@ def view_all_esg_data(cache):
     clear_screen()
     print_header("All Cached ESG Data")
     
-    query = """
-    SELECT 
-        symbol, 
-        MAX(last_updated) as last_updated,
-        COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'esg'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("esg")
     
     if df.empty:
         print("No ESG data cached yet.")
@@ -174,11 +139,7 @@ def export_esg_data(cache):
     print_header("Export ESG Data")
     
     # Get available symbols
-    cache.db.execute(
-        "SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'esg'"
-    )
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("esg")
     
     if not symbols:
         print("No ESG data available to export.")
@@ -204,7 +165,6 @@ def export_esg_data(cache):
         return
     
     # Export data
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("esg", symbol)
+    for symbol, cached_data in cache.get_latest_many("esg", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_esg_data", "ESG data")
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_financial_ratios(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("ratios", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached ratios data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_financial_ratios(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_financial_ratios(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("ratios", symbol, lambda: fetch_financial_ratios(cache, symbol))
     
+    if data:
+        display_financial_ratios(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No ratios data available for {symbol}.")
+
+def fetch_financial_ratios(cache, symbol):
+    """Fetch financial ratios data from the API."""
     print(f"\nFetching financial ratios data for {symbol} from API...")
     endpoint = "/v3/ratios"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No ratios data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("ratios", symbol, data)
-            display_financial_ratios(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching ratios data: {str(e)}")
+    return None
 
 def display_financial_ratios(data, symbol):
     """Display financial ratios data in a readable format."""
@@ -113,14 +103,7 @@ def view_all_ratios(cache):
     clear_screen()
     print_header("All Cached Financial Ratios Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'ratios'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("ratios")
     
     if df.empty:
         print("No ratios data cached yet.")
@@ -134,9 +117,7 @@ def export_financial_ratios(cache):
     clear_screen()
     print_header("Export Financial Ratios Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'ratios'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("ratios")
     
     if not symbols:
         print("No ratios data available to export.")
@@ -159,7 +140,6 @@ def export_financial_ratios(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("ratios", symbol)
+    for symbol, cached_data in cache.get_latest_many("ratios", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_ratios", "Financial Ratios data")
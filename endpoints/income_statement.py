@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -44,43 +43,33 @@ def get_income_statement(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("income", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached income statement data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_income_statement(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_income_statement(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("income", symbol, lambda: fetch_income_statement(cache, symbol))
     
+    if data:
+        display_income_statement(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No income statement data available for {symbol}.")
+
+def fetch_income_statement(cache, symbol):
+    """Fetch income statement data from the API."""
     print(f"\nFetching income statement data for {symbol} from API...")
     endpoint = "/v3/income-statement"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No income statement data available for {symbol}.")
-                return
-            
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("income", symbol, data)
-            display_income_statement(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching income statement data: {str(e)}")
+    return None
 
 def display_income_statement(data, symbol):
     """Display income statement data in a readable format."""
@@ -119,17 +108,7 @@ def view_all_income_statements(cache):
     clear_screen()
     print_header("All Cached Income Statement Data")
     
-    query = """
-    SELECT 
-        symbol, 
-        MAX(last_updated) as last_updated,
-        COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'income'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("income")
     
     if df.empty:
         print("No income statement data cached yet.")
@@ -144,11 +123,7 @@ def export_income_statement(cache):
     clear_screen()
     print_header("Export Income Statement Data")
     
-    cache.db.execute(
-        "SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'income'"
-    )
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("income")
     
     if not symbols:
         print("No income statement data available to export.")
@@ -171,7 +146,6 @@ def export_income_statement(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("income", symbol)
+    for symbol, cached_data in cache.get_latest_many("income", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_income_statement", "Income Statement data")
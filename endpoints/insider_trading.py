@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_insider_trading(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("insider", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached insider trading data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_insider_trading(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_insider_trading(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("insider", symbol, lambda: fetch_insider_trading(cache, symbol))
     
+    if data:
+        display_insider_trading(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No insider trading data available for {symbol}.")
+
+def fetch_insider_trading(cache, symbol):
+    """Fetch insider trading data from the API."""
     print(f"\nFetching insider trading data for {symbol} from API...")
     endpoint = "/v4/insider-trading"
-    url = f"{cache.base_url}{endpoint}?symbol={symbol}&apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, params={'symbol': symbol})
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No insider trading data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("insider", symbol, data)
-            display_insider_trading(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching insider trading data: {str(e)}")
+    return None
 
 def display_insider_trading(data, symbol):
     """Display insider trading data in a readable format."""
@@ -113,14 +103,7 @@ def view_all_insider_trades(cache):
     clear_screen()
     print_header("All Cached Insider Trading Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'insider'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("insider")
     
     if df.empty:
         print("No insider trading data cached yet.")
@@ -134,9 +117,7 @@ def export_insider_trading(cache):
     clear_screen()
     print_header("Export Insider Trading Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'insider'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("insider")
     
     if not symbols:
         print("No insider trading data available to export.")
@@ -159,7 +140,6 @@ def export_insider_trading(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("insider", symbol)
+    for symbol, cached_data in cache.get_latest_many("insider", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_insider_trading", "Insider Trading data")
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_institutional_holders(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("holders", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached holders data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_institutional_holders(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_institutional_holders(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("holders", symbol, lambda: fetch_institutional_holders(cache, symbol))
     
+    if data:
+        display_institutional_holders(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No holders data available for {symbol}.")
+
+def fetch_institutional_holders(cache, symbol):
+    """Fetch institutional holders data from the API."""
     print(f"\nFetching institutional holders data for {symbol} from API...")
     endpoint = "/v3/institutional-holder"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No holders data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("holders", symbol, data)
-            display_institutional_holders(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching holders data: {str(e)}")
+    return None
 
 def display_institutional_holders(data, symbol):
     """Display institutional holders data in a readable format."""
@@ -110,14 +100,7 @@ def view_all_holders(cache):
     clear_screen()
     print_header("All Cached Institutional Holders Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'holders'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("holders")
     
     if df.empty:
         print("No holders data cached yet.")
@@ -131,9 +114,7 @@ def export_institutional_holders(cache):
     clear_screen()
     print_header("Export Institutional Holders Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'holders'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("holders")
     
     if not symbols:
         print("No holders data available to export.")
@@ -156,7 +137,6 @@ def export_institutional_holders(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("holders", symbol)
+    for symbol, cached_data in cache.get_latest_many("holders", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_holders", "Institutional Holders data")
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -44,43 +43,33 @@ def get_key_metrics(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("metrics", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached key metrics data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_key_metrics(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_key_metrics(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("metrics", symbol, lambda: fetch_key_metrics(cache, symbol))
     
+    if data:
+        display_key_metrics(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No key metrics data available for {symbol}.")
+
+def fetch_key_metrics(cache, symbol):
+    """Fetch key metrics data from the API."""
     print(f"\nFetching key metrics data for {symbol} from API...")
     endpoint = "/v3/key-metrics"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No key metrics data available for {symbol}.")
-                return
-            
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("metrics", symbol, data)
-            display_key_metrics(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching key metrics data: {str(e)}")
+    return None
 
 def display_key_metrics(data, symbol):
     """Display key metrics data in a readable format."""
@@ -119,17 +108,7 @@ def view_all_key_metrics(cache):
     clear_screen()
     print_header("All Cached Key Metrics Data")
     
-    query = """
-    SELECT 
-        symbol, 
-        MAX(last_updated) as last_updated,
-        COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'metrics'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("metrics")
     
     if df.empty:
         print("No key metrics data cached yet.")
@@ -144,11 +123,7 @@ def export_key_metrics(cache):
     clear_screen()
     print_header("Export Key Metrics Data")
     
-    cache.db.execute(
-        "SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'metrics'"
-    )
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("metrics")
     
     if not symbols:
         print("No key metrics data available to export.")
@@ -171,7 +146,6 @@ def export_key_metrics(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("metrics", symbol)
+    for symbol, cached_data in cache.get_latest_many("metrics", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_key_metrics", "Key Metrics data")
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_market_cap(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("marketcap", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached market cap data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_market_cap(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_market_cap(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("marketcap", symbol, lambda: fetch_market_cap(cache, symbol))
     
+    if data:
+        display_market_cap(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No market cap data available for {symbol}.")
+
+def fetch_market_cap(cache, symbol):
+    """Fetch market cap data from the API."""
     print(f"\nFetching market cap data for {symbol} from API...")
     endpoint = "/v3/historical-market-capitalization"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No market cap data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("marketcap", symbol, data)
-            display_market_cap(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching market cap data: {str(e)}")
+    return None
 
 def display_market_cap(data, symbol):
     """Display market cap data in a readable format."""
@@ -110,14 +100,7 @@ def view_all_market_caps(cache):
     clear_screen()
     print_header("All Cached Market Cap Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'marketcap'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("marketcap")
     
     if df.empty:
         print("No market cap data cached yet.")
@@ -131,9 +114,7 @@ def export_market_cap(cache):
     clear_screen()
     print_header("Export Market Cap Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'marketcap'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("marketcap")
     
     if not symbols:
         print("No market cap data available to export.")
@@ -156,7 +137,6 @@ def export_market_cap(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("marketcap", symbol)
+    for symbol, cached_data in cache.get_latest_many("marketcap", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_marketcap", "Market Cap data")
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_revenue_breakdown(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("revenue", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached revenue breakdown data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_revenue_breakdown(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_revenue_breakdown(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("revenue", symbol, lambda: fetch_revenue_breakdown(cache, symbol))
     
+    if data:
+        display_revenue_breakdown(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No revenue breakdown data available for {symbol}.")
+
+def fetch_revenue_breakdown(cache, symbol):
+    """Fetch revenue breakdown data from the API."""
     print(f"\nFetching revenue breakdown data for {symbol} from API...")
     endpoint = "/v4/revenue-breakdown"
-    url = f"{cache.base_url}{endpoint}?symbol={symbol}&apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, params={'symbol': symbol})
         if response.status_code == 200:
             data = response.json()
             if not data or 'breakdown' not in data:
-                print(f"No revenue breakdown data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("revenue", symbol, data)
-            display_revenue_breakdown(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching revenue breakdown data: {str(e)}")
+    return None
 
 def display_revenue_breakdown(data, symbol):
     """Display revenue breakdown data in a readable format."""
@@ -118,14 +108,7 @@ def view_all_breakdowns(cache):
     clear_screen()
     print_header("All Cached Revenue Breakdown Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'revenue'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("revenue")
     
     if df.empty:
         print("No revenue breakdown data cached yet.")
@@ -139,9 +122,7 @@ def export_revenue_breakdown(cache):
     clear_screen()
     print_header("Export Revenue Breakdown Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'revenue'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("revenue")
     
     if not symbols:
         print("No revenue breakdown data available to export.")
@@ -164,7 +145,6 @@ def export_revenue_breakdown(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("revenue", symbol)
+    for symbol, cached_data in cache.get_latest_many("revenue", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_revenue_breakdown", "Revenue Breakdown data")
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_sec_filings(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("filings", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached filings data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_sec_filings(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_sec_filings(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("filings", symbol, lambda: fetch_sec_filings(cache, symbol))
     
+    if data:
+        display_sec_filings(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No filings data available for {symbol}.")
+
+def fetch_sec_filings(cache, symbol):
+    """Fetch SEC filings data from the API."""
     print(f"\nFetching SEC filings data for {symbol} from API...")
     endpoint = "/v3/sec_filings"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No filings data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("filings", symbol, data)
-            display_sec_filings(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching filings data: {str(e)}")
+    return None
 
 def display_sec_filings(data, symbol):
     """Display SEC filings data in a readable format."""
@@ -111,14 +101,7 @@ def view_all_filings(cache):
     clear_screen()
     print_header("All Cached SEC Filings Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'filings'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("filings")
     
     if df.empty:
         print("No filings data cached yet.")
@@ -132,9 +115,7 @@ def export_sec_filings(cache):
     clear_screen()
     print_header("Export SEC Filings Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'filings'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("filings")
     
     if not symbols:
         print("No filings data available to export.")
@@ -157,7 +138,6 @@ def export_sec_filings(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("filings", symbol)
+    for symbol, cached_data in cache.get_latest_many("filings", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_filings", "SEC Filings data")
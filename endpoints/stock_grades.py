@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_stock_grades(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("grades", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached grades data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_stock_grades(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_stock_grades(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("grades", symbol, lambda: fetch_stock_grades(cache, symbol))
     
+    if data:
+        display_stock_grades(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No grades data available for {symbol}.")
+
+def fetch_stock_grades(cache, symbol):
+    """Fetch stock grades data from the API."""
     print(f"\nFetching stock grades data for {symbol} from API...")
     endpoint = "/v3/grades"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}")
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No grades data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("grades", symbol, data)
-            display_stock_grades(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching grades data: {str(e)}")
+    return None
 
 def display_stock_grades(data, symbol):
     """Display stock grades data in a readable format."""
@@ -112,14 +102,7 @@ def view_all_grades(cache):
     clear_screen()
     print_header("All Cached Stock Grades Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'grades'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("grades")
     
     if df.empty:
         print("No grades data cached yet.")
@@ -133,9 +116,7 @@ def export_stock_grades(cache):
     clear_screen()
     print_header("Export Stock Grades Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'grades'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("grades")
     
     if not symbols:
         print("No grades data available to export.")
@@ -158,7 +139,6 @@ def export_stock_grades(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("grades", symbol)
+    for symbol, cached_data in cache.get_latest_many("grades", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_grades", "Stock Grades data")
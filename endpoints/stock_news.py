@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
@@ -39,42 +38,33 @@ def get_stock_news(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("news", symbol)
-    
-    if cached_data:
-        print(f"\nFound cached news data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_stock_news(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_stock_news(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
+    data = cache.get_or_fetch("news", symbol, lambda: fetch_stock_news(cache, symbol))
     
+    if data:
+        display_stock_news(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No news data available for {symbol}.")
+
+def fetch_stock_news(cache, symbol):
+    """Fetch stock news data from the API."""
     print(f"\nFetching stock news data for {symbol} from API...")
     endpoint = "/v3/stock_news"
-    url = f"{cache.base_url}{endpoint}?tickers={symbol}&limit=50&apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, params={'tickers': symbol, 'limit': 50})
         if response.status_code == 200:
             data = response.json()
             if not data:
-                print(f"No news data available for {symbol}.")
-                return
+                return None
             cache.track_api_request(endpoint)
-            cache.save_data("news", symbol, data)
-            display_stock_news(data, symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            return data
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching news data: {str(e)}")
+    return None
 
 def display_stock_news(data, symbol):
     """Display stock news data in a readable format."""
@@ -111,14 +101,7 @@ def view_all_news(cache):
     clear_screen()
     print_header("All Cached Stock News Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'news'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("news")
     
     if df.empty:
         print("No news data cached yet.")
@@ -132,9 +115,7 @@ def export_stock_news(cache):
     clear_screen()
     print_header("Export Stock News Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'news'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("news")
     
     if not symbols:
         print("No news data available to export.")
@@ -157,7 +138,6 @@ def export_stock_news(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("news", symbol)
+    for symbol, cached_data in cache.get_latest_many("news", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_news", "Stock News data")
@@ -1,7 +1,7 @@
-import requests
 import pandas as pd
 from tabulate import tabulate
 from utils.display import print_header, clear_screen, print_menu
+from core.series import merge_records
 
 def handle(cache):
     """Handle Stock Price data operations"""
@@ -39,42 +39,78 @@ def get_stock_price(cache):
         print("No symbol entered.")
         return
     
-    cached_data = cache.get_cached_data("price", symbol)
+    data = cache.get_or_fetch("price", symbol, lambda: fetch_stock_price(cache, symbol))
     
-    if cached_data:
-        print(f"\nFound cached price data for {symbol}.")
-        refresh = input("Do you want to refresh from API? (y/N): ").strip().lower()
-        if refresh != 'y':
-            display_stock_price(cached_data, symbol)
-            return
-    
-    if cache.check_api_limit_reached():
-        print("\nWARNING: Daily API request limit (250) reached.")
-        if cached_data:
-            print("Using cached data instead.")
-            display_stock_price(cached_data, symbol)
-        else:
-            print("No cached data available for this symbol.")
-        return
-    
-    print(f"\nFetching stock price data for {symbol} from API...")
+    if data:
+        display_stock_price(data, symbol)
+    elif cache.check_api_limit_reached():
+        print(f"\nWARNING: Daily API request limit ({cache.daily_limit}) reached.")
+        print("No cached data available for this symbol.")
+    else:
+        print(f"No price data available for {symbol}.")
+
+def fetch_stock_price(cache, symbol, full=False):
+    """
+    Fetch stock price data from the API
+
+    When bars are already cached, only bars from the last cached date on are
+    requested and merged into the cached history. The last cached bar is
+    requested again: if the API now reports different prices for it, a
+    split or dividend adjustment has rewritten the history and the full
+    history is reloaded instead.
+
+    Args:
+        cache (CacheManager): The cache manager instance
+        symbol (str): Stock symbol
+        full (bool, optional): Always download the full history
+
+    Returns:
+        list: Price bars, newest first, or None on failure
+    """
+    cached = None if full else cache.get_cached_data("price", symbol)
+    last_date = max((bar['date'] for bar in cached or [] if bar.get('date')), default=None)
+    if last_date is None:
+        print(f"\nFetching stock price data for {symbol} from API...")
+        params = None
+    else:
+        print(f"\nFetching stock prices for {symbol} since {last_date} from API...")
+        params = {'from': last_date}
     endpoint = "/v3/historical-price-full"
-    url = f"{cache.base_url}{endpoint}/{symbol}?apikey={cache.api_key}"
     
     try:
-        response = requests.get(url)
+        response = cache.transport.get(endpoint, f"/{symbol}", params)
         if response.status_code == 200:
-            data = response.json()
-            if not data or 'historical' not in data:
-                print(f"No price data available for {symbol}.")
-                return
+            data = response.json() or {}
             cache.track_api_request(endpoint)
-            cache.save_data("price", symbol, data['historical'])
-            display_stock_price(data['historical'], symbol)
-        else:
-            print(f"API request failed with status code {response.status_code}")
+            fresh = data.get('historical') or []
+            if last_date is None:
+                return fresh or None
+
+            cached_last = next(bar for bar in cached if bar.get('date') == last_date)
+            fresh_last = next((bar for bar in fresh if bar.get('date') == last_date), None)
+            if fresh_last is not None and _prices_differ(cached_last, fresh_last):
+                print("Price adjustment detected, reloading the full history...")
+                if cache.check_api_limit_reached():
+                    print(f"Daily API request limit ({cache.daily_limit}) reached, keeping the cached history.")
+                    return None
+                if not cache.acquire_api_budget():
+                    return None
+                return fetch_stock_price(cache, symbol, full=True)
+            return merge_records(cached, fresh)
+        print(f"API request failed with status code {response.status_code}")
     except Exception as e:
         print(f"Error fetching price data: {str(e)}")
+    return None
+
+def _prices_differ(cached_bar, fresh_bar):
+    """Check whether two versions of the same bar report different prices."""
+    for field in ('close', 'adjClose'):
+        old, new = cached_bar.get(field), fresh_bar.get(field)
+        if old is None or new is None:
+            continue
+        if abs(old - new) > 1e-6 * max(1.0, abs(old)):
+            return True
+    return False
 
 def display_stock_price(data, symbol):
     """Display stock price data in a readable format."""
@@ -114,14 +150,7 @@ def view_all_prices(cache):
     clear_screen()
     print_header("All Cached Stock Price Data")
     
-    query = """
-    SELECT symbol, MAX(last_updated) as last_updated, COUNT(*) as data_points
-    FROM cache_data
-    WHERE data_type = 'price'
-    GROUP BY symbol
-    """
-    
-    df = pd.read_sql_query(query, cache.db.conn)
+    df = cache.get_cache_summary("price")
     
     if df.empty:
         print("No price data cached yet.")
@@ -135,9 +164,7 @@ def export_stock_price(cache):
     clear_screen()
     print_header("Export Stock Price Data")
     
-    cache.db.execute("SELECT DISTINCT symbol FROM cache_data WHERE data_type = 'price'")
-    results = cache.db.fetchall()
-    symbols = [row[0] for row in results] if results else []
+    symbols = cache.list_symbols("price")
     
     if not symbols:
         print("No price data available to export.")
@@ -160,7 +187,6 @@ def export_stock_price(cache):
         print("Invalid choice.")
         return
     
-    for symbol in symbols_to_export:
-        cached_data = cache.get_cached_data("price", symbol)
+    for symbol, cached_data in cache.get_latest_many("price", symbols_to_export):
         if cached_data:
             export_data(cached_data, f"{symbol}_price", "Stock Price data")
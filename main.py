@@ -55,6 +55,11 @@ def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Financial Data Cache CLI Tool")
     parser.add_argument("--summary", action="store_true", help="Show cache summary")
+    parser.add_argument("--compact", action="store_true", help="Delete cache versions expired by the retention policy")
+    parser.add_argument("--archive", action="store_true", help="Move superseded cache versions into the archive database")
+    parser.add_argument("--evict", action="store_true", help="Evict cached keys until the cache fits max_cache_bytes")
+    parser.add_argument("--recompress", action="store_true", help="Rewrite cached payloads with the configured compression codec")
+    parser.add_argument("--train-dictionary", metavar="DATA_TYPE", help="Train a zstd compression dictionary for a data type")
     args = parser.parse_args()
     
     # Show summary if requested
@@ -62,6 +67,32 @@ def main():
         display_summary(cache)
         sys.exit(0)
     
+    # Run a compaction pass if requested
+    if args.compact:
+        run_compaction(cache)
+        sys.exit(0)
+    
+    # Move old versions into the archive if requested
+    if args.archive:
+        run_archive(cache)
+        sys.exit(0)
+    
+    # Enforce the cache size budget if requested
+    if args.evict:
+        run_eviction(cache)
+        sys.exit(0)
+    
+    # Rewrite stored payloads if requested
+    if args.recompress:
+        run_recompression(cache)
+        sys.exit(0)
+    
+    # Train a compression dictionary if requested
+    if args.train_dictionary:
+        dict_id = cache.train_dictionary(args.train_dictionary)
+        print(f"Stored compression dictionary {dict_id} for '{args.train_dictionary}'.")
+        sys.exit(0)
+    
     # Main application loop
     while True:
         clear_screen()
@@ -98,7 +129,41 @@ def display_summary(cache):
     
     # Get today's API usage
     usage = cache.get_daily_request_count()
-    print(f"API Requests Today: {usage}/250\n")
+    if cache.daily_limit:
+        print(f"API Requests Today: {usage}/{cache.daily_limit}")
+    else:
+        print(f"API Requests Today: {usage}")
+    
+    # Memory tier counters for this session
+    memory = cache.memory_stats()
+    if memory:
+        print(f"Memory Cache: {memory['hits']} hits, {memory['misses']} misses, "
+              f"{memory['evictions']} evictions, {memory['bytes']:,}/{memory['max_bytes']:,} bytes")
+    print("")
+
+    # Refreshes that returned data identical to what was cached
+    refreshes = cache.refresh_stats()
+    if not refreshes.empty:
+        print("Unchanged Refreshes:")
+        print(tabulate(refreshes, headers="keys", tablefmt="pretty", showindex=False))
+        print("")
+    
+    # Stored size per data type (from cache_stats) and per table (from dbstat)
+    by_type, tables = cache.storage_stats()
+    if not by_type.empty:
+        print("Storage by Data Type:")
+        print(tabulate(by_type, headers="keys", tablefmt="pretty", showindex=False))
+        print("")
+    if not tables.empty:
+        print("Largest Tables:")
+        print(tabulate(tables.sort_values('bytes', ascending=False).head(10),
+                       headers="keys", tablefmt="pretty", showindex=False))
+        print("")
+    if cache.blobs is not None:
+        blob_count, blob_bytes = cache.blobs.stats()
+        if blob_count:
+            print(f"Blob Store: {blob_count:,} blobs, {blob_bytes:,} bytes ({cache.blobs.root})")
+            print("")
     
     # Get all cached data summary
     all_data = cache.get_cache_summary()
@@ -108,6 +173,62 @@ def display_summary(cache):
     else:
         print(tabulate(all_data, headers="keys", tablefmt="pretty"))
 
+def run_compaction(cache):
+    """Apply the retention policy and shrink the database file."""
+    print_header("Cache Compaction")
+    
+    if cache.enable_incremental_vacuum():
+        print("Enabled incremental vacuum (one-off database rebuild).")
+    
+    result = cache.compact()
+    action = "Archived" if result['archived'] else "Deleted"
+    print(f"{action} {result['deleted_versions']} expired versions.")
+    print(f"Released {result['released_pages']} database pages.")
+    
+    blobs = cache.collect_blobs()
+    if blobs['removed_blobs']:
+        print(f"Removed {blobs['removed_blobs']} unreferenced blobs ({blobs['freed_bytes']:,} bytes).")
+
+def run_archive(cache):
+    """Move superseded versions into the archive database."""
+    print_header("Version Archive")
+    
+    if cache.archive is None:
+        print("The archive is disabled; enable it under 'archive' in config.json.")
+        return
+    
+    result = cache.archive_versions()
+    versions, stored, file_size = cache.archive.stats()
+    print(f"Archived {result['archived_versions']} versions older than {cache.archive_after_days} days.")
+    print(f"Released {result['released_pages']} database pages.")
+    print(f"Archive: {versions:,} versions, {stored:,} bytes stored, {file_size:,} bytes on disk ({cache.archive.path})")
+
+def run_eviction(cache):
+    """Evict the lowest-priority keys until the cache fits its size budget."""
+    print_header("Cache Eviction")
+    
+    if not cache.max_cache_bytes:
+        print("No size budget; set 'max_cache_bytes' under 'eviction' in config.json.")
+        return
+    
+    result = cache.evict()
+    print(f"Evicted {result['evicted_keys']} keys ({result['freed_bytes']:,} bytes).")
+    print(f"Released {result['released_pages']} database pages.")
+
+def run_recompression(cache):
+    """Rewrite cached payloads with the configured codec and report the savings."""
+    print_header("Cache Recompression")
+    
+    result = cache.recompress()
+    if not result['rows']:
+        print("All cached payloads already use the configured codec.")
+        return
+    
+    saved = result['bytes_before'] - result['bytes_after']
+    print(f"Rewrote {result['rows']} payloads with {cache.codec.name}.")
+    print(f"Size: {result['bytes_before']:,} -> {result['bytes_after']:,} bytes ({saved:,} bytes saved)")
+    print(f"Decode time per payload: {result['decode_ms_before']:.3f} ms -> {result['decode_ms_after']:.3f} ms")
+
 def handle_endpoint(cache, endpoint_name):
     """Handle operations for a specific endpoint."""
     # Import the endpoint module dynamically
@@ -0,0 +1,48 @@
+"""
+Shared fixtures
+
+CacheManager reads config.json from the working directory, so every test
+runs in its own temporary directory with a freshly written default config.
+"""
+
+import copy
+import pytest
+
+from utils import config as config_module
+from core.cache_manager import CacheManager
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    """Default configuration, with background compaction disabled."""
+    monkeypatch.chdir(tmp_path)
+    config = config_module.create_default_config()
+    config['compaction_interval'] = 0
+    return config
+
+@pytest.fixture
+def make_cache(tmp_path, settings):
+    """
+    Factory creating CacheManager instances on a database in tmp_path
+
+    Keyword arguments replace top-level config entries; 'name' picks the
+    database file and the rest is passed to CacheManager. Every cache is
+    closed at the end of the test.
+    """
+    caches = []
+
+    def make(name='cache.db', config=None, **kwargs):
+        values = copy.deepcopy(settings)
+        values.update(config or {})
+        config_module.save_config(values)
+        cache = CacheManager("test-key", str(tmp_path / name), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+@pytest.fixture
+def cache(make_cache):
+    """A cache with the default configuration."""
+    return make_cache()
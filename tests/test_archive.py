@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+from core.archive import VersionArchive
+
+ROW = (1, 'profile', 'AAPL', '2024-01-01 00:00:00', None, b'data', 'zlib', 'json', 'hash', '2024-02-01 00:00:00')
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = VersionArchive(str(tmp_path / 'archive.db'))
+    yield archive
+    archive.close()
+
+@pytest.fixture
+def archived_cache(make_cache):
+    return make_cache(config={'archive': {'enabled': True, 'after_days': 30, 'codec': 'zlib'}})
+
+def test_archive_is_created_on_first_write(archive, tmp_path):
+    assert archive.versions('profile', 'AAPL') == []
+    assert archive.stats() == (0, 0, 0)
+    assert not (tmp_path / 'archive.db').exists()
+
+    assert archive.append([ROW]) == 1
+    assert archive.versions('profile', 'AAPL') == [(1, '2024-01-01 00:00:00', None, 4)]
+    assert archive.get_version(1) == ROW
+
+def test_archive_is_append_only(archive):
+    archive.append([ROW])
+    # Retrying a move leaves the archived version unchanged
+    assert archive.append([ROW[:5] + (b'other',) + ROW[6:]]) == 0
+    assert archive.get_version(1)[5] == b'data'
+
+    conn = archive._connect()
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("DELETE FROM archived_versions")
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("UPDATE archived_versions SET symbol='MSFT'")
+
+def age(cache, version_ids, timestamp='2000-01-01 00:00:00'):
+    cache.db.cursor.executemany(
+        "UPDATE cache_data SET last_updated=? WHERE id=?", [(timestamp, version_id) for version_id in version_ids]
+    )
+    cache.db.commit()
+
+def test_old_superseded_versions_are_archived(archived_cache):
+    cache = archived_cache
+    for i in range(4):
+        cache.save_data('income', 'AAPL', [{'date': '2024-12-31', 'revenue': i}])
+    ids = list(cache.list_versions('income', 'AAPL')['id'])
+    age(cache, ids[2:])
+
+    assert cache.archive_versions()['archived_versions'] == 2
+    with cache.db.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cache_data").fetchone()[0] == 2
+
+    versions = cache.list_versions('income', 'AAPL')
+    assert list(versions['id']) == ids
+    assert list(versions['archived']) == [False, False, True, True]
+    assert cache.get_version(ids[3]) == [{'date': '2024-12-31', 'revenue': 0}]
+
+    # The latest version is never archived, however old
+    age(cache, ids[:2])
+    assert cache.archive_versions()['archived_versions'] == 1
+    assert cache.get_cached_data('income', 'AAPL') == [{'date': '2024-12-31', 'revenue': 3}]
+
+def test_archive_disabled(cache):
+    assert cache.archive is None
+    assert cache.archive_versions() == {'archived_versions': 0, 'released_pages': 0}
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from utils.config import save_config
+from core.cache_manager import CacheManager
+
+httpx = pytest.importorskip('httpx')
+from core.async_cache_manager import AsyncCacheManager
+
+@pytest.fixture
+def database_path(tmp_path, settings):
+    save_config(settings)
+    return str(tmp_path / 'cache.db')
+
+def mock_client(manager, handler):
+    """Send the manager's API requests to handler instead of the network."""
+    manager._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    manager._semaphore = asyncio.Semaphore(manager.max_concurrency)
+
+def test_concurrent_fetches_share_one_call(database_path):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [{'price': 1}]
+
+    async def main():
+        async with AsyncCacheManager('test-key', database_path) as manager:
+            results = await asyncio.gather(*(
+                manager.get_or_fetch('profile', 'AAPL', fetch) for _ in range(5)
+            ))
+            cached = await manager.get_cached_data('profile', 'AAPL')
+        return results, cached
+
+    results, cached = asyncio.run(main())
+    assert calls == [1]
+    assert results == [[{'price': 1}]] * 5
+    assert cached == [{'price': 1}]
+
+def test_fetch_json_tracks_requests_and_retries(database_path):
+    statuses = [503, 200]
+
+    def handler(request):
+        assert request.url.params['apikey'] == 'test-key'
+        return httpx.Response(statuses.pop(0), json=[{'symbol': 'AAPL'}])
+
+    async def main():
+        async with AsyncCacheManager('test-key', database_path) as manager:
+            manager.cache.transport.backoff = 0
+            mock_client(manager, handler)
+            data = await manager.fetch_json('/v3/profile', '/AAPL')
+            return data, await manager.get_daily_request_count()
+
+    data, requests = asyncio.run(main())
+    assert data == [{'symbol': 'AAPL'}]
+    # The failed attempt and the successful retry are both counted
+    assert requests == 2
+
+def test_fetch_json_does_not_retry_before_a_long_retry_after(database_path):
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        return httpx.Response(429, headers={'Retry-After': '120'})
+
+    async def main():
+        async with AsyncCacheManager('test-key', database_path) as manager:
+            manager.cache.transport.max_backoff = 30.0
+            mock_client(manager, handler)
+            data = await manager.fetch_json('/v3/profile', '/AAPL')
+            return data, await manager.get_daily_request_count()
+
+    data, requests = asyncio.run(main())
+    assert data is None
+    assert calls == [1]
+    assert requests == 0
+
+def test_fetch_json_returns_none_on_error(database_path):
+    async def main():
+        async with AsyncCacheManager('test-key', database_path) as manager:
+            mock_client(manager, lambda request: httpx.Response(404))
+            return await manager.fetch_json('/v3/profile', '/NONE')
+
+    assert asyncio.run(main()) is None
+
+def test_close_persists_buffered_counts(database_path):
+    async def main():
+        manager = AsyncCacheManager('test-key', database_path)
+        await manager.save_data('profile', 'AAPL', [{'price': 1}])
+        await manager.track_api_request('/v3/profile')
+        await manager.close()
+
+    asyncio.run(main())
+    cache = CacheManager('test-key', database_path)
+    try:
+        assert cache.get_daily_request_count() == 1
+        assert cache.get_cached_data('profile', 'AAPL') == [{'price': 1}]
+    finally:
+        cache.close()
+
+def test_cache_summary_by_data_type(database_path):
+    async def main():
+        async with AsyncCacheManager('test-key', database_path) as manager:
+            await manager.save_data('profile', 'AAPL', [{'price': 1}])
+            await manager.save_data('esg', 'MSFT', [{'score': 2}])
+            return await manager.get_cache_summary(), await manager.get_cache_summary('profile')
+
+    everything, profile = asyncio.run(main())
+    assert sorted(everything['symbol']) == ['AAPL', 'MSFT']
+    assert list(profile['symbol']) == ['AAPL']
+    assert 'data_type' not in profile.columns
@@ -0,0 +1,73 @@
+import pytest
+
+from core.backends import get_backend, BACKENDS
+
+def backend_settings(name, tmp_path):
+    if name == 'sqlite':
+        return {'type': 'sqlite'}
+    if name == 'sharded':
+        return {'type': 'sqlite', 'shard_by': 'symbol', 'shards': 4, 'path': str(tmp_path / 'shards')}
+    if name == 'lmdb':
+        pytest.importorskip('lmdb')
+        return {'type': 'lmdb', 'path': str(tmp_path / 'lmdb'), 'map_size': 1 << 26}
+    return {'type': 'filesystem', 'path': str(tmp_path / 'files')}
+
+@pytest.fixture(params=['sqlite', 'sharded', 'lmdb', 'filesystem'])
+def backend_cache(request, make_cache, tmp_path):
+    return make_cache(config={'memory_cache': {'enabled': False}},
+                      backend=backend_settings(request.param, tmp_path))
+
+def test_unknown_backend(cache):
+    with pytest.raises(ValueError):
+        get_backend({'type': 'redis'}, cache.db)
+    assert set(BACKENDS) == {'sqlite', 'lmdb', 'filesystem'}
+
+def test_save_and_read(backend_cache):
+    cache = backend_cache
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.save_data('profile', 'AAPL', [{'price': 2}])
+    cache.save_data('profile', 'MSFT', [{'price': 3}])
+    cache.save_data('esg', 'AAPL', [{'score': 4}])
+
+    assert cache.get_cached_data('profile', 'AAPL') == [{'price': 2}]
+    assert cache.get_cached_data('profile', 'NONE') is None
+    assert cache.list_symbols('profile') == ['AAPL', 'MSFT']
+    assert cache.get_last_updated('profile', 'AAPL') is not None
+
+    versions = cache.list_versions('profile', 'AAPL')
+    assert len(versions) == (2 if cache.backend.supports_history else 1)
+    assert cache.get_version(list(versions['id'])[0]) == [{'price': 2}]
+
+def test_unchanged_save_keeps_version(backend_cache):
+    cache = backend_cache
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    version = cache.get_latest_version('profile', 'AAPL')
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    assert cache.get_latest_version('profile', 'AAPL') == version
+
+def test_summary_and_bulk_read(backend_cache):
+    cache = backend_cache
+    cache.save_many(('profile', symbol, [{'symbol': symbol}]) for symbol in ['C', 'A', 'B'])
+
+    summary = cache.get_cache_summary('profile')
+    assert sorted(summary['symbol']) == ['A', 'B', 'C']
+    assert (summary['stored_bytes'] > 0).all()
+
+    assert list(cache.get_latest_many('profile')) == [(s, [{'symbol': s}]) for s in 'ABC']
+    assert list(cache.get_latest_many('profile', ['B', 'X', 'A'])) == [('B', [{'symbol': 'B'}]), ('A', [{'symbol': 'A'}])]
+
+def test_delete(backend_cache):
+    cache = backend_cache
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.save_data('profile', 'MSFT', [{'price': 2}])
+    assert cache.delete_data('profile', 'AAPL') >= 1
+    assert cache.get_cached_data('profile', 'AAPL') is None
+    assert cache.list_symbols('profile') == ['MSFT']
+
+def test_lmdb_data_persists_across_instances(make_cache, tmp_path):
+    pytest.importorskip('lmdb')
+    settings = backend_settings('lmdb', tmp_path)
+    cache = make_cache(backend=settings)
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.close()
+    assert make_cache(backend=settings).get_cached_data('profile', 'AAPL') == [{'price': 1}]
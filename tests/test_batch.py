@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+def test_save_many(cache):
+    cache.save_many(('profile', f'SYM{i}', [{'price': i}]) for i in range(5))
+    assert cache.list_symbols('profile') == [f'SYM{i}' for i in range(5)]
+    assert cache.get_cached_data('profile', 'SYM3') == [{'price': 3}]
+
+def test_batch_commits_once_at_the_end(make_cache):
+    cache = make_cache()
+    other = make_cache()
+
+    with cache.batch():
+        cache.save_data('profile', 'AAPL', [{'price': 1}])
+        with cache.batch():
+            cache.save_data('profile', 'MSFT', [{'price': 2}])
+        assert other.get_cached_data('profile', 'MSFT') is None
+        cache.track_api_request('/v3/profile')
+        assert other.get_daily_request_count() == 0
+
+    assert other.get_cached_data('profile', 'AAPL') == [{'price': 1}]
+    assert other.get_cached_data('profile', 'MSFT') == [{'price': 2}]
+    assert other.get_daily_request_count() == 1
+
+def test_exception_rolls_back_the_batch(make_cache):
+    cache = make_cache()
+    other = make_cache()
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+
+    with pytest.raises(RuntimeError):
+        with cache.batch():
+            cache.save_data('profile', 'AAPL', [{'price': 2}])
+            cache.save_data('profile', 'MSFT', [{'price': 3}])
+            raise RuntimeError
+
+    assert other.get_cached_data('profile', 'AAPL') == [{'price': 1}]
+    assert other.get_cached_data('profile', 'MSFT') is None
+
+def test_group_commit_interval(make_cache):
+    cache = make_cache(config={'group_commit_interval': 0.05})
+    other = make_cache()
+
+    with cache.batch():
+        cache.save_data('profile', 'AAPL', [{'price': 1}])
+        time.sleep(0.1)
+        cache.save_data('profile', 'MSFT', [{'price': 2}])
+        # The interval elapsed before the second write, so both are committed
+        assert other.get_cached_data('profile', 'AAPL') == [{'price': 1}]
+        assert other.get_cached_data('profile', 'MSFT') == [{'price': 2}]
@@ -0,0 +1,93 @@
+import os
+import time
+
+import pytest
+
+from core.blobs import BlobStore, is_external, inner_codec, parse_reference
+
+def payload(size, seed=1):
+    # Distinct digits so the payload does not compress away
+    return [{'notes': ''.join(str(i * seed * 7919 % 10007) for i in range(size))}]
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / 'blobs'))
+
+@pytest.fixture
+def blob_cache(make_cache):
+    return make_cache(config={'blobs': {'enabled': True, 'threshold': 2000}})
+
+def test_reference_helpers():
+    assert is_external('ext:zstd') and not is_external('zstd') and not is_external(None)
+    assert inner_codec('ext:zstd') == 'zstd' and inner_codec('zlib') == 'zlib'
+    assert parse_reference(b'ab' * 20 + b':123') == ('ab' * 20, 123)
+
+def test_put_is_content_addressed(store):
+    first = store.put(b'payload')
+    assert store.put(b'payload') == first
+    assert store.put(b'other') != first
+    assert store.stats() == (2, len(b'payload') + len(b'other'))
+    assert store.size(first) == len(b'payload')
+    with store.view(first) as view:
+        assert view[:] == b'payload'
+
+def test_collect_keeps_referenced_and_recent_blobs(store):
+    kept = store.put(b'kept')
+    dropped = store.put(b'dropped')
+    assert store.collect(set(), grace=3600) == (0, 0)
+
+    old = time.time() - 7200
+    for reference in (kept, dropped):
+        os.utime(store._path(parse_reference(reference)[0]), (old, old))
+    assert store.collect({parse_reference(kept)[0]}, grace=3600) == (1, len(b'dropped'))
+    assert store.stats() == (1, len(b'kept'))
+
+def test_large_payloads_are_stored_once(blob_cache):
+    cache = blob_cache
+    cache.save_data('outlook', 'AAPL', payload(2000))
+    cache.save_data('outlook', 'MSFT', payload(2000))
+    cache.save_data('outlook', 'SMALL', payload(10))
+
+    assert is_external(cache.backend.head('outlook', 'AAPL').codec)
+    assert not is_external(cache.backend.head('outlook', 'SMALL').codec)
+    assert cache.blobs.stats()[0] == 1
+    assert cache.get_cached_data('outlook', 'MSFT') == payload(2000)
+
+    # cache_stats counts the blob size, not the length of the reference
+    summary = cache.get_cache_summary('outlook').set_index('symbol')
+    assert summary.loc['AAPL', 'stored_bytes'] == cache.blobs.stats()[1]
+
+def test_unreferenced_blobs_are_collected(blob_cache):
+    cache = blob_cache
+    cache.save_data('outlook', 'AAPL', payload(2000))
+    cache.save_data('outlook', 'MSFT', payload(2000))
+    cache.save_data('outlook', 'IBM', payload(2000, seed=3))
+    cache.delete_data('outlook', 'AAPL')
+    cache.delete_data('outlook', 'IBM')
+
+    # Blobs are only collected once the grace period is over
+    assert cache.collect_blobs()['removed_blobs'] == 0
+    result = cache.collect_blobs(grace=0)
+    assert result['removed_blobs'] == 1 and result['freed_bytes'] > 0
+    assert cache.blobs.stats()[0] == 1
+    assert cache.get_cached_data('outlook', 'MSFT') == payload(2000)
+
+def test_blobs_of_sharded_rows_are_kept(make_cache, tmp_path):
+    cache = make_cache(
+        config={'blobs': {'enabled': True, 'threshold': 2000}},
+        backend={'type': 'sqlite', 'shard_by': 'data_type', 'path': str(tmp_path / 'shards')}
+    )
+    cache.save_data('outlook', 'AAPL', payload(2000))
+    assert cache.collect_blobs(grace=0)['removed_blobs'] == 0
+    assert cache.get_cached_data('outlook', 'AAPL') == payload(2000)
+
+def test_recompress_moves_rows_across_the_threshold(make_cache):
+    cache = make_cache()
+    cache.save_data('outlook', 'AAPL', payload(2000))
+    assert not is_external(cache.backend.head('outlook', 'AAPL').codec)
+    cache.close()
+
+    cache = make_cache(config={'blobs': {'enabled': True, 'threshold': 2000}})
+    assert cache.recompress()['rows'] == 1
+    assert is_external(cache.backend.head('outlook', 'AAPL').codec)
+    assert cache.get_cached_data('outlook', 'AAPL') == payload(2000)
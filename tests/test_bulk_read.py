@@ -0,0 +1,31 @@
+import pytest
+
+SYMBOLS = [f'SYM{i:03d}' for i in range(40)]
+
+@pytest.fixture
+def filled(cache):
+    cache.save_many(('profile', symbol, [{'symbol': symbol, 'price': i}]) for i, symbol in enumerate(SYMBOLS))
+    return cache
+
+@pytest.mark.parametrize('workers, chunk_size', [(1, 256), (1, 7), (4, 5)])
+def test_every_symbol_in_order(filled, workers, chunk_size):
+    result = list(filled.get_latest_many('profile', workers=workers, chunk_size=chunk_size))
+    assert [symbol for symbol, _ in result] == SYMBOLS
+    assert result[3][1] == [{'symbol': 'SYM003', 'price': 3}]
+
+def test_requested_symbols_keep_their_order(filled):
+    result = list(filled.get_latest_many('profile', ['SYM010', 'MISSING', 'SYM002']))
+    assert [symbol for symbol, _ in result] == ['SYM010', 'SYM002']
+
+def test_latest_version_is_read(filled):
+    filled.save_data('profile', 'SYM001', [{'symbol': 'SYM001', 'price': 100}])
+    assert dict(filled.get_latest_many('profile', ['SYM001'])) == {'SYM001': [{'symbol': 'SYM001', 'price': 100}]}
+
+def test_reads_are_counted(filled):
+    list(filled.get_latest_many('profile', ['SYM001', 'SYM002']))
+    filled.flush_quota()
+    hits = filled.get_cache_summary('profile').set_index('symbol')['hits']
+    assert hits['SYM001'] == 1 and hits['SYM003'] == 0
+
+def test_unknown_data_type(cache):
+    assert list(cache.get_latest_many('esg')) == []
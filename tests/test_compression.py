@@ -0,0 +1,67 @@
+import pytest
+
+from core.codecs import available_codecs, get_codec, ZlibCodec
+
+PAYLOAD = [{'date': f'2024-01-{day:02d}', 'close': 100.0 + day, 'volume': 1000 * day} for day in range(1, 29)]
+
+@pytest.mark.parametrize('name', available_codecs())
+def test_codec_round_trip(name):
+    codec = get_codec(name)
+    data = b'financial data ' * 100
+    compressed = codec.compress(data)
+    assert len(compressed) < len(data)
+    assert codec.decompress(compressed) == data
+
+def test_unknown_codec_falls_back_to_zlib():
+    assert isinstance(get_codec('brotli'), ZlibCodec)
+    assert get_codec('zlib', level=1).level == 1
+
+def test_payloads_are_stored_compressed(make_cache):
+    cache = make_cache(config={'compression': {'codec': 'zlib', 'level': 6}})
+    cache.save_data('profile', 'AAPL', PAYLOAD)
+
+    stored = cache.backend.head('profile', 'AAPL')
+    assert stored.codec == 'zlib'
+    assert cache.get_cached_data('profile', 'AAPL') == PAYLOAD
+
+def test_rows_of_every_codec_stay_readable(make_cache):
+    pytest.importorskip('zstandard')
+    cache = make_cache(config={'compression': {'codec': 'zlib'}})
+    cache.save_data('profile', 'AAPL', PAYLOAD)
+    cache.close()
+
+    cache = make_cache(config={'compression': {'codec': 'zstd'}})
+    cache.save_data('profile', 'MSFT', PAYLOAD)
+    assert cache.backend.head('profile', 'AAPL').codec == 'zlib'
+    assert cache.backend.head('profile', 'MSFT').codec == 'zstd'
+    assert cache.get_cached_data('profile', 'AAPL') == PAYLOAD
+
+    stats = cache.recompress()
+    assert stats['rows'] == 1
+    assert cache.backend.head('profile', 'AAPL').codec == 'zstd'
+    assert cache.get_cached_data('profile', 'AAPL') == PAYLOAD
+
+def test_recompress_rewrites_legacy_text_rows(cache):
+    cache.db.execute(
+        "INSERT INTO cache_data (data_type, symbol, last_updated, raw_data) VALUES (?, ?, ?, ?)",
+        ('profile', 'AAPL', '2024-01-01 00:00:00', '[{"price": 1}]')
+    )
+    cache.db.commit()
+
+    assert cache.recompress()['rows'] == 1
+    stored = cache.backend.head('profile', 'AAPL')
+    assert stored.codec == cache.codec.tag
+    assert cache.get_cached_data('profile', 'AAPL') == [{'price': 1}]
+
+def test_zstd_dictionary(make_cache):
+    pytest.importorskip('zstandard')
+    cache = make_cache(config={'compression': {'codec': 'zstd', 'dictionaries': True}})
+    cache.save_many(
+        ('profile', f'SYM{i}', [{'symbol': f'SYM{i}', 'sector': 'Technology', 'price': i}])
+        for i in range(200)
+    )
+
+    dict_id = cache.train_dictionary('profile', size=4096)
+    cache.save_data('profile', 'NEW', [{'symbol': 'NEW', 'sector': 'Technology', 'price': 1}])
+    assert cache.backend.head('profile', 'NEW').codec == f'zstd:{dict_id}'
+    assert cache.get_cached_data('profile', 'NEW') == [{'symbol': 'NEW', 'sector': 'Technology', 'price': 1}]
@@ -0,0 +1,59 @@
+import sqlite3
+import threading
+
+import pytest
+
+from core.database import Database
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'cache.db'), reader_pool_size=2)
+    yield db
+    db.close()
+
+def test_wal_mode(db):
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+def test_connection_per_thread(db):
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(db.conn))
+    thread.start()
+    thread.join()
+    assert connections[0] is not db.conn
+    assert db.conn is db.conn
+
+def test_readers_are_read_only(db):
+    with db.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM cache_data")
+
+def test_reader_pool_is_bounded_and_reused(db):
+    with db.reader() as first, db.reader() as second:
+        assert first is not second
+    with db.reader() as again:
+        assert again in (first, second)
+    assert db._reader_count == 2
+
+def test_readers_see_committed_writes_only(db):
+    db.execute(
+        "INSERT INTO cache_data (data_type, symbol, last_updated, raw_data) VALUES ('profile', 'AAPL', '2024-01-01', '[]')"
+    )
+    with db.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cache_data").fetchone()[0] == 0
+    db.commit()
+    with db.reader() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cache_data").fetchone()[0] == 1
+
+def test_data_version_changes_on_commit(db):
+    before = db.data_version()
+    db.execute("INSERT INTO cache_shards (name) VALUES ('x')")
+    db.commit()
+    assert db.data_version() != before
+
+def test_in_memory_database_is_shared():
+    db = Database(':memory:')
+    try:
+        with db.reader() as conn:
+            assert conn is db.conn
+    finally:
+        db.close()
@@ -0,0 +1,34 @@
+def refresh_counts(cache):
+    cache.flush_quota()
+    stats = cache.refresh_stats()
+    return {row.data_type: (row.refreshes, row.unchanged) for row in stats.itertuples()}
+
+def test_unchanged_save_writes_no_version(cache):
+    cache.save_data('profile', 'AAPL', {'price': 1})
+    first = cache.get_latest_version('profile', 'AAPL')
+
+    cache.save_data('profile', 'AAPL', {'price': 1})
+    assert cache.get_latest_version('profile', 'AAPL') == first
+    assert len(cache.list_versions('profile', 'AAPL')) == 1
+
+    cache.save_data('profile', 'AAPL', {'price': 2})
+    assert cache.get_latest_version('profile', 'AAPL') != first
+    assert cache.get_cached_data('profile', 'AAPL') == {'price': 2}
+
+def test_first_save_is_not_a_refresh(cache):
+    cache.save_data('profile', 'AAPL', {'price': 1})
+    cache.save_data('profile', 'MSFT', {'price': 1})
+    assert refresh_counts(cache) == {}
+
+    cache.save_data('profile', 'AAPL', {'price': 1})
+    cache.save_data('profile', 'MSFT', {'price': 2})
+    assert refresh_counts(cache) == {'profile': (2, 1)}
+
+def test_repeated_key_within_one_call(cache):
+    cache.save_many([
+        ('profile', 'AAPL', {'price': 1}),
+        ('profile', 'AAPL', {'price': 1}),
+        ('profile', 'AAPL', {'price': 2}),
+    ])
+    assert cache.get_cached_data('profile', 'AAPL') == {'price': 2}
+    assert refresh_counts(cache) == {'profile': (2, 1)}
@@ -0,0 +1,67 @@
+import pytest
+
+from core.deltas import make_delta, apply_delta
+
+def statements(days, revenue=100):
+    # Notes that do not compress away, so deltas are clearly smaller than full copies
+    return [
+        {'date': f'2024-01-{day:02d}', 'revenue': revenue + day, 'notes': ' '.join(str(day * k ** 3) for k in range(60))}
+        for day in days
+    ]
+
+@pytest.mark.parametrize('old, new', [
+    (statements(range(5, 0, -1)), statements(range(6, 0, -1))),
+    (statements(range(5, 0, -1)), statements(range(5, 0, -1), revenue=200)),
+    (statements(range(6, 0, -1)), statements(range(4, 0, -1))),
+    (statements(range(1, 6)), statements(range(5, 0, -1))),
+    ({'a': 1, 'b': [1, 2], 'c': 3}, {'b': [1, 2, 3], 'a': 1, 'd': 4}),
+])
+def test_round_trip(old, new):
+    delta = make_delta(old, new)
+    assert delta is not None
+    assert apply_delta(new, delta) == old
+
+def test_delta_only_holds_changes():
+    old = statements(range(5, 0, -1))
+    new = statements(range(6, 0, -1))
+    delta = make_delta(old, new)
+    assert delta['drop'] == ['2024-01-06']
+    assert delta['put'] == []
+    assert 'order' not in delta
+
+def test_unkeyed_payloads_are_not_encoded():
+    assert make_delta([1, 2, 3], [1, 2]) is None
+    assert make_delta([{'value': 1}], [{'value': 2}]) is None
+    assert make_delta({'a': 1}, [{'date': '2024-01-01'}]) is None
+
+def save_history(cache, count):
+    for i in range(count):
+        cache.save_data('income', 'AAPL', statements(range(i + 5, 0, -1)))
+    return list(cache.list_versions('income', 'AAPL')['id'])
+
+def test_superseded_versions_are_stored_as_deltas(cache):
+    ids = save_history(cache, 4)
+    versions = cache.list_versions('income', 'AAPL')
+    assert list(versions['is_delta']) == [False, True, True, True]
+
+    for position, version_id in enumerate(ids):
+        assert cache.get_version(version_id) == statements(range(8 - position, 0, -1))
+
+def test_snapshot_every(make_cache):
+    cache = make_cache(config={'version_deltas': {'enabled': True, 'snapshot_every': 3, 'max_ratio': 0.5}})
+    save_history(cache, 7)
+    is_delta = list(cache.list_versions('income', 'AAPL')['is_delta'])[::-1]
+    # Oldest first: every third version is kept whole
+    assert is_delta == [True, True, False, True, True, False, False]
+
+def test_deltas_can_be_disabled(make_cache):
+    cache = make_cache(config={'version_deltas': {'enabled': False}})
+    save_history(cache, 3)
+    assert not cache.list_versions('income', 'AAPL')['is_delta'].any()
+
+def test_deleting_a_base_rebuilds_its_dependents(cache):
+    ids = save_history(cache, 3)
+    cache._delete_versions([ids[1]])
+
+    assert list(cache.list_versions('income', 'AAPL')['id']) == [ids[0], ids[2]]
+    assert cache.get_version(ids[2]) == statements(range(5, 0, -1))
@@ -0,0 +1,120 @@
+import time
+import threading
+
+import pytest
+
+def payload(size):
+    # Distinct digits so the payload does not compress away
+    return [{'notes': ''.join(str(i * 7919 % 10007) for i in range(size))}]
+
+def priorities(cache):
+    return {(data_type, symbol): priority for priority, data_type, symbol, _ in cache.eviction_priorities()}
+
+def test_priority_favours_small_frequent_costly_keys(make_cache):
+    cache = make_cache(config={'eviction': {'refetch_costs': {'esg': 10}}})
+    cache.save_data('profile', 'SMALL', payload(50))
+    cache.save_data('profile', 'LARGE', payload(500))
+    cache.save_data('profile', 'READ', payload(500))
+    cache.save_data('esg', 'LARGE', payload(500))
+    for _ in range(5):
+        cache.get_cached_data('profile', 'READ')
+
+    ranks = priorities(cache)
+    assert ranks[('profile', 'LARGE')] < ranks[('profile', 'SMALL')]
+    assert ranks[('profile', 'LARGE')] < ranks[('profile', 'READ')]
+    assert ranks[('profile', 'LARGE')] < ranks[('esg', 'LARGE')]
+
+def test_evict_down_to_low_water(make_cache):
+    cache = make_cache(config={'eviction': {'low_water': 0.5}})
+    for i in range(10):
+        cache.save_data('profile', f'SYM{i}', payload(200))
+    for i in range(5):
+        cache.get_cached_data('profile', f'SYM{i}')
+    total = int(cache.get_cache_summary()['stored_bytes'].sum())
+
+    assert cache.evict(max_bytes=total)['evicted_keys'] == 0
+    result = cache.evict(max_bytes=total - 1)
+    remaining = int(cache.get_cache_summary()['stored_bytes'].sum())
+    assert remaining <= (total - 1) * 0.5
+    assert result['freed_bytes'] == total - remaining
+    # Keys that were read outlive the ones that were not
+    assert set(cache.list_symbols('profile')) <= {f'SYM{i}' for i in range(5)}
+
+def test_clock_rises_to_evicted_priority(make_cache):
+    cache = make_cache(config={'eviction': {'low_water': 1.0}})
+    cache.save_data('profile', 'READ', payload(200))
+    for _ in range(3):
+        cache.get_cached_data('profile', 'READ')
+    cache.save_data('profile', 'VICTIM', payload(200))
+    victim = priorities(cache)[('profile', 'VICTIM')]
+
+    total = int(cache.get_cache_summary()['stored_bytes'].sum())
+    assert cache.evict(max_bytes=total - 1)['evicted_keys'] == 1
+    with cache.db.reader() as conn:
+        assert conn.execute("SELECT clock FROM cache_clock").fetchone()[0] == pytest.approx(victim)
+
+    # Keys used from now on start from the raised clock, so unused keys age out
+    cache.save_data('profile', 'NEW', payload(200))
+    cache.flush_quota()
+    assert priorities(cache)[('profile', 'NEW')] > victim
+
+def test_pinned_and_watchlist_keys_are_kept(make_cache):
+    cache = make_cache(config={'eviction': {'watchlist': ['WATCHED']}})
+    for symbol in ('PINNED', 'WATCHED', 'TYPEPIN', 'OTHER'):
+        cache.save_data('profile', symbol, payload(200))
+    cache.pin('PINNED')
+    cache.pin('TYPEPIN', 'profile')
+    assert len(cache.pinned()) == 3
+
+    cache.evict(max_bytes=1)
+    assert cache.list_symbols('profile') == ['PINNED', 'TYPEPIN', 'WATCHED']
+
+    cache.unpin('TYPEPIN', 'profile')
+    cache.evict(max_bytes=1)
+    assert cache.list_symbols('profile') == ['PINNED', 'WATCHED']
+
+def test_evicted_versions_are_archived(make_cache):
+    cache = make_cache(config={'archive': {'enabled': True, 'codec': 'zlib'}})
+    cache.save_data('profile', 'AAPL', payload(200))
+    version = cache.get_latest_version('profile', 'AAPL')
+    cache.evict(max_bytes=1)
+
+    assert cache.get_cached_data('profile', 'AAPL') is None
+    assert cache.get_version(version) == payload(200)
+
+def test_background_eviction(make_cache):
+    cache = make_cache(config={'eviction': {'max_cache_bytes': 2000, 'low_water': 0.5, 'interval': 60}})
+    for i in range(10):
+        cache.save_data('profile', f'SYM{i}', payload(200))
+
+    deadline = time.monotonic() + 5
+    while cache.get_cache_summary()['stored_bytes'].sum() > 2000 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert cache.get_cache_summary()['stored_bytes'].sum() <= 2000
+
+    cache.close()
+    assert cache._eviction_thread is None
+
+def test_size_estimate_counts_blobs(make_cache):
+    cache = make_cache(config={'blobs': {'enabled': True, 'threshold': 1000}})
+    cache.evict(max_bytes=10 ** 9)
+    cache.save_many(('profile', f'SYM{i}', payload(100 * (i + 1))) for i in range(5))
+    assert cache._cache_bytes == int(cache.get_cache_summary()['stored_bytes'].sum())
+
+def test_saves_during_an_eviction_pass_are_counted(cache, monkeypatch):
+    cache.save_data('profile', 'AAPL', payload(200))
+    summary = cache.backend.summary
+
+    def summary_then_save(data_type=None):
+        rows = summary(data_type)
+        # Another thread saves between the measurement and its use
+        if cache.list_symbols('profile') == ['AAPL']:
+            thread = threading.Thread(target=cache.save_data, args=('profile', 'MSFT', payload(300)))
+            thread.start()
+            thread.join()
+        return rows
+
+    monkeypatch.setattr(cache.backend, 'summary', summary_then_save)
+    cache.evict(max_bytes=10 ** 9)
+    monkeypatch.undo()
+    assert cache._cache_bytes == int(cache.get_cache_summary()['stored_bytes'].sum())
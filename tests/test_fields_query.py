@@ -0,0 +1,71 @@
+import pytest
+
+from core.fields import latest_record, to_number
+
+RATIOS = {
+    'AAA': 10.0,
+    'BBB': 25.0,
+    'CCC': 14.0,
+    'DDD': None,
+}
+
+def save_ratios(cache):
+    cache.save_many(
+        ('ratios', symbol, [
+            {'date': '2023-12-31', 'priceEarningsRatio': 99.0, 'returnOnEquity': 0.1},
+            {'date': '2024-12-31', 'priceEarningsRatio': pe, 'returnOnEquity': len(symbol) * 0.1 if pe else None},
+        ])
+        for symbol, pe in RATIOS.items()
+    )
+
+def test_latest_record():
+    assert latest_record([{'date': '2023'}, {'date': '2024', 'x': 1}]) == {'date': '2024', 'x': 1}
+    assert latest_record([{'x': 1}, {'x': 2}]) == {'x': 1}
+    assert latest_record({'x': 1}) == {'x': 1}
+    assert latest_record(None) == {}
+    assert to_number('1.5') == 1.5 and to_number(True) is None and to_number('n/a') is None
+
+def test_query_filters_and_orders(cache):
+    save_ratios(cache)
+
+    cheap = cache.query('ratios', where={'priceEarningsRatio': ('<', 15)}, order_by='priceEarningsRatio')
+    assert list(cheap['symbol']) == ['AAA', 'CCC']
+    assert list(cheap['priceEarningsRatio']) == [10.0, 14.0]
+
+    assert list(cache.query('ratios', order_by='-priceEarningsRatio', limit=2)['symbol']) == ['BBB', 'CCC']
+    assert list(cache.query('ratios', where={'priceEarningsRatio': None})['symbol']) == ['DDD']
+    assert list(cache.query('ratios', where={'priceEarningsRatio': ('IN', [10.0, 25.0])})['symbol']) == ['AAA', 'BBB']
+
+def test_in_accepts_a_single_string(cache):
+    cache.save_data('profile', 'AAPL', [{'sector': 'Technology', 'price': 1.0}])
+    cache.save_data('profile', 'XOM', [{'sector': 'Energy', 'price': 2.0}])
+
+    assert list(cache.query('profile', where={'sector': ('IN', 'Technology')})['symbol']) == ['AAPL']
+    assert list(cache.query('profile', where={'sector': ('IN', ('Technology', 'Energy'))})['symbol']) == ['AAPL', 'XOM']
+    assert list(cache.query('profile', where={'price': ('IN', 2.0)})['symbol']) == ['XOM']
+
+def test_new_version_replaces_fields(cache):
+    save_ratios(cache)
+    cache.save_data('ratios', 'BBB', [{'date': '2025-12-31', 'priceEarningsRatio': 5.0}])
+    cheap = cache.query('ratios', where={'priceEarningsRatio': ('<', 15)}, order_by='priceEarningsRatio')
+    assert list(cheap['symbol']) == ['BBB', 'AAA', 'CCC']
+
+def test_invalid_queries(cache):
+    with pytest.raises(ValueError):
+        cache.query('esg')
+    with pytest.raises(ValueError):
+        cache.query('ratios', where={'unknownField': 1})
+    with pytest.raises(ValueError):
+        cache.query('ratios', where={'priceEarningsRatio': ('BETWEEN', 1)})
+
+def test_unindexed_payloads_are_indexed_on_query(cache):
+    save_ratios(cache)
+    cache.db.execute("DELETE FROM ratio_fields")
+    cache.db.commit()
+    assert len(cache.query('ratios')) == len(RATIOS)
+
+def test_query_across_shards(make_cache, tmp_path):
+    cache = make_cache(backend={'type': 'sqlite', 'shard_by': 'symbol', 'shards': 3, 'path': str(tmp_path / 'shards')})
+    save_ratios(cache)
+    result = cache.query('ratios', order_by='-priceEarningsRatio', limit=3)
+    assert list(result['symbol']) == ['BBB', 'CCC', 'AAA']
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from core.cache_manager import FreshnessPolicy
+
+def test_age_based_policy():
+    policy = FreshnessPolicy(days=1, hours=12)
+    now = datetime(2024, 1, 10, 12, 0)
+    assert policy.is_fresh('2024-01-09 01:00:00', now)
+    assert not policy.is_fresh('2024-01-08 23:00:00', now)
+
+def test_trading_day_policy_skips_weekends():
+    policy = FreshnessPolicy(trading_days=1)
+    friday = '2024-01-05 18:00:00'
+    assert policy.is_fresh(friday, datetime(2024, 1, 7, 12, 0))
+    assert not policy.is_fresh(friday, datetime(2024, 1, 8, 9, 0))
+
+def make_stale(cache, data_type, symbol):
+    cache.db.execute(
+        "UPDATE cache_data SET last_updated='2000-01-01 00:00:00' WHERE data_type=? AND symbol=?",
+        (data_type, symbol)
+    )
+    cache.db.commit()
+
+def test_fresh_data_is_not_fetched(cache):
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    assert cache.is_fresh('profile', 'AAPL')
+    assert cache.get_or_fetch('profile', 'AAPL', lambda: [{'price': 2}]) == [{'price': 1}]
+    assert cache.get_or_fetch('profile', 'AAPL', lambda: [{'price': 2}], force=True) == [{'price': 2}]
+
+def test_stale_data_is_refreshed(cache):
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    make_stale(cache, 'profile', 'AAPL')
+    assert not cache.is_fresh('profile', 'AAPL')
+    assert cache.get_or_fetch('profile', 'AAPL', lambda: [{'price': 2}]) == [{'price': 2}]
+    assert cache.is_fresh('profile', 'AAPL')
+
+def test_failed_fetch_serves_stale_data(cache):
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    make_stale(cache, 'profile', 'AAPL')
+    assert cache.get_or_fetch('profile', 'AAPL', lambda: None) == [{'price': 1}]
+
+def test_daily_limit_serves_stale_data(make_cache):
+    cache = make_cache(config={'rate_limits': {'per_day': 1}})
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    make_stale(cache, 'profile', 'AAPL')
+    cache.track_api_request('/v3/profile')
+
+    fetched = []
+    data = cache.get_or_fetch('profile', 'AAPL', lambda: fetched.append(1) or [{'price': 2}])
+    assert data == [{'price': 1}]
+    assert fetched == []
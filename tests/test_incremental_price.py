@@ -0,0 +1,59 @@
+from endpoints.stock_price import fetch_stock_price
+
+def bar(day, close):
+    return {'date': f'2024-01-{day:02d}', 'close': close, 'adjClose': close, 'volume': 100}
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, bars):
+        self.bars = bars
+
+    def json(self):
+        return {'symbol': 'AAPL', 'historical': self.bars}
+
+def fake_api(cache, monkeypatch, *responses):
+    """Answer transport.get with the given bar lists, recording the params."""
+    calls = []
+    responses = list(responses)
+
+    def get(endpoint, path="", params=None):
+        calls.append(params)
+        return FakeResponse(responses.pop(0))
+
+    monkeypatch.setattr(cache.transport, 'get', get)
+    return calls
+
+def test_first_fetch_downloads_full_history(cache, monkeypatch):
+    calls = fake_api(cache, monkeypatch, [bar(2, 11.0), bar(1, 10.0)])
+    assert fetch_stock_price(cache, 'AAPL') == [bar(2, 11.0), bar(1, 10.0)]
+    assert calls == [None]
+
+def test_only_new_bars_are_requested(cache, monkeypatch):
+    cache.save_data('price', 'AAPL', [bar(2, 11.0), bar(1, 10.0)])
+    calls = fake_api(cache, monkeypatch, [bar(3, 12.0), bar(2, 11.0)])
+
+    assert fetch_stock_price(cache, 'AAPL') == [bar(3, 12.0), bar(2, 11.0), bar(1, 10.0)]
+    assert calls == [{'from': '2024-01-02'}]
+    # The cached payload is not modified in place
+    assert cache.get_cached_data('price', 'AAPL') == [bar(2, 11.0), bar(1, 10.0)]
+
+def test_adjusted_history_is_reloaded(cache, monkeypatch):
+    cache.save_data('price', 'AAPL', [bar(2, 11.0), bar(1, 10.0)])
+    calls = fake_api(
+        cache, monkeypatch,
+        [bar(3, 6.0), bar(2, 5.5)],
+        [bar(3, 6.0), bar(2, 5.5), bar(1, 5.0)]
+    )
+
+    assert fetch_stock_price(cache, 'AAPL') == [bar(3, 6.0), bar(2, 5.5), bar(1, 5.0)]
+    assert calls == [{'from': '2024-01-02'}, None]
+
+def test_reload_stops_at_the_daily_limit(make_cache, monkeypatch):
+    cache = make_cache(config={'rate_limits': {'per_day': 1}})
+    cache.save_data('price', 'AAPL', [bar(2, 11.0), bar(1, 10.0)])
+    calls = fake_api(cache, monkeypatch, [bar(3, 6.0), bar(2, 5.5)])
+
+    assert fetch_stock_price(cache, 'AAPL') is None
+    assert calls == [{'from': '2024-01-02'}]
+    assert cache.get_daily_request_count() == 1
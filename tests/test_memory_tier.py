@@ -0,0 +1,75 @@
+import pytest
+
+from core.memory_cache import MemoryCache
+
+@pytest.mark.parametrize('policy', ['lru', 'tinylfu'])
+def test_size_bound(policy):
+    memory = MemoryCache(1000, policy=policy)
+    for i in range(50):
+        memory.put(('profile', f'SYM{i}'), i, 100, i)
+    stats = memory.stats()
+    assert stats['bytes'] <= 1000
+    assert stats['entries'] <= 10
+
+def test_oversized_payload_is_rejected():
+    memory = MemoryCache(100, policy='lru')
+    memory.put(('profile', 'AAPL'), 'x', 200, 1)
+    assert memory.get(('profile', 'AAPL')) is None
+    assert memory.stats()['rejections'] == 1
+
+def test_lru_evicts_least_recently_used():
+    memory = MemoryCache(300, policy='lru')
+    for name in 'ABC':
+        memory.put(name, name, 100, 1)
+    memory.get('A')
+    memory.put('D', 'D', 100, 1)
+    assert memory.get('B') is None
+    assert memory.get('A').value == 'A'
+
+def test_tinylfu_keeps_frequent_keys():
+    memory = MemoryCache(10000, policy='tinylfu', expected_entry_size=100)
+    hot = [f'HOT{i}' for i in range(50)]
+    for key in hot:
+        memory.put(key, key, 100, 1)
+    for _ in range(5):
+        for key in hot:
+            memory.get(key)
+
+    # A scan of keys read once does not flush the frequently read ones
+    for i in range(500):
+        memory.get(f'COLD{i}')
+        memory.put(f'COLD{i}', i, 100, 1)
+    held = sum(memory.get(key) is not None for key in hot)
+    assert held >= 45
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        MemoryCache(100, policy='fifo')
+
+def test_reads_are_served_from_memory(cache):
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    first = cache.get_cached_data('profile', 'AAPL')
+    second = cache.get_cached_data('profile', 'AAPL')
+    assert second is first
+    assert cache.memory_stats()['hits'] == 1
+
+def test_writes_invalidate_memory(cache):
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.get_cached_data('profile', 'AAPL')
+    cache.save_data('profile', 'AAPL', [{'price': 2}])
+    assert cache.get_cached_data('profile', 'AAPL') == [{'price': 2}]
+
+def test_writes_by_another_process_are_seen(make_cache):
+    cache = make_cache()
+    other = make_cache()
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    assert cache.get_cached_data('profile', 'AAPL') == [{'price': 1}]
+
+    other.save_data('profile', 'AAPL', [{'price': 2}])
+    assert cache.get_cached_data('profile', 'AAPL') == [{'price': 2}]
+
+def test_memory_tier_can_be_disabled(make_cache):
+    cache = make_cache(config={'memory_cache': {'enabled': False}})
+    assert cache.memory is None
+    assert cache.memory_stats() is None
+    assert make_cache(memory_cache={'enabled': False}).memory is None
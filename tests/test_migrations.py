@@ -0,0 +1,119 @@
+import json
+import sqlite3
+
+import pytest
+
+from core.database import Database, SCHEMA_VERSION
+
+LEGACY_SCHEMA = '''
+CREATE TABLE api_requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    endpoint TEXT,
+    date TEXT,
+    count INTEGER
+);
+CREATE TABLE cache_data (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data_type TEXT,
+    symbol TEXT,
+    date TEXT,
+    last_updated TEXT,
+    raw_data TEXT,
+    UNIQUE(data_type, symbol, date)
+);
+'''
+
+def schema(path):
+    """Names and SQL of every table, index and trigger."""
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"
+        ).fetchall())
+    finally:
+        conn.close()
+
+def user_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+def legacy_database(path):
+    """A database written by the original, unversioned schema."""
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        "INSERT INTO cache_data (data_type, symbol, last_updated, raw_data) VALUES (?, ?, ?, ?)",
+        [
+            ('profile', 'AAPL', '2024-01-01 10:00:00', json.dumps([{'price': 1}])),
+            ('profile', 'AAPL', '2024-01-02 10:00:00', json.dumps([{'price': 2}])),
+            ('profile', 'MSFT', '2024-01-01 10:00:00', json.dumps([{'price': 3}])),
+        ]
+    )
+    # Duplicate rows left by concurrent writers
+    conn.executemany(
+        "INSERT INTO api_requests (endpoint, date, count) VALUES (?, ?, ?)",
+        [('/v3/profile', '2024-01-02', 2), ('/v3/profile', '2024-01-02', 3), ('/v3/quote', '2024-01-02', 1)]
+    )
+    conn.commit()
+    conn.close()
+
+def test_new_database_is_current(tmp_path):
+    db = Database(str(tmp_path / 'cache.db'))
+    db.close()
+    assert user_version(str(tmp_path / 'cache.db')) == SCHEMA_VERSION
+
+@pytest.mark.parametrize('start', range(SCHEMA_VERSION))
+def test_upgrade_from_every_version(tmp_path, monkeypatch, start):
+    """Stopping after any migration and upgrading later gives the fresh schema."""
+    fresh = str(tmp_path / 'fresh.db')
+    Database(fresh).close()
+
+    path = str(tmp_path / 'old.db')
+    steps = Database._migrations
+    monkeypatch.setattr(Database, '_migrations', lambda self: steps(self)[:start])
+    Database(path).close()
+    assert user_version(path) == start
+
+    monkeypatch.setattr(Database, '_migrations', steps)
+    Database(path).close()
+    assert user_version(path) == SCHEMA_VERSION
+    assert schema(path) == schema(fresh)
+
+def test_legacy_database_upgrade(make_cache, tmp_path):
+    path = tmp_path / 'legacy.db'
+    legacy_database(str(path))
+
+    cache = make_cache('legacy.db')
+    assert user_version(str(path)) == SCHEMA_VERSION
+
+    # Migration 1 points cache_latest at the newest version of every key
+    assert cache.get_cached_data('profile', 'AAPL') == [{'price': 2}]
+    assert cache.get_cached_data('profile', 'MSFT') == [{'price': 3}]
+    assert len(cache.list_versions('profile', 'AAPL')) == 2
+
+    # Migration 5 merges duplicate request rows and builds the daily totals
+    with cache.db.reader() as conn:
+        assert conn.execute(
+            "SELECT endpoint, count FROM api_requests ORDER BY endpoint"
+        ).fetchall() == [('/v3/profile', 5), ('/v3/quote', 1)]
+        assert conn.execute("SELECT date, count FROM api_daily_totals").fetchall() == [('2024-01-02', 6)]
+
+    # Migration 10 builds cache_stats from the existing rows
+    summary = cache.get_cache_summary('profile').set_index('symbol')
+    assert summary.loc['AAPL', 'data_points'] == 2
+    assert summary.loc['MSFT', 'data_points'] == 1
+
+    # New writes on top of legacy rows
+    cache.save_data('profile', 'AAPL', [{'price': 4}])
+    assert cache.get_cached_data('profile', 'AAPL') == [{'price': 4}]
+    assert len(cache.list_versions('profile', 'AAPL')) == 3
+
+def test_migrations_run_once(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    Database(path).close()
+    before = schema(path)
+    Database(path).close()
+    assert schema(path) == before
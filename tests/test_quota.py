@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+
+import pytest
+
+from core.database import Database
+from core.quota import QuotaLedger
+
+def persisted(cache):
+    with cache.db.reader() as conn:
+        requests = dict(conn.execute("SELECT endpoint, count FROM api_requests").fetchall())
+        totals = dict(conn.execute("SELECT date, count FROM api_daily_totals").fetchall())
+    return requests, totals
+
+def test_counts_are_buffered_until_due(make_cache):
+    cache = make_cache(config={'quota_flush_every': 3, 'quota_flush_interval': 3600})
+    cache.track_api_request('/v3/profile')
+    cache.track_api_request('/v3/quote')
+    assert persisted(cache) == ({}, {})
+    assert cache.get_daily_request_count() == 2
+
+    cache.track_api_request('/v3/profile')
+    today = cache.quota.today()
+    assert persisted(cache) == ({'/v3/profile': 2, '/v3/quote': 1}, {today: 3})
+
+def test_flush_quota(make_cache):
+    cache = make_cache(config={'quota_flush_every': 100, 'quota_flush_interval': 3600})
+    cache.track_api_request('/v3/profile')
+    cache.flush_quota()
+    assert persisted(cache)[0] == {'/v3/profile': 1}
+
+def test_counts_from_every_process_add_up(make_cache):
+    config = {'quota_flush_every': 5, 'quota_flush_interval': 3600}
+    caches = [make_cache(config=config) for _ in range(2)]
+
+    def work(cache):
+        for _ in range(50):
+            cache.track_api_request('/v3/profile')
+
+    threads = [threading.Thread(target=work, args=(cache,)) for cache in caches for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for cache in caches:
+        cache.flush_quota()
+
+    assert persisted(caches[0])[0] == {'/v3/profile': 200}
+    assert caches[1].get_daily_request_count() == 200
+
+def test_daily_limit(make_cache):
+    cache = make_cache(config={'rate_limits': {'per_day': 2}})
+    assert cache.daily_limit == 2
+    cache.track_api_request('/v3/profile')
+    assert not cache.check_api_limit_reached()
+    cache.track_api_request('/v3/profile')
+    assert cache.check_api_limit_reached()
+
+def test_close_persists_buffered_counts(make_cache):
+    config = {'quota_flush_every': 100, 'quota_flush_interval': 3600}
+    cache = make_cache(config=config)
+    cache.track_api_request('/v3/profile')
+    cache.get_cached_data('profile', 'AAPL')
+    cache.close()
+
+    assert make_cache(config=config).get_daily_request_count() == 1
+
+def test_failed_flush_keeps_counts_buffered(tmp_path):
+    db = Database(str(tmp_path / 'quota.db'), busy_timeout=0.1)
+    ledger = QuotaLedger(db, flush_every=100, flush_interval=3600)
+    blocker = sqlite3.connect(db.database_path, isolation_level=None)
+    try:
+        ledger.record('/v3/profile', 2)
+        blocker.execute("BEGIN IMMEDIATE")
+        with pytest.raises(sqlite3.OperationalError):
+            ledger.flush()
+        db.conn.rollback()
+        assert ledger.pending_total(ledger.today()) == 2
+
+        blocker.rollback()
+        assert ledger.flush() == 2
+        db.commit()
+        assert ledger.total() == 2
+    finally:
+        blocker.close()
+        db.close()
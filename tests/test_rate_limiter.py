@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from core.rate_limiter import RateLimiter
+
+@pytest.fixture
+def limiter_path(tmp_path):
+    return str(tmp_path / 'limits.db')
+
+@pytest.fixture
+def make_limiter(limiter_path):
+    limiters = []
+
+    def make(**kwargs):
+        limiter = RateLimiter(limiter_path, **kwargs)
+        limiters.append(limiter)
+        return limiter
+
+    yield make
+    for limiter in limiters:
+        limiter.close()
+
+def test_inactive_limiter_always_allows(make_limiter):
+    limiter = make_limiter()
+    assert not limiter.is_active()
+    assert all(limiter.acquire(timeout=0) for _ in range(100))
+
+def test_per_second_bucket_refills(make_limiter):
+    limiter = make_limiter(per_second=5)
+    assert all(limiter.try_acquire() == 0 for _ in range(5))
+    wait = limiter.try_acquire()
+    assert 0 < wait <= 0.2
+    time.sleep(wait + 0.01)
+    assert limiter.try_acquire() == 0
+
+def test_requests_larger_than_a_bucket_never_succeed(make_limiter):
+    limiter = make_limiter(per_minute=10, per_day=100)
+    assert limiter.try_acquire(11) == float('inf')
+    assert not limiter.acquire(11, timeout=10)
+
+def test_day_bucket(make_limiter):
+    limiter = make_limiter(per_day=3)
+    assert limiter.acquire(3, timeout=0)
+    assert not limiter.acquire(timeout=0)
+    # The day bucket only refills at midnight
+    assert limiter.try_acquire() > 0
+    assert limiter.remaining()['day'] == 0
+
+def test_processes_share_the_budget(make_limiter):
+    first = make_limiter(per_day=4)
+    second = make_limiter(per_day=4)
+    assert first.acquire(3, timeout=0)
+    assert not second.acquire(2, timeout=0)
+    assert second.acquire(1, timeout=0)
+    assert first.remaining()['day'] == 0
+
+def test_reservation_is_taken_from_the_shared_budget(make_limiter):
+    limiter = make_limiter(per_day=10, reserve_floor=2)
+    assert limiter.reserve('nightly', 5)
+    assert limiter.remaining() == {'day': 5, 'reservations': {'nightly': 5}}
+
+    # Reserved tokens are only available to the reservation
+    assert limiter.acquire(5, timeout=0, reservation='nightly')
+    assert not limiter.acquire(timeout=0, reservation='nightly')
+    assert limiter.acquire(5, timeout=0)
+
+def test_reservations_leave_the_floor(make_limiter):
+    limiter = make_limiter(per_day=10, reserve_floor=3)
+    assert not limiter.reserve('nightly', 8)
+    assert limiter.reserve('nightly', 7)
+    assert not limiter.reserve('other', 1)
+    assert limiter.remaining()['day'] == 3
+
+def test_unused_reservation_returns_on_release(make_limiter):
+    limiter = make_limiter(per_day=10)
+    limiter.reserve('nightly', 6)
+    limiter.acquire(2, timeout=0, reservation='nightly')
+    assert limiter.release('nightly') == 4
+    assert limiter.remaining() == {'day': 8, 'reservations': {}}
+
+def test_unused_reservation_returns_on_expiry(make_limiter):
+    limiter = make_limiter(per_day=10)
+    assert limiter.reserve('nightly', 6, ttl=0.05)
+    time.sleep(0.1)
+    assert limiter.remaining() == {'day': 10, 'reservations': {}}
+    assert not limiter.acquire(timeout=0, reservation='nightly')
+
+def test_cache_keeps_limiter_state_in_its_own_file(make_cache):
+    cache = make_cache(config={'rate_limits': {'per_day': 5}})
+    assert cache.rate_limiter.database_path == cache.database_path + '.ratelimit'
+
+    # Acquiring budget inside a batch must not wait for the batch's write lock
+    with cache.batch():
+        cache.save_data('profile', 'AAPL', [{'price': 1}])
+        assert cache.acquire_api_budget(timeout=0)
+    assert cache.rate_limiter.remaining()['day'] == 4
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from core.cache_manager import RetentionPolicy
+
+def save_versions(cache, count):
+    for i in range(count):
+        cache.save_data('profile', 'AAPL', {'price': i})
+    return list(cache.list_versions('profile', 'AAPL')['id'])
+
+def test_policy_keeps_latest_recent_and_monthly():
+    versions = [
+        (5, '2024-03-10 00:00:00'),
+        (4, '2024-03-05 00:00:00'),
+        (3, '2024-02-20 00:00:00'),
+        (2, '2024-02-10 00:00:00'),
+        (1, '2024-01-15 00:00:00'),
+    ]
+    now = datetime(2024, 3, 12)
+    assert RetentionPolicy().expired(versions, now) == []
+    assert RetentionPolicy(keep_last=2).expired(versions, now) == [3, 2, 1]
+    assert RetentionPolicy(max_age_days=10).expired(versions, now) == [3, 2, 1]
+    assert RetentionPolicy(keep_last=1, keep_monthly=True).expired(versions, now) == [4, 2]
+
+def test_monthly_only_policy():
+    versions = [
+        (5, '2024-03-10 00:00:00'),
+        (4, '2024-03-05 00:00:00'),
+        (3, '2024-02-20 00:00:00'),
+        (2, '2024-02-10 00:00:00'),
+        (1, '2024-01-15 00:00:00'),
+    ]
+    policy = RetentionPolicy(keep_monthly=True)
+    assert policy.is_active()
+    assert policy.expired(versions, datetime(2024, 3, 12)) == [4, 2]
+
+def test_no_retention_by_default(cache):
+    assert cache.retention == {}
+    ids = save_versions(cache, 4)
+    assert cache.compact()['deleted_versions'] == 0
+    assert list(cache.list_versions('profile', 'AAPL')['id']) == ids
+
+def test_retention_deletes_without_archive(make_cache):
+    cache = make_cache(config={'retention': {'profile': {'keep_last': 2}}})
+    ids = save_versions(cache, 4)
+
+    result = cache.compact()
+    assert result == {'deleted_versions': 2, 'archived': False, 'released_pages': result['released_pages']}
+    assert list(cache.list_versions('profile', 'AAPL')['id']) == ids[:2]
+    assert cache.get_version(ids[-1]) is None
+    assert cache.get_cached_data('profile', 'AAPL') == {'price': 3}
+
+def test_retention_archives_when_enabled(make_cache):
+    cache = make_cache(config={
+        'retention': {'profile': {'keep_last': 2}},
+        'archive': {'enabled': True, 'after_days': 90, 'codec': 'zlib'}
+    })
+    ids = save_versions(cache, 4)
+
+    result = cache.compact()
+    assert result['deleted_versions'] == 2 and result['archived']
+
+    versions = cache.list_versions('profile', 'AAPL')
+    assert list(versions['id']) == ids
+    assert list(versions['archived']) == [False, False, True, True]
+    assert cache.get_version(ids[-1]) == {'price': 0}
+    assert cache.archive.stats()[0] == 2
@@ -0,0 +1,48 @@
+import pytest
+
+from core.serializers import available_serializers, get_serializer, reader_for_format
+
+PAYLOAD = [{'symbol': 'AAPL', 'price': 189.5, 'volume': 1000, 'tags': ['a', 'b'], 'note': None}]
+
+@pytest.mark.parametrize('name', available_serializers())
+def test_serializer_round_trip(name):
+    serializer = get_serializer(name)
+    raw = serializer.dumps(PAYLOAD)
+    assert isinstance(raw, bytes)
+    assert reader_for_format(serializer.format).loads(raw) == PAYLOAD
+
+def test_auto_picks_fastest_installed():
+    assert get_serializer('auto').name == available_serializers()[0]
+    assert get_serializer('missing').name == 'json'
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        reader_for_format('yaml')
+
+@pytest.mark.parametrize('name', available_serializers())
+def test_cache_tags_rows_with_their_format(make_cache, name):
+    cache = make_cache(config={'serializer': name})
+    cache.save_data('profile', 'AAPL', PAYLOAD)
+    assert cache.backend.head('profile', 'AAPL').format == name
+    assert cache.get_cached_data('profile', 'AAPL') == PAYLOAD
+
+def test_large_integers_fall_back_to_json(make_cache):
+    pytest.importorskip('orjson')
+    cache = make_cache(config={'serializer': 'orjson'})
+    cache.save_data('profile', 'AAPL', [{'shares': 2 ** 70}])
+    assert cache.backend.head('profile', 'AAPL').format == 'json'
+    assert cache.get_cached_data('profile', 'AAPL') == [{'shares': 2 ** 70}]
+
+def test_rows_of_every_format_stay_readable(make_cache):
+    pytest.importorskip('msgpack')
+    cache = make_cache(config={'serializer': 'json'})
+    cache.save_data('profile', 'AAPL', PAYLOAD)
+    cache.close()
+
+    cache = make_cache(config={'serializer': 'msgpack'})
+    cache.save_data('profile', 'MSFT', PAYLOAD)
+    assert cache.get_cached_data('profile', 'AAPL') == PAYLOAD
+
+    assert cache.recompress()['rows'] == 1
+    assert cache.backend.head('profile', 'AAPL').format == 'msgpack'
+    assert cache.get_cached_data('profile', 'AAPL') == PAYLOAD
@@ -0,0 +1,70 @@
+import pytest
+
+from core.series import to_date_int, from_date_int, merge_records
+
+BARS = [
+    {'date': f'2024-01-{day:02d}', 'open': 100.0 + day, 'high': 101.0 + day, 'low': 99.0 + day,
+     'close': 100.5 + day, 'adjClose': 100.5 + day, 'volume': 1000 * day}
+    for day in range(10, 0, -1)
+]
+
+def test_date_conversion():
+    assert to_date_int('2024-01-05') == 20240105
+    assert to_date_int('2024-01-05 16:00:00') == 20240105
+    assert to_date_int('bad') is None
+    assert to_date_int(None) is None
+    assert from_date_int(20240105) == '2024-01-05'
+
+def test_merge_records_replaces_by_date():
+    cached = [{'date': '2024-01-02', 'close': 1}, {'date': '2024-01-01', 'close': 1}]
+    fresh = [{'date': '2024-01-03', 'close': 3}, {'date': '2024-01-02', 'close': 2}]
+    assert merge_records(cached, fresh) == [
+        {'date': '2024-01-03', 'close': 3},
+        {'date': '2024-01-02', 'close': 2},
+        {'date': '2024-01-01', 'close': 1},
+    ]
+    assert cached[0]['close'] == 1
+
+def test_get_range(cache):
+    cache.save_data('price', 'AAPL', BARS)
+
+    records = cache.get_range('price', 'AAPL', start='2024-01-03', end='2024-01-05', columns=['close'])
+    assert records == [
+        {'date': '2024-01-05', 'close': 105.5},
+        {'date': '2024-01-04', 'close': 104.5},
+        {'date': '2024-01-03', 'close': 103.5},
+    ]
+    ascending = cache.get_range('price', 'AAPL', end='2024-01-02', descending=False)
+    assert [record['date'] for record in ascending] == ['2024-01-01', '2024-01-02']
+    assert ascending[0]['volume'] == 1000
+
+def test_new_version_replaces_typed_rows(cache):
+    cache.save_data('price', 'AAPL', BARS)
+    cache.save_data('price', 'AAPL', BARS[:2])
+    assert len(cache.get_range('price', 'AAPL')) == 2
+
+def test_get_range_rejects_other_data_types(cache):
+    with pytest.raises(ValueError):
+        cache.get_range('profile', 'AAPL')
+    cache.save_data('price', 'AAPL', BARS)
+    with pytest.raises(ValueError):
+        cache.get_range('price', 'AAPL', columns=['marketCap'])
+
+def test_get_range_rejects_invalid_bounds(cache):
+    cache.save_data('price', 'AAPL', BARS)
+    with pytest.raises(ValueError):
+        cache.get_range('price', 'MSFT', columns=['marketCap'])
+    with pytest.raises(ValueError):
+        cache.get_range('price', 'AAPL', start='2024-02-01', end='2024-01-01')
+    with pytest.raises(ValueError):
+        cache.get_range('price', 'AAPL', start='last week')
+    assert len(cache.get_range('price', 'AAPL', start='2024-01-01', end='2024-01-01')) == 1
+
+def test_unindexed_payload_is_indexed_on_first_use(cache):
+    cache.save_data('price', 'AAPL', BARS)
+    cache.db.execute("DELETE FROM price_bars")
+    cache.db.commit()
+    assert len(cache.get_range('price', 'AAPL')) == len(BARS)
+
+def test_missing_symbol(cache):
+    assert cache.get_range('price', 'NONE') == []
@@ -0,0 +1,156 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from core.database import Database, ShardRouter
+from core.backends.sqlite import SHARD_SPAN
+
+def sharded(make_cache, tmp_path, shard_by, shards=4):
+    return make_cache(backend={
+        'type': 'sqlite', 'shard_by': shard_by, 'shards': shards, 'path': str(tmp_path / 'shards')
+    })
+
+def rows_in(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT data_type, symbol FROM cache_data ORDER BY 1, 2").fetchall()
+    finally:
+        conn.close()
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'router.db'))
+    yield db
+    db.close()
+
+def test_symbol_routing_is_stable_and_spread(db):
+    router = ShardRouter(db, 'symbol', 4)
+    try:
+        names = {router.name_for('profile', f'SYM{i}') for i in range(200)}
+        assert names == {router.shard_name(index) for index in range(4)}
+        assert router.name_for('profile', 'AAPL') == router.name_for('esg', 'AAPL')
+    finally:
+        router.close()
+
+def test_layout_cannot_change(db):
+    router = ShardRouter(db, 'symbol', 4)
+    router.route('profile', 'AAPL')
+    router.close()
+    with pytest.raises(ValueError):
+        ShardRouter(db, 'symbol', 8)
+    with pytest.raises(ValueError):
+        ShardRouter(db, 'data_type')
+    with pytest.raises(ValueError):
+        ShardRouter(db, 'sector')
+
+def test_data_type_shards(make_cache, tmp_path):
+    cache = sharded(make_cache, tmp_path, 'data_type')
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.save_data('esg', 'AAPL', [{'score': 2}])
+
+    assert rows_in(cache.database_path) == []
+    assert rows_in(str(tmp_path / 'shards' / 'profile.db')) == [('profile', 'AAPL')]
+    assert rows_in(str(tmp_path / 'shards' / 'esg.db')) == [('esg', 'AAPL')]
+    assert cache.get_cached_data('esg', 'AAPL') == [{'score': 2}]
+
+def test_symbol_shards(make_cache, tmp_path):
+    cache = sharded(make_cache, tmp_path, 'symbol')
+    symbols = [f'SYM{i}' for i in range(20)]
+    cache.save_many(('profile', symbol, [{'symbol': symbol}]) for symbol in symbols)
+
+    files = os.listdir(tmp_path / 'shards')
+    assert len([name for name in files if name.endswith('.db')]) == 4
+    stored = sum(len(rows_in(str(tmp_path / 'shards' / name))) for name in files if name.endswith('.db'))
+    assert stored == 20
+    assert cache.list_symbols('profile') == sorted(symbols)
+    assert dict(cache.get_latest_many('profile')) == {s: [{'symbol': s}] for s in symbols}
+
+def test_version_ids_encode_the_shard(make_cache, tmp_path):
+    cache = sharded(make_cache, tmp_path, 'symbol')
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.save_data('profile', 'AAPL', [{'price': 2}])
+    cache.save_data('profile', 'MSFT', [{'price': 3}])
+
+    shard_id = cache.backend.router.shard_id(cache.backend.router.name_for('profile', 'AAPL'))
+    ids = list(cache.list_versions('profile', 'AAPL')['id'])
+    assert all(version_id % SHARD_SPAN == shard_id for version_id in ids)
+    assert cache.get_version(ids[1]) == [{'price': 1}]
+    assert cache.get_version(cache.get_latest_version('profile', 'MSFT')) == [{'price': 3}]
+
+def test_series_rows_live_in_the_shard(make_cache, tmp_path):
+    cache = sharded(make_cache, tmp_path, 'data_type')
+    cache.save_data('price', 'AAPL', [{'date': '2024-01-02', 'close': 2.0}, {'date': '2024-01-01', 'close': 1.0}])
+
+    assert cache.get_range('price', 'AAPL', columns=['close']) == [
+        {'date': '2024-01-02', 'close': 2.0},
+        {'date': '2024-01-01', 'close': 1.0},
+    ]
+    conn = sqlite3.connect(str(tmp_path / 'shards' / 'price.db'))
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM price_bars").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+def test_sharded_data_is_reopened(make_cache, tmp_path):
+    cache = sharded(make_cache, tmp_path, 'symbol')
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.close()
+    assert sharded(make_cache, tmp_path, 'symbol').get_cached_data('profile', 'AAPL') == [{'price': 1}]
+
+def test_shard_writes_do_not_wait_on_the_main_database(make_cache, tmp_path):
+    cache = sharded(make_cache, tmp_path, 'data_type')
+    cache.save_data('profile', 'AAPL', {'price': 1})
+    cache.get_cached_data('profile', 'AAPL')
+
+    # Another process holding the main database's write lock
+    blocker = sqlite3.connect(cache.database_path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        saved = threading.Event()
+
+        def save():
+            cache.save_data('profile', 'AAPL', {'price': 2})
+            cache.save_data('profile', 'MSFT', {'price': 3})
+            saved.set()
+
+        thread = threading.Thread(target=save)
+        thread.start()
+        thread.join(5)
+        assert saved.is_set()
+    finally:
+        blocker.rollback()
+        blocker.close()
+
+    # The buffered counters reach the main database once it is free again
+    cache.stop_counter_flush()
+    cache.flush_quota()
+    conn = sqlite3.connect(cache.database_path)
+    try:
+        hits = dict(conn.execute("SELECT symbol, hits FROM cache_hits WHERE data_type='profile'"))
+        refreshes = conn.execute("SELECT refreshes FROM refresh_stats WHERE data_type='profile'").fetchone()
+    finally:
+        conn.close()
+    assert hits == {'AAPL': 1, 'MSFT': 0}
+    assert refreshes == (1,)
+
+def test_reads_do_not_create_shards(make_cache, tmp_path):
+    cache = sharded(make_cache, tmp_path, 'data_type')
+    assert cache.get_cached_data('profile', 'AAPL') is None
+    assert cache.get_range('price', 'AAPL') == []
+    assert cache.list_versions('profile', 'AAPL').empty
+    assert cache.get_cache_summary('profile').empty
+    assert cache.delete_data('price', 'AAPL') == 0
+    assert cache.backend.iter_versions(0, 10) == []
+
+    assert not os.listdir(tmp_path / 'shards')
+    conn = sqlite3.connect(cache.database_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM cache_shards").fetchone() == (0,)
+    finally:
+        conn.close()
+
+def test_shard_count_must_fit_in_version_ids(make_cache, tmp_path):
+    with pytest.raises(ValueError):
+        sharded(make_cache, tmp_path, 'symbol', shards=SHARD_SPAN)
@@ -0,0 +1,132 @@
+import threading
+import time
+
+from core.single_flight import FetchLeases
+
+KEY = ('profile', 'AAPL', '')
+
+def test_get_or_fetch_inside_batch(cache):
+    fetched = []
+
+    def fetch(symbol):
+        fetched.append(symbol)
+        return [{'symbol': symbol, 'price': 1.0}]
+
+    with cache.batch():
+        first = cache.get_or_fetch('profile', 'AAPL', lambda: fetch('AAPL'))
+        second = cache.get_or_fetch('profile', 'MSFT', lambda: fetch('MSFT'))
+
+    assert first == [{'symbol': 'AAPL', 'price': 1.0}]
+    assert second == [{'symbol': 'MSFT', 'price': 1.0}]
+    assert fetched == ['AAPL', 'MSFT']
+    assert cache.list_symbols('profile') == ['AAPL', 'MSFT']
+    assert not cache.leases.is_held(KEY)
+
+def test_leases_use_their_own_file(cache):
+    assert cache.leases.database_path != cache.database_path
+    assert cache.rate_limiter.database_path != cache.database_path
+
+def test_concurrent_fetches_share_one_call(cache):
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'symbol': 'AAPL'}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch('profile', 'AAPL', fetch)))
+        for _ in range(4)
+    ]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{'symbol': 'AAPL'}] * 4
+
+def test_lease_is_exclusive_until_released(tmp_path):
+    leases = FetchLeases(str(tmp_path / 'leases.db'))
+    other = FetchLeases(str(tmp_path / 'leases.db'))
+    try:
+        owner = leases.acquire(KEY, ttl=30)
+        assert owner is not None
+        assert other.acquire(KEY, ttl=30) is None
+        assert other.is_held(KEY)
+
+        leases.release(KEY, owner)
+        assert not other.is_held(KEY)
+        assert other.acquire(KEY, ttl=30) is not None
+    finally:
+        leases.close()
+        other.close()
+
+def test_expired_lease_can_be_taken_over(tmp_path):
+    leases = FetchLeases(str(tmp_path / 'leases.db'), poll_interval=0.01)
+    try:
+        assert leases.acquire(KEY, ttl=0.05) is not None
+        assert leases.wait(KEY, timeout=2)
+        assert leases.acquire(KEY, ttl=30) is not None
+    finally:
+        leases.close()
+
+def test_fetch_waits_for_another_process_lease(cache):
+    other = FetchLeases(cache.leases.database_path)
+    try:
+        owner = other.acquire(KEY, ttl=30)
+
+        def store_and_release():
+            time.sleep(0.2)
+            cache.save_data('profile', 'AAPL', {'symbol': 'AAPL', 'from': 'other'})
+            other.release(KEY, owner)
+
+        thread = threading.Thread(target=store_and_release)
+        thread.start()
+        data = cache.get_or_fetch('profile', 'AAPL', lambda: {'symbol': 'AAPL', 'from': 'us'})
+        thread.join()
+    finally:
+        other.close()
+
+    assert data == {'symbol': 'AAPL', 'from': 'other'}
+
+def test_other_process_unchanged_refresh_is_not_fetched_again(make_cache):
+    # Two managers on one database stand in for two processes: they share
+    # the lease file but not the in-process single-flight table
+    first = make_cache()
+    second = make_cache()
+    payload = {'symbol': 'AAPL', 'price': 1.0}
+    first.save_data('profile', 'AAPL', payload)
+    first.db.execute("UPDATE cache_data SET last_updated='2000-01-01 00:00:00'")
+    first.db.commit()
+
+    calls = []
+    started = threading.Event()
+
+    def slow_fetch():
+        calls.append('first')
+        started.set()
+        time.sleep(0.3)
+        return payload
+
+    def fetch():
+        calls.append('second')
+        return payload
+
+    thread = threading.Thread(target=lambda: first.get_or_fetch('profile', 'AAPL', slow_fetch))
+    thread.start()
+    assert started.wait(5)
+    data = second.get_or_fetch('profile', 'AAPL', fetch)
+    thread.join(5)
+
+    assert data == payload
+    assert calls == ['first']
+    assert len(first.list_versions('profile', 'AAPL')) == 1
@@ -0,0 +1,60 @@
+from core.blobs import stored_size_sql
+
+def recomputed(cache):
+    """cache_stats rebuilt from cache_data."""
+    with cache.db.reader() as conn:
+        return conn.execute(f"""
+            SELECT data_type, symbol, COUNT(*), MAX(last_updated), SUM({stored_size_sql('')})
+            FROM cache_data GROUP BY data_type, symbol ORDER BY 1, 2
+        """).fetchall()
+
+def maintained(cache):
+    with cache.db.reader() as conn:
+        return conn.execute(
+            "SELECT data_type, symbol, versions, last_updated, payload_bytes FROM cache_stats ORDER BY 1, 2"
+        ).fetchall()
+
+def test_stats_follow_every_write(make_cache):
+    cache = make_cache(config={'retention': {'profile': {'keep_last': 2}}})
+    for i in range(4):
+        cache.save_data('profile', 'AAPL', [{'price': i, 'notes': 'x' * i * 50}])
+    cache.save_data('profile', 'MSFT', [{'price': 1}])
+    cache.save_data('esg', 'AAPL', [{'score': 1}])
+    assert maintained(cache) == recomputed(cache)
+
+    # Unchanged refresh, compaction and deletion
+    cache.save_data('profile', 'MSFT', [{'price': 1}])
+    cache.compact()
+    cache.delete_data('esg', 'AAPL')
+    assert maintained(cache) == recomputed(cache)
+    assert [row[:3] for row in maintained(cache)] == [('profile', 'AAPL', 2), ('profile', 'MSFT', 1)]
+
+def test_summary(cache):
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.save_data('profile', 'AAPL', [{'price': 2}])
+    cache.get_cached_data('profile', 'AAPL')
+    cache.get_cached_data('profile', 'AAPL')
+
+    summary = cache.get_cache_summary()
+    assert list(summary.columns) == ['data_type', 'symbol', 'last_updated', 'data_points', 'stored_bytes', 'hits']
+    row = summary.iloc[0]
+    assert (row['data_type'], row['symbol'], row['data_points'], row['hits']) == ('profile', 'AAPL', 2, 2)
+
+def test_hits_persist(make_cache):
+    cache = make_cache()
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    for _ in range(3):
+        cache.get_cached_data('profile', 'AAPL')
+    cache.close()
+
+    summary = make_cache().get_cache_summary('profile')
+    assert summary.set_index('symbol')['hits']['AAPL'] == 3
+
+def test_storage_stats(cache):
+    cache.save_data('profile', 'AAPL', [{'price': 1}])
+    cache.save_data('esg', 'AAPL', [{'score': 1}])
+    cache.save_data('esg', 'MSFT', [{'score': 2}])
+
+    by_type, tables = cache.storage_stats()
+    assert by_type.set_index('data_type')['keys'].to_dict() == {'esg': 2, 'profile': 1}
+    assert list(tables.columns) == ['database', 'table', 'bytes']
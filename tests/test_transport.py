@@ -0,0 +1,111 @@
+import pytest
+import requests
+
+from core.transport import Transport, backoff_delay, parse_retry_after
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+class FakeSession:
+    """Returns (or raises) the queued outcomes in order."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def close(self):
+        pass
+
+def make_transport(outcomes, **kwargs):
+    transport = Transport("https://example.test", "key", backoff=0, **kwargs)
+    transport.session = FakeSession(outcomes)
+    return transport
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+def test_backoff_delay_is_capped():
+    assert backoff_delay(0, 1, 10, retry_after=6) == 6
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 1, 4) <= 4
+
+def test_long_retry_after_is_not_retried_early():
+    assert backoff_delay(0, 0.5, 30.0, 120.0) is None
+
+    charged = []
+
+    def on_retry(endpoint):
+        charged.append(endpoint)
+        return True
+
+    transport = make_transport(
+        [FakeResponse(429, {'Retry-After': '120'}), FakeResponse(200)], max_backoff=30.0, on_retry=on_retry
+    )
+    assert transport.get("/v3/profile").status_code == 429
+    assert transport.session.calls == 1
+    assert charged == []
+
+def test_retries_until_success():
+    transport = make_transport([FakeResponse(503), FakeResponse(429), FakeResponse(200)])
+    assert transport.get("/v3/profile", "/AAPL").status_code == 200
+    assert transport.requests == 3
+    assert transport.retries == 2
+
+def test_gives_up_after_max_retries():
+    transport = make_transport([FakeResponse(500)] * 3, max_retries=2)
+    assert transport.get("/v3/profile").status_code == 500
+    assert transport.session.calls == 3
+
+    transport = make_transport([requests.ConnectionError()] * 2, max_retries=1)
+    with pytest.raises(requests.ConnectionError):
+        transport.get("/v3/profile")
+
+def test_on_retry_can_refuse():
+    charged = []
+
+    def on_retry(endpoint):
+        charged.append(endpoint)
+        return False
+
+    transport = make_transport([FakeResponse(503), FakeResponse(200)], on_retry=on_retry)
+    assert transport.get("/v3/profile").status_code == 503
+    assert charged == ["/v3/profile"]
+    assert transport.session.calls == 1
+
+def test_cache_charges_every_retry(make_cache):
+    cache = make_cache(config={'rate_limits': {'per_day': 10}})
+    cache.transport.backoff = 0
+    cache.transport.session = FakeSession([FakeResponse(503), FakeResponse(503), FakeResponse(200)])
+
+    assert cache.acquire_api_budget()
+    assert cache.transport.get("/v3/profile", "/AAPL").status_code == 200
+
+    # Both failed attempts are counted and each retry took a token
+    assert cache.get_daily_request_count() == 2
+    assert cache.rate_limiter.remaining()['day'] == 7
+
+def test_retries_stop_at_the_daily_limit(make_cache):
+    cache = make_cache(config={'rate_limits': {'per_day': 2}})
+    cache.transport.backoff = 0
+    cache.transport.session = FakeSession([FakeResponse(503)] * 4)
+
+    assert cache.acquire_api_budget()
+    assert cache.transport.get("/v3/profile").status_code == 503
+    assert cache.transport.session.calls == 2
+    assert cache.rate_limiter.remaining()['day'] == 0
@@ -33,7 +33,72 @@ def create_default_config():
     config = {
         'database_path': 'financial_data.db',
         'export_format': 'xlsx',
-        'export_dir': 'exports'
+        'export_dir': 'exports',
+        'sqlite_mmap_size': 268435456,
+        'sqlite_cache_size': -65536,
+        'reader_pool_size': 4,
+        'serializer': 'auto',
+        'compression': {'codec': 'zlib', 'level': 6, 'dictionaries': False},
+        'memory_cache': {'enabled': True, 'max_bytes': 67108864, 'policy': 'tinylfu'},
+        'freshness': {
+            'price': {'trading_days': 1},
+            'marketcap': {'trading_days': 1},
+            'news': {'hours': 6},
+            'earnings': {'days': 1},
+            'insider': {'days': 1},
+            'filings': {'days': 1},
+            'outlook': {'days': 1},
+            'estimates': {'days': 7},
+            'targets': {'days': 7},
+            'grades': {'days': 7},
+            'dividends': {'days': 7},
+            'economic': {'days': 7},
+            'profile': {'days': 30},
+            'holders': {'days': 30},
+            'splits': {'days': 30},
+            'income': {'days': 90},
+            'balance': {'days': 90},
+            'cashflow': {'days': 90},
+            'ratios': {'days': 90},
+            'metrics': {'days': 90},
+            'growth': {'days': 90},
+            'revenue': {'days': 90},
+            'esg': {'days': 180}
+        },
+        'group_commit_interval': 0,
+        'bulk_read_workers': None,
+        'quota_flush_every': 10,
+        'quota_flush_interval': 1.0,
+        'rate_limits': {
+            'per_second': None,
+            'per_minute': None,
+            'per_day': 250,
+            'reserve_floor': 0
+        },
+        'rate_limit_timeout': 30,
+        'fetch_lease_ttl': 30,
+        'http': {
+            'pool_size': 10,
+            'connect_timeout': 5.0,
+            'read_timeout': 30.0,
+            'max_retries': 3,
+            'backoff': 0.5,
+            'max_backoff': 30.0
+        },
+        'backend': {'type': 'sqlite', 'shard_by': None, 'shards': 8},
+        'version_deltas': {'enabled': True, 'snapshot_every': 10, 'max_ratio': 0.5},
+        'compaction_interval': 3600,
+        'archive': {'enabled': False, 'path': None, 'after_days': 90, 'codec': 'zstd', 'level': None},
+        'blobs': {'enabled': False, 'path': None, 'threshold': 262144},
+        'eviction': {
+            'max_cache_bytes': None,
+            'low_water': 0.9,
+            'batch_size': 100,
+            'interval': 300,
+            'refetch_costs': {},
+            'watchlist': []
+        },
+        'retention': {}
     }
     
     save_config(config)